@@ -1,3 +1,16 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import GmailMailbox, GmailMessage
+
+
+@admin.register(GmailMailbox)
+class GmailMailboxAdmin(admin.ModelAdmin):
+    list_display = ['user', 'history_id', 'last_synced_at', 'last_full_sync_at']
+
+
+@admin.register(GmailMessage)
+class GmailMessageAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'sender', 'user', 'internal_date']
+    list_filter = ['user']
+    search_fields = ['subject', 'sender', 'gmail_id']
+    readonly_fields = ['created_at', 'updated_at']
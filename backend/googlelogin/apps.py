@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GoogleloginConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "googlelogin"
+
+    def ready(self):
+        """Connect the receivers that invalidate cached Gmail services."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,272 @@
+"""
+Content-addressed on-disk store for fetched message bodies.
+
+Bodies are keyed by the SHA-256 of their content, so a body fetched twice
+(by two requests, two users, or a resync) is stored once. Blobs are kept
+gzip-compressed under two levels of shard directories
+(<root>/ab/cd/abcd...gz) and written to a temporary file that is renamed
+into place, so readers never see a partial blob and concurrent writers of
+the same content simply replace one another.
+
+The store is bounded: once it grows past max_bytes the least recently used
+blobs (by file mtime, which reads refresh) are removed until it is back
+under LOW_WATER of the limit. Callers must therefore treat a missing blob
+as a cache miss and fetch the body again.
+
+Reads map the file into memory instead of reading it into a buffer; the
+compressed bytes can be streamed to clients that accept gzip as they are.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+
+from django.conf import settings
+
+
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+SUFFIX = ".gz"
+COMPRESS_LEVEL = 6
+# Eviction removes blobs until the store is under this fraction of max_bytes
+LOW_WATER = 0.9
+# Reads refresh a blob's mtime at most this often (seconds)
+TOUCH_INTERVAL = 60
+# Temporary files older than this are left over from crashed writers
+STALE_TMP_AGE = 3600
+CHUNK_SIZE = 64 * 1024
+
+
+def blob_key(data: bytes) -> str:
+    """Return the store key (hex SHA-256) of some content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobReader:
+    """
+    A memory-mapped blob.
+
+    Iterating yields the blob in chunks: the gzip bytes as stored, or the
+    decompressed content with decode=True. Close the reader (or use it as a
+    context manager) to release the mapping; StreamingHttpResponse closes
+    it once the response is sent.
+    """
+
+    def __init__(self, path: str, decode: bool = False, chunk_size: int = CHUNK_SIZE):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.decode = decode
+        self.chunk_size = chunk_size
+        # Size of the compressed blob
+        self.size = len(self._map)
+
+    def read(self) -> bytes:
+        """Return the whole decompressed content."""
+        return zlib.decompress(self._map, zlib.MAX_WBITS | 16)
+
+    def __iter__(self) -> Iterator[bytes]:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16) if self.decode else None
+        for start in range(0, self.size, self.chunk_size):
+            chunk = self._map[start:start + self.chunk_size]
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            if chunk:
+                yield chunk
+        if decompressor is not None:
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class BlobStore:
+    """
+    Sharded, gzip-compressed, content-addressed blob directory.
+
+    Args:
+        root: Directory holding the blobs (created on first write)
+        max_bytes: Compressed size the store is kept under; 0 for no limit
+    """
+
+    def __init__(self, root: Union[str, os.PathLike], max_bytes: int = 0):
+        self.root = os.fspath(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Compressed bytes on disk; counted from a directory scan on first use
+        self._total: Optional[int] = None
+
+    def path(self, key: str) -> str:
+        """
+        Return the file path of a key.
+
+        Raises:
+            ValueError: If key is not a hex SHA-256 digest
+        """
+        if not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key + SUFFIX)
+
+    def put(self, data: Union[bytes, str]) -> str:
+        """
+        Store content (str is stored as UTF-8) and return its key.
+
+        Content already in the store is not written again; its blob only
+        counts as recently used.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        key = blob_key(data)
+        path = self.path(key)
+        if self._touch(path, force=True):
+            return key
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # mtime=0 keeps the blob bytes a function of the content alone
+        compressed = gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self._lock:
+            if self._total is not None:
+                self._total += len(compressed)
+        if self.max_bytes:
+            self._maybe_evict()
+        return key
+
+    def open(self, key: str, decode: bool = False) -> Optional[BlobReader]:
+        """Map a blob for reading, or return None if it is not stored (see BlobReader)."""
+        path = self.path(key)
+        try:
+            reader = BlobReader(path, decode=decode)
+        except FileNotFoundError:
+            return None
+        self._touch(path)
+        return reader
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a blob's decompressed content, or None if it is not stored."""
+        reader = self.open(key)
+        if reader is None:
+            return None
+        with reader:
+            return reader.read()
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Return a blob stored from a str, or None if it is not stored."""
+        data = self.get(key)
+        return None if data is None else data.decode("utf-8")
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def delete(self, key: str) -> bool:
+        """Remove a blob; returns whether it was stored."""
+        path = self.path(key)
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if self._total is not None:
+                self._total -= size
+        return True
+
+    def total_bytes(self) -> int:
+        """Return the compressed size of all blobs."""
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _path, size, _mtime in self._scan())
+            return self._total
+
+    def evict(self, target_bytes: int) -> int:
+        """
+        Remove least recently used blobs until the store holds at most
+        target_bytes; returns the number removed.
+        """
+        with self._lock:
+            entries = self._scan()
+            total = sum(size for _path, size, _mtime in entries)
+            removed = 0
+            # Oldest first
+            for path, size, _mtime in sorted(entries, key=lambda entry: entry[2]):
+                if total <= target_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            self._total = total
+            return removed
+
+    def _maybe_evict(self) -> None:
+        if self.total_bytes() > self.max_bytes:
+            self.evict(int(self.max_bytes * LOW_WATER))
+
+    def _touch(self, path: str, force: bool = False) -> bool:
+        """Mark a blob as recently used; returns False if it does not exist."""
+        try:
+            if not force and time.time() - os.stat(path).st_mtime < TOUCH_INTERVAL:
+                return True
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        """List (path, size, mtime) of every blob, removing stale temporary files."""
+        entries = []
+        now = time.time()
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith(SUFFIX):
+                    entries.append((path, stat.st_size, stat.st_mtime))
+                elif name.startswith(".tmp-") and now - stat.st_mtime > STALE_TMP_AGE:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+        return entries
+
+
+@lru_cache(maxsize=None)
+def get_blob_store() -> BlobStore:
+    """Return the store configured by GMAIL_BLOB_STORE_DIR and GMAIL_BLOB_STORE_MAX_BYTES."""
+    return BlobStore(
+        getattr(settings, "GMAIL_BLOB_STORE_DIR", os.path.join(settings.BASE_DIR, "gmail_blobs")),
+        getattr(settings, "GMAIL_BLOB_STORE_MAX_BYTES", 512 * 1024 * 1024),
+    )
@@ -0,0 +1,403 @@
+"""
+Email-to-application classifier.
+
+Reads the messages of a user's Gmail mirror (see sync.py), links each one
+to the job application it is about and classifies it as a rejection, an
+interview invitation or an offer; classified messages then move their
+application's status forward (applied -> interview, rejected, accepted).
+
+Both steps are offline and rule based, so thousands of messages are
+processed per second on one core:
+- CompanyIndex is built once per run from the user's applications. It maps
+  company names (lowercased, legal suffixes dropped) and their compact
+  forms to applications, so a message is matched by its sender's domain
+  ("careers@acme.com"), or failing that by the company name appearing in
+  the sender name, subject or text. Applications at the same company are
+  told apart by position words.
+- classify_text scores weighted keyword phrases per category in the
+  subject and text (the snippet, plus the body when it has been fetched).
+
+Messages are processed oldest first, in batches; status changes of a
+batch are written with one bulk update (job_tracker.bulk), which also
+records the status transitions and updates stats and indexes. Statuses
+only move forward: an interview invitation does not reopen a rejected
+application, and nothing changes a withdrawn one.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from email.utils import parseaddr
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from job_tracker import bulk
+from job_tracker.models import JobApplication
+
+from .models import GmailMessage
+
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:[&'][a-z0-9]+)*")
+
+# Dropped from company names before indexing ("Acme Inc." -> "acme")
+COMPANY_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "gmbh", "ag", "sa", "holdings", "group",
+}
+
+# Domain labels that say nothing about the company
+GENERIC_DOMAIN_LABELS = {
+    "com", "org", "net", "io", "co", "ai", "uk", "ca", "us", "de", "fr", "in", "au", "edu", "gov",
+    "mail", "email", "em", "e", "careers", "career", "jobs", "job", "talent", "recruiting", "recruitment",
+    "hr", "hire", "hiring", "notifications", "notification", "noreply", "no-reply", "info", "team", "people",
+    "apply", "mg", "sendgrid", "mailer",
+}
+
+# Applicant tracking systems and mail providers send on behalf of many
+# companies; their domains are not matched
+SHARED_SENDER_DOMAINS = (
+    "greenhouse.io", "greenhouse-mail.io", "lever.co", "myworkday.com", "myworkdayjobs.com", "workday.com",
+    "smartrecruiters.com", "icims.com", "taleo.net", "ashbyhq.com", "jobvite.com", "bamboohr.com",
+    "workablemail.com", "workable.com", "recruitee.com", "linkedin.com", "indeed.com", "indeedemail.com",
+    "glassdoor.com", "ziprecruiter.com", "gmail.com", "googlemail.com", "outlook.com", "hotmail.com",
+    "yahoo.com", "icloud.com",
+)
+
+# Characters of the body scanned; the decision is almost always near the top
+MAX_TEXT_CHARS = 3000
+
+# Category -> weighted phrases. Subject matches count double.
+RULES = {
+    "rejection": [
+        ("unfortunately", 2),
+        ("regret to inform", 3),
+        ("not to move forward", 3),
+        ("not be moving forward", 3),
+        ("not moving forward", 3),
+        ("will not be proceeding", 3),
+        ("decided not to proceed", 3),
+        ("decided to pursue other candidates", 3),
+        ("move forward with other candidates", 3),
+        ("moving forward with other candidates", 3),
+        ("other candidates whose", 2),
+        ("not been selected", 3),
+        ("were not selected", 3),
+        ("no longer under consideration", 3),
+        ("position has been filled", 3),
+        ("unable to offer you", 3),
+        ("not a fit at this time", 2),
+    ],
+    "interview": [
+        ("invite you to interview", 3),
+        ("invite you for an interview", 3),
+        ("like to invite you", 2),
+        ("interview invitation", 3),
+        ("invitation to interview", 3),
+        ("schedule an interview", 3),
+        ("schedule a call", 2),
+        ("schedule a time", 2),
+        ("phone screen", 2),
+        ("technical interview", 2),
+        ("onsite interview", 2),
+        ("video interview", 2),
+        ("next round", 2),
+        ("next steps in the process", 1),
+        ("your availability", 1),
+        ("book a time", 2),
+        ("calendly", 1),
+    ],
+    "offer": [
+        ("pleased to offer", 3),
+        ("excited to offer", 3),
+        ("delighted to offer", 3),
+        ("extend an offer", 3),
+        ("extend you an offer", 3),
+        ("offer letter", 3),
+        ("offer of employment", 3),
+        ("job offer", 2),
+        ("congratulations", 1),
+    ],
+}
+
+# Messages matching these are never classified (alerts and marketing
+# mention interviews and offers without being about an application)
+IGNORE_PHRASES = [
+    "job alert", "jobs you may be interested in", "recommended jobs", "new jobs for you", "newsletter",
+    "webinar", "limited time offer", "special offer",
+]
+
+# Minimum score for a category to apply
+MIN_SCORE = 2
+
+# Ties between categories go to the first one
+CATEGORY_PRECEDENCE = ["rejection", "offer", "interview"]
+
+CATEGORY_STATUS = {"rejection": "rejected", "interview": "interview", "offer": "accepted"}
+
+# Statuses each new status may be reached from by an email
+ALLOWED_FROM = {
+    "interview": {"applied"},
+    "rejected": {"applied", "interview"},
+    "accepted": {"applied", "interview"},
+}
+
+BATCH_SIZE = 1000
+
+
+# Category of ignored messages in PHRASE_PATTERN matches
+IGNORE = "ignore"
+
+
+def _phrase_regex(phrases: Iterable[str]) -> re.Pattern:
+    alternatives = sorted((re.escape(phrase) for phrase in phrases), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b")
+
+
+# Phrase -> (category, weight); every phrase belongs to one category, so a
+# single pass over the text scores all of them
+PHRASE_WEIGHTS = {phrase: (IGNORE, 0) for phrase in IGNORE_PHRASES}
+for _category, _rules in RULES.items():
+    PHRASE_WEIGHTS.update((phrase, (_category, weight)) for phrase, weight in _rules)
+PHRASE_PATTERN = _phrase_regex(PHRASE_WEIGHTS)
+
+
+def classify_text(subject: str, text: str) -> Optional[str]:
+    """
+    Classify a message by its subject and text.
+
+    Returns:
+        str: 'rejection', 'interview', 'offer', '' (none of them), or None
+            for alerts and marketing that should not be linked to applications
+    """
+    scores = dict.fromkeys(CATEGORY_PRECEDENCE, 0)
+    # Each phrase counts once however often it appears
+    for multiplier, part in ((2, subject), (1, (text or "")[:MAX_TEXT_CHARS])):
+        for phrase in set(PHRASE_PATTERN.findall((part or "").lower())):
+            category, weight = PHRASE_WEIGHTS[phrase]
+            if category == IGNORE:
+                return None
+            scores[category] += multiplier * weight
+    best, best_score = "", MIN_SCORE - 1
+    for category in CATEGORY_PRECEDENCE:
+        if scores[category] > best_score:
+            best, best_score = category, scores[category]
+    return best
+
+
+def _words(text: str) -> List[str]:
+    return WORD_RE.findall((text or "").lower())
+
+
+def company_key(name: str) -> Tuple[str, ...]:
+    """Return the words a company is indexed by ("Acme, Inc." -> ('acme',))."""
+    words = _words(name)
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return tuple(words)
+
+
+def sender_domain_labels(sender: str) -> List[str]:
+    """Return the informative labels of a sender's domain ([] for shared senders)."""
+    _name, address = parseaddr(sender or "")
+    domain = address.rpartition("@")[2].lower()
+    if not domain or any(domain == shared or domain.endswith("." + shared) for shared in SHARED_SENDER_DOMAINS):
+        return []
+    return [label for label in domain.split(".") if label not in GENERIC_DOMAIN_LABELS]
+
+
+@dataclass
+class IndexedApplication:
+    id: int
+    status: str
+    position_words: frozenset
+    applied_date: object
+
+
+class CompanyIndex:
+    """
+    Lookup of a user's applications by company, built once per run.
+
+    Args:
+        applications: (id, company_name, position, status, applied_date) rows
+    """
+
+    def __init__(self, applications: Iterable[Tuple]):
+        self.applications: Dict[int, IndexedApplication] = {}
+        self.phrases: Dict[Tuple[str, ...], List[int]] = {}
+        self.compact: Dict[str, List[int]] = {}
+        for pk, company_name, position, status, applied_date in applications:
+            self.applications[pk] = IndexedApplication(pk, status, frozenset(_words(position)), applied_date)
+            key = company_key(company_name)
+            if not key:
+                continue
+            self.phrases.setdefault(key, []).append(pk)
+            # Domains spell names without spaces, with or without the suffix
+            for compact in {"".join(key), "".join(_words(company_name))}:
+                self.compact.setdefault(compact, []).append(pk)
+        self.max_phrase = max((len(phrase) for phrase in self.phrases), default=0)
+
+    @classmethod
+    def for_user(cls, user_id: int) -> "CompanyIndex":
+        return cls(
+            JobApplication.objects.filter(user_id=user_id).order_by()
+            .values_list("id", "company_name", "position", "status", "applied_date")
+        )
+
+    def _scan(self, words: Sequence[str]) -> List[int]:
+        """Return the applications of the first company named in words (longest name wins)."""
+        for position in range(len(words)):
+            for length in range(min(self.max_phrase, len(words) - position), 0, -1):
+                found = self.phrases.get(tuple(words[position:position + length]))
+                if found:
+                    return found
+        return []
+
+    def candidates(self, sender: str, subject: str, text: str) -> List[int]:
+        """Return the applications of the company a message is from or about."""
+        for label in sender_domain_labels(sender):
+            found = self.compact.get(label)
+            if found:
+                return found
+        sender_name, _address = parseaddr(sender or "")
+        for part in (sender_name, subject, text[:MAX_TEXT_CHARS]):
+            found = self._scan(_words(part))
+            if found:
+                return found
+        return []
+
+    def match(self, sender: str, subject: str, text: str) -> Optional[int]:
+        """
+        Return the id of the application a message is about, or None.
+
+        Among applications at the same company, the one whose position shares
+        the most words with the subject and text wins, then open applications
+        over closed ones, then the most recent.
+        """
+        candidates = self.candidates(sender, subject, text)
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        words = set(_words(subject)) | set(_words(text[:MAX_TEXT_CHARS]))
+
+        def rank(pk):
+            application = self.applications[pk]
+            return (
+                len(application.position_words & words),
+                application.status in ("applied", "interview"),
+                application.applied_date,
+            )
+
+        return max(candidates, key=rank)
+
+
+@dataclass
+class Classification:
+    gmail_id: str
+    category: str
+    application_id: Optional[int]
+
+
+def classify_messages(rows: Iterable[Tuple], index: CompanyIndex) -> Iterator[Classification]:
+    """
+    Classify (gmail_id, sender, subject, snippet, text_body) rows lazily.
+
+    Every message except alerts and marketing is matched to an application;
+    the category is '' when it is not a rejection, interview invitation or
+    offer.
+    """
+    for gmail_id, sender, subject, snippet, text_body in rows:
+        text = f"{snippet}\n{text_body}" if text_body else snippet
+        category = classify_text(subject, text)
+        if category is None:
+            yield Classification(gmail_id, "", None)
+        else:
+            yield Classification(gmail_id, category, index.match(sender, subject, text))
+
+
+def status_changes(classifications: Iterable[Classification], index: CompanyIndex) -> Dict[int, str]:
+    """
+    Return the new status of each application the classifications move
+    forward, applying them in order to the statuses in the index.
+    """
+    changes = {}
+    for classification in classifications:
+        if not classification.category or classification.application_id is None:
+            continue
+        application = index.applications[classification.application_id]
+        new_status = CATEGORY_STATUS[classification.category]
+        if application.status in ALLOWED_FROM[new_status]:
+            application.status = new_status
+            changes[application.id] = new_status
+    return changes
+
+
+@dataclass
+class ClassifyResult:
+    messages: int = 0
+    matched: int = 0
+    categorized: int = 0
+    updated: int = 0
+
+    def as_dict(self):
+        return {
+            "messages": self.messages,
+            "matched": self.matched,
+            "categorized": self.categorized,
+            "updated": self.updated,
+        }
+
+
+def _pending(user, batch_size: int):
+    """Yield batches of unclassified messages, oldest first."""
+    while True:
+        batch = list(
+            GmailMessage.objects.filter(user=user, classified_at__isnull=True).order_by("internal_date", "id")
+            .values_list("gmail_id", "sender", "subject", "snippet", "text_body")[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+
+
+def classify_pending(user, batch_size: int = BATCH_SIZE) -> ClassifyResult:
+    """
+    Classify a user's unclassified mirrored messages and move the matched
+    applications' statuses forward.
+
+    Each batch is one transaction: the classifications are stored on the
+    messages and the status changes written with one bulk update.
+    """
+    result = ClassifyResult()
+    index = CompanyIndex.for_user(user.pk)
+    for batch in _pending(user, batch_size):
+        classifications = list(classify_messages(batch, index))
+        changes = status_changes(classifications, index)
+        now = timezone.now()
+        with transaction.atomic():
+            if changes:
+                outcome = bulk.bulk_update_applications(
+                    JobApplication.objects.filter(user=user),
+                    [{"id": pk, "status": status} for pk, status in changes.items()],
+                )
+                result.updated += outcome["updated"]
+            by_outcome: Dict[Tuple[str, Optional[int]], List[str]] = {}
+            for classification in classifications:
+                key = (classification.category, classification.application_id)
+                by_outcome.setdefault(key, []).append(classification.gmail_id)
+            # One UPDATE per distinct outcome; most messages share ('', None)
+            for (category, application_id), gmail_ids in by_outcome.items():
+                for start in range(0, len(gmail_ids), 500):
+                    GmailMessage.objects.filter(user=user, gmail_id__in=gmail_ids[start:start + 500]).update(
+                        category=category, application_id=application_id, classified_at=now,
+                    )
+        result.messages += len(classifications)
+        result.matched += sum(1 for c in classifications if c.application_id is not None)
+        result.categorized += sum(1 for c in classifications if c.category)
+    return result
+
+
+def reset_classifications(user) -> int:
+    """Mark all of a user's messages unclassified (statuses are left as they are)."""
+    return GmailMessage.objects.filter(user=user).update(category="", application=None, classified_at=None)
@@ -0,0 +1,520 @@
+"""
+Local stand-in for the Gmail REST API, for tests and benchmarks.
+
+FakeGmailServer serves a synthetic mailbox over HTTP with the same paths
+and JSON shapes as gmail.googleapis.com, so the real client code in
+gmail_service can run against it unchanged (see build_fake_service). It
+can add (optionally jittered) latency to every response, fail a fraction
+of requests with 429/503 and drop a fraction of connections, to exercise
+retries. Mailbox size, body size and MIME structure (nesting,
+attachments, forwarded copies) are set on the FakeMailbox.
+
+The mailbox can be changed while it is served (add_messages, delete,
+set_labels); every change is recorded in its history, so incremental sync
+can be tested through getProfile and history.list. expire_history makes
+history.list answer 404 for older history ids, like Gmail does once
+history has been purged.
+
+Usage:
+    with FakeGmailServer(FakeMailbox(1000), latency=0.02) as server:
+        service = build_fake_service(server.url)
+        ids = list_message_ids(service, max_results=100)
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import httplib2
+from googleapiclient.discovery import build
+
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Cyberdyne", "Soylent"]
+
+SUBJECTS = [
+    "Your application to {company}",
+    "Interview invitation - {company}",
+    "Update on your {company} application",
+    "Thank you for applying to {company}",
+    "{company} weekly newsletter",
+]
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def _leaf(mime_type: str, content, filename: str = "") -> Dict:
+    data = content if isinstance(content, bytes) else content.encode("utf-8")
+    headers = [{"name": "Content-Type", "value": f"{mime_type}; charset=UTF-8"}]
+    if filename:
+        headers.append({"name": "Content-Disposition", "value": f'attachment; filename="{filename}"'})
+    return {
+        "mimeType": mime_type,
+        "filename": filename,
+        "headers": headers,
+        "body": {"size": len(data), "data": base64.urlsafe_b64encode(data).decode("ascii")},
+    }
+
+
+def _multipart(mime_type: str, parts: List[Dict]) -> Dict:
+    return {"mimeType": mime_type, "filename": "", "headers": [], "body": {"size": 0}, "parts": parts}
+
+
+def mime_payload(text: str, html: str, depth: int = 0, attachments: int = 0, attachment_size: int = 0,
+                 forwarded: int = 0) -> Dict:
+    """
+    Build a MIME payload around a text/plain + text/html alternative.
+
+    Args:
+        depth: multipart/mixed levels the alternative is nested in; each
+            level starts with an attachment when attachments are requested
+        attachments: Attachments (application/octet-stream, sent inline)
+            added at the top level, after the body
+        attachment_size: Bytes per attachment
+        forwarded: Copies of the message forwarded inline (message/rfc822),
+            each nested in the previous one, after the body
+    """
+    blob = bytes(range(256)) * (attachment_size // 256 + 1)
+    blob = blob[:attachment_size]
+    body = _multipart("multipart/alternative", [_leaf("text/plain", text), _leaf("text/html", html)])
+    for level in range(depth):
+        leading = [_leaf("application/octet-stream", blob, f"nested-{level}.bin")] if attachments else []
+        body = _multipart("multipart/mixed", leading + [body])
+
+    thread = None
+    for _ in range(forwarded):
+        inner = [_leaf("text/plain", text), _leaf("text/html", html)] + ([thread] if thread else [])
+        thread = _multipart("message/rfc822", [_multipart("multipart/mixed", inner)])
+
+    parts = [body]
+    if thread:
+        parts.append(thread)
+    parts += [_leaf("application/octet-stream", blob, f"attachment-{i}.bin") for i in range(attachments)]
+    payload = _multipart("multipart/mixed", parts) if len(parts) > 1 else body
+    payload["partId"] = ""
+    return payload
+
+
+FIELD_NAME_RE = re.compile(r"[\w/]+")
+
+
+def parse_fields(mask: str) -> Dict:
+    """
+    Parse a partial-response mask ("id,payload/headers,a(b,c)") into a tree
+    of {name: subtree}, where a None subtree selects the whole value.
+    """
+    pos = 0
+
+    def parse_list():
+        nonlocal pos
+        tree: Dict = {}
+        while pos < len(mask) and mask[pos] != ")":
+            match = FIELD_NAME_RE.match(mask, pos)
+            if not match:
+                raise ValueError(f"Invalid fields mask: {mask!r}")
+            pos = match.end()
+            subtree = None
+            if pos < len(mask) and mask[pos] == "(":
+                pos += 1
+                subtree = parse_list()
+                pos += 1  # ")"
+            *parents, name = match.group().split("/")
+            node = tree
+            for parent in parents:
+                node = node.setdefault(parent, {})
+                if node is None:
+                    break
+            else:
+                node[name] = subtree
+            if pos < len(mask) and mask[pos] == ",":
+                pos += 1
+        return tree
+
+    return parse_list()
+
+
+def apply_fields(value, tree: Optional[Dict]):
+    """Keep only the parts of a JSON value selected by a parse_fields tree."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {name: apply_fields(value[name], subtree) for name, subtree in tree.items() if name in value}
+    return value
+
+
+class FakeMailbox:
+    """
+    A deterministic synthetic mailbox of `size` messages, newest first.
+
+    Message i has id f"{i:016x}" and a multipart/alternative payload with a
+    text/plain and a text/html body of roughly `body_size` characters. The
+    remaining arguments make the MIME tree more complex (see mime_payload).
+    The mailbox starts at history id `size`.
+    """
+
+    def __init__(self, size: int = 100, body_size: int = 2000, seed: int = 0, mime_depth: int = 0,
+                 attachments: int = 0, attachment_size: int = 0, forwarded: int = 0):
+        self.size = size
+        self.body_size = body_size
+        self.seed = seed
+        self.mime_options = {
+            "depth": mime_depth,
+            "attachments": attachments,
+            "attachment_size": attachment_size,
+            "forwarded": forwarded,
+        }
+        self.start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.history_id = size
+        # History records after this id are still available
+        self.history_floor = size
+        self.history: List[Dict] = []
+        self._deleted = set()
+        self._labels: Dict[str, List[str]] = {}
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def ids(self) -> List[str]:
+        """Inbox message ids, newest first (the order Gmail lists them in)."""
+        with self._lock:
+            return [
+                message_id for message_id in (f"{i:016x}" for i in range(self.size - 1, -1, -1))
+                if message_id not in self._deleted and "INBOX" in self._labels.get(message_id, ["INBOX"])
+            ]
+
+    def _record(self, key: str, message_id: str, labels: Optional[List[str]] = None):
+        # Called with the lock held
+        self.history_id += 1
+        message = {"id": message_id, "threadId": message_id}
+        if labels is not None:
+            message["labelIds"] = labels
+        self.history.append({"id": str(self.history_id), "messages": [message], key: [{"message": message}]})
+
+    def add_messages(self, count: int) -> List[str]:
+        """Deliver `count` new inbox messages; returns their ids."""
+        with self._lock:
+            added = []
+            for index in range(self.size, self.size + count):
+                message_id = f"{index:016x}"
+                self._record("messagesAdded", message_id, ["INBOX"])
+                added.append(message_id)
+            self.size += count
+            return added
+
+    def delete(self, message_ids: List[str]):
+        """Permanently delete messages."""
+        with self._lock:
+            for message_id in message_ids:
+                self._deleted.add(message_id)
+                self._encoded.pop(message_id, None)
+                self._record("messagesDeleted", message_id)
+
+    def set_labels(self, message_id: str, labels: List[str]):
+        """Replace a message's labels (removing INBOX archives it)."""
+        with self._lock:
+            old = self._labels.get(message_id, ["INBOX"])
+            self._labels[message_id] = list(labels)
+            self._encoded.pop(message_id, None)
+            if set(labels) - set(old):
+                self._record("labelsAdded", message_id, list(labels))
+            if set(old) - set(labels):
+                self._record("labelsRemoved", message_id, list(labels))
+
+    def expire_history(self):
+        """Purge all history, so older history ids can no longer be synced from."""
+        with self._lock:
+            self.history_floor = self.history_id
+            self.history = []
+
+    def history_since(self, start_history_id: int) -> Optional[List[Dict]]:
+        """History records after start_history_id, or None if they were purged."""
+        with self._lock:
+            if start_history_id < self.history_floor:
+                return None
+            return [record for record in self.history if int(record["id"]) > start_history_id]
+
+    def message(self, message_id: str) -> Optional[Dict]:
+        """Return the full message resource, or None for unknown ids."""
+        try:
+            index = int(message_id, 16)
+        except ValueError:
+            return None
+        if not 0 <= index < self.size or message_id in self._deleted:
+            return None
+
+        rng = random.Random(self.seed * 1_000_003 + index)
+        company = COMPANIES[index % len(COMPANIES)]
+        subject = SUBJECTS[rng.randrange(len(SUBJECTS))].format(company=company)
+        sent = self.start + timedelta(minutes=index)
+        paragraph = f"Hello, this is message {index} from {company} about your application. "
+        text = (paragraph * (self.body_size // len(paragraph) + 1))[: self.body_size]
+        html = f"<html><body><p>{text}</p></body></html>"
+        headers = [
+            {"name": "From", "value": f"{company} Careers <careers@{company.lower()}.com>"},
+            {"name": "To", "value": "me@example.com"},
+            {"name": "Subject", "value": subject},
+            {"name": "Date", "value": format_datetime(sent)},
+            {"name": "Message-ID", "value": f"<{index}@{company.lower()}.com>"},
+        ]
+        payload = mime_payload(text, html, **self.mime_options)
+        payload["headers"] = headers
+        return {
+            "id": message_id,
+            "threadId": message_id,
+            "labelIds": self._labels.get(message_id, ["INBOX"]),
+            "snippet": text[:100],
+            "historyId": str(index + 1),
+            "internalDate": str(int(sent.timestamp() * 1000)),
+            "sizeEstimate": len(text) + len(html) + 500,
+            "payload": payload,
+        }
+
+    def formatted(self, message_id: str, format: str = "full",
+                  metadata_headers: Optional[List[str]] = None) -> Optional[Dict]:
+        """Return the message resource as messages.get would for `format`."""
+        message = self.message(message_id)
+        if message is None or format == "full":
+            return message
+        payload = message.pop("payload")
+        if format == "metadata":
+            wanted = {name.lower() for name in metadata_headers or []}
+            headers = [h for h in payload["headers"] if not wanted or h["name"].lower() in wanted]
+            message["payload"] = {
+                "partId": "", "mimeType": payload["mimeType"], "filename": "", "headers": headers, "body": {"size": 0},
+            }
+        return message
+
+    def encoded(self, message_id: str) -> Optional[bytes]:
+        """Return the full message as JSON bytes (built once per id)."""
+        with self._lock:
+            body = self._encoded.get(message_id)
+        if body is None:
+            message = self.message(message_id)
+            if message is None:
+                return None
+            body = json.dumps(message).encode("utf-8")
+            with self._lock:
+                self._encoded[message_id] = body
+        return body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs
+    # add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    MESSAGE_RE = re.compile(r"^/gmail/v1/users/[^/]+/messages/([^/]+)$")
+    LIST_RE = re.compile(r"^/gmail/v1/users/[^/]+/messages$")
+    PROFILE_RE = re.compile(r"^/gmail/v1/users/[^/]+/profile$")
+    HISTORY_RE = re.compile(r"^/gmail/v1/users/[^/]+/history$")
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(status, len(body))
+
+    def _send_error(self, status: int, reason: str, message: str, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps({
+            "error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}
+        }).encode("utf-8")
+        self._send_json(status, body, headers)
+
+    def do_GET(self):
+        server = self.server
+        delay = server.response_delay()
+        if delay:
+            time.sleep(delay)
+        if server.injected_drop():
+            # Close the connection without answering, like a reset
+            self.close_connection = True
+            return
+        failure = server.injected_failure()
+        if failure == 429:
+            return self._send_error(429, "rateLimitExceeded", "Too many requests", {"Retry-After": "0"})
+        if failure:
+            return self._send_error(failure, "backendError", "Backend error")
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        match = self.MESSAGE_RE.match(url.path)
+        if match:
+            body = self._message(match.group(1), query)
+            if body is None:
+                return self._send_error(404, "notFound", "Requested entity was not found.")
+            return self._send_json(200, body)
+        if self.LIST_RE.match(url.path):
+            return self._send_json(200, json.dumps(self._list_page(query)).encode("utf-8"))
+        if self.PROFILE_RE.match(url.path):
+            mailbox = server.mailbox
+            profile = {
+                "emailAddress": "me@example.com",
+                "messagesTotal": len(mailbox.ids()),
+                "historyId": str(mailbox.history_id),
+            }
+            return self._send_json(200, json.dumps(profile).encode("utf-8"))
+        if self.HISTORY_RE.match(url.path):
+            page = self._history_page(query)
+            if page is None:
+                return self._send_error(404, "notFound", "Requested entity was not found.")
+            return self._send_json(200, json.dumps(page).encode("utf-8"))
+        return self._send_error(404, "notFound", "Unknown path")
+
+    def _message(self, message_id, query) -> Optional[bytes]:
+        mailbox = self.server.mailbox
+        format = query.get("format", ["full"])[0]
+        fields = query.get("fields", [None])[0]
+        if format == "full" and not fields:
+            # The common case is served from the per-message cache
+            return mailbox.encoded(message_id)
+        message = mailbox.formatted(message_id, format, query.get("metadataHeaders"))
+        if message is None:
+            return None
+        if fields:
+            message = apply_fields(message, parse_fields(fields))
+        return json.dumps(message).encode("utf-8")
+
+    def _history_page(self, query):
+        mailbox = self.server.mailbox
+        records = mailbox.history_since(int(query["startHistoryId"][0]))
+        if records is None:
+            return None
+        max_results = min(int(query.get("maxResults", ["100"])[0]), 500)
+        start = int(query.get("pageToken", ["0"])[0] or 0)
+        response = {"history": records[start:start + max_results], "historyId": str(mailbox.history_id)}
+        if start + max_results < len(records):
+            response["nextPageToken"] = str(start + max_results)
+        return response
+
+    def _list_page(self, query):
+        ids = self.server.mailbox.ids()
+        max_results = min(int(query.get("maxResults", ["100"])[0]), 500)
+        start = int(query.get("pageToken", ["0"])[0] or 0)
+        page = ids[start:start + max_results]
+        response = {
+            "messages": [{"id": message_id, "threadId": message_id} for message_id in page],
+            "resultSizeEstimate": len(ids),
+        }
+        if start + max_results < len(ids):
+            response["nextPageToken"] = str(start + max_results)
+        return response
+
+
+class FakeGmailServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server for a FakeMailbox.
+
+    Args:
+        mailbox: Messages to serve
+        latency: Seconds added to every response
+        jitter: Up to this many more seconds added at random to each response
+        error_rate: Fraction of requests answered with an injected 429 or 503
+        drop_rate: Fraction of requests whose connection is closed unanswered
+        seed: Seed of the latency and error injection
+        port: Port to listen on (0 picks a free one)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, mailbox: FakeMailbox, latency: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 0, port: int = 0, jitter: float = 0.0, drop_rate: float = 0.0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.mailbox = mailbox
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self.errors = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def response_delay(self) -> float:
+        """Return the seconds to wait before the next response."""
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._rng.uniform(0, self.jitter)
+
+    def injected_drop(self) -> bool:
+        """Return whether to drop the next request's connection (counted in dropped)."""
+        if not self.drop_rate:
+            return False
+        with self._lock:
+            if self._rng.random() < self.drop_rate:
+                self.dropped += 1
+                return True
+        return False
+
+    def injected_failure(self) -> int:
+        """Return 429, 503 or 0 (no failure) for the next request."""
+        with self._lock:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self._rng.choice([429, 503])
+        return 0
+
+    def record(self, status: int, size: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += size
+            if status >= 400:
+                self.errors += 1
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = self.errors = self.dropped = self.bytes_sent = 0
+
+    def start(self) -> "FakeGmailServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-gmail", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeGmailServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def build_fake_service(url: str):
+    """Build a Gmail API client that talks to a FakeGmailServer at url."""
+    return build(
+        "gmail", "v1",
+        http=httplib2.Http(),
+        client_options={"api_endpoint": url},
+        static_discovery=True,
+        cache_discovery=False,
+    )
@@ -0,0 +1,383 @@
+"""
+Asyncio variant of the Gmail service layer.
+
+gmail_service blocks its thread for every Gmail round trip. The functions
+here run on an event loop instead, so one worker process can serve many
+mailbox fetches at once (see the gmail_messages view, and serve the
+project with uvicorn jobtracker.asgi:application).
+
+A fetch is a pipeline of three stages joined by bounded queues:
+
+    list (pages of ids) -> fetch (N workers) -> decode (JSON + MIME)
+
+Fetching starts as soon as the first page of ids is listed, and a slow
+stage applies backpressure to the one before it instead of buffering the
+whole mailbox. Every request first takes its cost in Gmail quota units
+from the user's token bucket (QUOTA_UNITS), so concurrent fetches of the
+same user stay under Gmail's per-user rate limit instead of running into
+429s. Failed requests are retried like in gmail_service.
+
+HTTP/1.1 is spoken directly over asyncio streams with h11, using a small
+pool of keep-alive connections per client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import ssl
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+
+import h11
+import httplib2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from googleapiclient.errors import HttpError
+
+from .gmail_service import (
+    BACKOFF_BASE, FETCH_WORKERS, HTTP_TIMEOUT, LIST_HEADERS, MAX_RETRIES, METADATA_FIELDS, _backoff_delay,
+    _is_retryable, get_gmail_service, invalidate_gmail_service, normalize_message, service_cache, summarize_message,
+)
+
+
+GMAIL_API_URL = "https://gmail.googleapis.com"
+
+# Gmail quota units charged per method
+QUOTA_UNITS = {
+    "messages.list": 5,
+    "messages.get": 5,
+    "history.list": 2,
+    "getProfile": 1,
+}
+
+# Items buffered between pipeline stages, per fetch worker
+QUEUE_SIZE_PER_WORKER = 2
+
+_DONE = object()
+
+
+def get_quota_rate() -> float:
+    """Return the quota units per second a user may spend (Gmail allows 250)."""
+    return getattr(settings, "GMAIL_QUOTA_UNITS_PER_SECOND", 250)
+
+
+class TokenBucket:
+    """
+    Token bucket of quota units: refills at `rate` units per second up to
+    `capacity`.
+
+    acquire() reserves its units right away, letting the balance go
+    negative, and sleeps until the reservation is covered; waiters are
+    therefore served in order without a loop-bound asyncio lock, so one
+    bucket can be shared by requests running on different event loops.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, units: float) -> float:
+        """Take units and return the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= units
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    async def acquire(self, units: float):
+        delay = self.reserve(units)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+_buckets: Dict[Any, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def quota_bucket(key) -> TokenBucket:
+    """Return the process-wide token bucket of a user (or other quota key)."""
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(get_quota_rate())
+        return bucket
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.h11 = h11.Connection(h11.CLIENT)
+
+    async def request(self, host: str, target: str, headers: List[Tuple[str, str]]) -> Tuple[int, Dict[str, str], bytes]:
+        conn = self.h11
+        data = conn.send(h11.Request(method="GET", target=target, headers=[("Host", host)] + headers))
+        data += conn.send(h11.EndOfMessage())
+        self.writer.write(data)
+        await self.writer.drain()
+
+        status, response_headers, body = 0, {}, bytearray()
+        while True:
+            event = conn.next_event()
+            if event is h11.NEED_DATA:
+                conn.receive_data(await self.reader.read(65536))
+            elif isinstance(event, h11.Response):
+                status = event.status_code
+                response_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in event.headers}
+            elif isinstance(event, h11.Data):
+                body += event.data
+            elif isinstance(event, h11.EndOfMessage):
+                break
+        if response_headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        return status, response_headers, bytes(body)
+
+    def start_next_cycle(self) -> bool:
+        """Prepare the connection for another request; False if it can't be reused."""
+        if self.h11.our_state is h11.DONE and self.h11.their_state is h11.DONE:
+            self.h11.start_next_cycle()
+            return True
+        return False
+
+    def close(self):
+        self.writer.close()
+
+
+def _load_credentials(user):
+    """Load (and refresh if needed) the user's cached credentials; None without a Google login."""
+    if get_gmail_service(user) is None:
+        return None
+    return service_cache.peek_credentials(user.pk)
+
+
+class AsyncGmailClient:
+    """
+    Minimal async Gmail REST client with a keep-alive connection pool.
+
+    Args:
+        access_token: OAuth access token (None for the fake server)
+        base_url: API root, e.g. GMAIL_API_URL or a FakeGmailServer's url
+        quota_key: Key of the token bucket requests are charged to
+            (None disables rate limiting)
+        max_connections: Connections opened at most at once
+    """
+
+    def __init__(self, access_token: Optional[str] = None, base_url: str = GMAIL_API_URL, quota_key=None,
+                 max_connections: int = FETCH_WORKERS, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE):
+        url = urlsplit(base_url)
+        self.scheme = url.scheme
+        self.hostname = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.host = url.netloc
+        self.headers = [("Accept-Encoding", "gzip"), ("User-Agent", "knead-a-job (gzip)")]
+        if access_token:
+            self.headers.append(("Authorization", f"Bearer {access_token}"))
+        self.bucket = quota_bucket(quota_key) if quota_key is not None else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.requests = 0
+
+    @classmethod
+    async def for_user(cls, user, **kwargs) -> Optional["AsyncGmailClient"]:
+        """
+        Client authorized as user, or None without usable Google credentials.
+
+        The (cached) service is loaded through gmail_service so an expired
+        token is refreshed, once, before its credentials are read from the
+        service cache.
+        """
+        creds = await sync_to_async(_load_credentials)(user)
+        if creds is None:
+            return None
+        return cls(creds.token, quota_key=user.pk, **kwargs)
+
+    async def _connect(self) -> _Connection:
+        context = ssl.create_default_context() if self.scheme == "https" else None
+        reader, writer = await asyncio.open_connection(self.hostname, self.port, ssl=context)
+        return _Connection(reader, writer)
+
+    async def _send(self, target: str) -> Tuple[int, Dict[str, str], bytes]:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                response = await asyncio.wait_for(
+                    connection.request(self.host, target, self.headers), HTTP_TIMEOUT
+                )
+            except (h11.ProtocolError, OSError, asyncio.IncompleteReadError) as e:
+                connection.close()
+                # Retryable like a dropped connection (see _is_retryable)
+                raise ConnectionError(f"Gmail connection failed: {e!r}") from e
+            except BaseException:
+                # Cancelled mid-response: the connection can't be reused
+                connection.close()
+                raise
+            if connection.start_next_cycle():
+                self._idle.append(connection)
+            else:
+                connection.close()
+            return response
+
+    async def get(self, path: str, params: Dict[str, Any], method: str) -> Dict[str, Any]:
+        """
+        GET a Gmail API path and return the decoded JSON.
+
+        Transient failures are retried with backoff; others raise HttpError
+        like the googleapiclient requests do.
+        """
+        query = urlencode({key: value for key, value in params.items() if value is not None}, doseq=True)
+        target = f"{path}?{query}" if query else path
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                await self.bucket.acquire(QUOTA_UNITS[method])
+            self.requests += 1
+            try:
+                status, headers, body = await self._send(target)
+                if status >= 400:
+                    raise HttpError(httplib2.Response({**headers, "status": status}), body, uri=target)
+                return json.loads(body)
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                await asyncio.sleep(_backoff_delay(e, attempt, self.backoff_base))
+                attempt += 1
+
+    async def list_messages_page(self, q: str = "", max_results: int = 100, page_token: Optional[str] = None):
+        return await self.get(
+            "/gmail/v1/users/me/messages",
+            {"q": q or None, "maxResults": max_results, "pageToken": page_token},
+            "messages.list",
+        )
+
+    async def get_message(self, message_id: str, format: str = "full", metadata_headers: Optional[List[str]] = None,
+                          fields: Optional[str] = None) -> Dict[str, Any]:
+        return await self.get(
+            f"/gmail/v1/users/me/messages/{quote(message_id, safe='')}",
+            {"format": format, "metadataHeaders": metadata_headers, "fields": fields},
+            "messages.get",
+        )
+
+    async def aclose(self):
+        for connection in self._idle:
+            connection.close()
+        self._idle = []
+
+    async def __aenter__(self) -> "AsyncGmailClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+async def _list_stage(client: AsyncGmailClient, q: str, max_results: int, ids: asyncio.Queue, workers: int):
+    """Put (position, id) for each listed message, then one _DONE per fetch worker."""
+    position = 0
+    page_token = None
+    while position < max_results:
+        page = await client.list_messages_page(q, min(500, max_results - position), page_token)
+        for message in page.get("messages", [])[: max_results - position]:
+            await ids.put((position, message["id"]))
+            position += 1
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            break
+    for _ in range(workers):
+        await ids.put(_DONE)
+
+
+async def _fetch_stage(client: AsyncGmailClient, ids: asyncio.Queue, raw: asyncio.Queue, params: Dict[str, Any]):
+    while True:
+        item = await ids.get()
+        if item is _DONE:
+            await raw.put(_DONE)
+            return
+        position, message_id = item
+        await raw.put((position, await client.get_message(message_id, **params)))
+
+
+async def _decode_stage(raw: asyncio.Queue, workers: int, decode, results: Dict[int, Dict[str, Any]]):
+    remaining = workers
+    while remaining:
+        item = await raw.get()
+        if item is _DONE:
+            remaining -= 1
+            continue
+        position, message = item
+        results[position] = decode(message)
+
+
+async def fetch_pipeline(client: AsyncGmailClient, q: str = "", max_results: int = 10, include_bodies: bool = True,
+                         workers: int = FETCH_WORKERS) -> List[Dict[str, Any]]:
+    """
+    List, fetch and decode messages through the staged pipeline.
+
+    Returns the normalized messages of gmail_service.fetch_messages (with
+    include_bodies) or the summaries of gmail_service.list_messages, in
+    listing order. If any stage fails, the others are cancelled and the
+    error is raised.
+    """
+    if include_bodies:
+        params, decode = {"format": "full"}, normalize_message
+    else:
+        params = {"format": "metadata", "metadata_headers": LIST_HEADERS, "fields": METADATA_FIELDS}
+        decode = summarize_message
+
+    ids: asyncio.Queue = asyncio.Queue(maxsize=workers * QUEUE_SIZE_PER_WORKER)
+    raw: asyncio.Queue = asyncio.Queue(maxsize=workers * QUEUE_SIZE_PER_WORKER)
+    results: Dict[int, Dict[str, Any]] = {}
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(_list_stage(client, q, max_results, ids, workers))
+            for _ in range(workers):
+                group.create_task(_fetch_stage(client, ids, raw, params))
+            group.create_task(_decode_stage(raw, workers, decode, results))
+    except ExceptionGroup as group_error:
+        # Surface the first failure as the synchronous code would
+        raise group_error.exceptions[0]
+    return [results[position] for position in sorted(results)]
+
+
+async def aget_emails(user, query: str = "in:inbox newer_than:7d", max_results: int = 5,
+                      include_bodies: bool = True) -> Dict[str, Any]:
+    """
+    Async gmail_service.get_emails: same arguments (except save_html) and payload.
+    """
+    try:
+        client = await AsyncGmailClient.for_user(user)
+        if client is None:
+            return {
+                "success": False,
+                "count": 0,
+                "messages": [],
+                "error": "No valid Google credentials for this user.",
+            }
+        async with client:
+            messages = await fetch_pipeline(client, q=query, max_results=max_results, include_bodies=include_bodies)
+        return {
+            "success": True,
+            "count": len(messages),
+            "messages": messages,
+        }
+    except Exception as e:
+        if isinstance(e, HttpError) and e.resp.status == 401:
+            # Revoked or replaced token: reload credentials next time
+            invalidate_gmail_service(user.pk)
+        return {
+            "success": False,
+            "count": 0,
+            "messages": [],
+            "error": str(e),
+        }
@@ -2,7 +2,18 @@ from __future__ import annotations
 
 import os
 import base64
-from typing import List, Dict, Optional, Any
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone as dt_timezone
+from typing import Callable, List, Dict, Optional, Any, Tuple
+
+import httplib2
+import google_auth_httplib2
 
 from django.utils import timezone
 from allauth.socialaccount.models import SocialToken, SocialApp
@@ -10,11 +21,46 @@ from allauth.socialaccount.models import SocialToken, SocialApp
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from .blobstore import get_blob_store
 
 # ---- Config ----
 GMAIL_SCOPE_READONLY = "https://www.googleapis.com/auth/gmail.readonly"
 SCOPES = [GMAIL_SCOPE_READONLY]
 
+# Concurrent fetching: messages are fetched by a bounded pool of threads,
+# each with its own HTTP connection (httplib2 connections are not thread-safe)
+FETCH_WORKERS = 8
+HTTP_TIMEOUT = 30
+
+# Retry transient failures (rate limits, server errors, dropped connections)
+# with exponential backoff and jitter, honoring Retry-After when present
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 32.0
+
+# Listing fetches only these headers (format="metadata"); bodies are
+# fetched per message when needed (see fetch_message_bodies)
+LIST_HEADERS = ["From", "Subject", "Date"]
+# Partial-response masks: drop everything the summaries/bodies don't read
+METADATA_FIELDS = "id,threadId,labelIds,snippet,internalDate,payload/headers"
+BODY_FIELDS = "id,payload(mimeType,body/data,parts)"
+
+# Limits of extract_bodies: decoded bytes kept per body and per message,
+# and MIME parts visited per message
+MAX_BODY_BYTES = 1 << 20
+MAX_TOTAL_BODY_BYTES = 2 << 20
+MAX_MIME_PARTS = 1000
+# base64 characters decoded at a time (a multiple of 4)
+DECODE_CHUNK = 64 * 1024
+
+# Built services and credentials are cached per user (see ServiceCache)
+SERVICE_CACHE_SIZE = 256
+SERVICE_CACHE_TTL = 300  # seconds
+
 # ---- Token / Credentials ----
 def _load_allauth_credentials(user) -> Optional[Credentials]:
     """
@@ -29,6 +75,11 @@ def _load_allauth_credentials(user) -> Optional[Credentials]:
     # Many setups store refresh_token in token_secret (Google returns it only once)
     refresh_token = social_token.token_secret or None
 
+    # google-auth compares expiry as naive UTC; without it creds never report expired
+    expiry = social_token.expires_at
+    if expiry is not None and timezone.is_aware(expiry):
+        expiry = expiry.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
     creds = Credentials(
         token=social_token.token,
         refresh_token=refresh_token,
@@ -36,15 +87,17 @@ def _load_allauth_credentials(user) -> Optional[Credentials]:
         client_id=social_app.client_id,
         client_secret=social_app.secret,
         scopes=SCOPES,
+        expiry=expiry,
     )
     return creds
 
 
-def _maybe_refresh_and_persist(user, creds: Credentials) -> Credentials:
+def _maybe_refresh_and_persist(user, creds: Credentials, force: bool = False) -> Credentials:
     """
-    Refresh access token if needed, and persist updated access/expiry/refresh to SocialToken when possible.
+    Refresh access token if needed (or always, with force), and persist updated access/expiry/refresh to
+    SocialToken when possible.
     """
-    if creds and creds.expired and creds.refresh_token:
+    if creds and (force or creds.expired) and creds.refresh_token:
         # Refresh in-place
         creds.refresh(Request())
 
@@ -59,7 +112,9 @@ def _maybe_refresh_and_persist(user, creds: Credentials) -> Credentials:
                 social_token.token_secret = creds.refresh_token
             # Store expiry when available
             if creds.expiry:
-                social_token.expires_at = timezone.make_aware(creds.expiry) if timezone.is_naive(creds.expiry) else creds.expiry
+                social_token.expires_at = (
+                    creds.expiry.replace(tzinfo=dt_timezone.utc) if timezone.is_naive(creds.expiry) else creds.expiry
+                )
             social_token.save(update_fields=["token", "token_secret", "expires_at"])
         except Exception:
             # If persisting fails, keep going with refreshed creds
@@ -68,17 +123,231 @@ def _maybe_refresh_and_persist(user, creds: Credentials) -> Credentials:
     return creds
 
 
+class _SharedCredentials:
+    """
+    Credentials of a cached service, shared by all its transports.
+
+    AuthorizedHttp asks its credentials to refresh before a request once the
+    token has expired, and again after a 401. With plain Credentials every
+    thread would refresh on its own and nothing would be persisted; this
+    wrapper sends both through ServiceCache.refresh instead, which refreshes
+    (and persists) once per user and lets the other threads reuse the token.
+    """
+
+    def __init__(self, cache: "ServiceCache", user, credentials: Credentials):
+        self.cache = cache
+        self.user = user
+        self.credentials = credentials
+        # Token each thread last sent, so a 401 refreshes only if nobody has yet
+        self._local = threading.local()
+
+    def before_request(self, request, method, url, headers):
+        if self.credentials.expired and self.credentials.refresh_token:
+            self.cache.refresh(self.user, self.credentials, self.credentials.token)
+        self._local.token = self.credentials.token
+        self.credentials.apply(headers)
+
+    def refresh(self, request):
+        self.cache.refresh(self.user, self.credentials, getattr(self._local, "token", self.credentials.token))
+
+    def __getattr__(self, name):
+        return getattr(self.credentials, name)
+
+
+class _ThreadLocalHttp:
+    """
+    Authorized HTTP transport with one connection per thread.
+
+    httplib2 connections are not thread-safe, and a cached service is shared
+    by all request threads, so each thread lazily gets its own AuthorizedHttp
+    (which it then keeps alive across requests).
+    """
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    @property
+    def http(self) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT)
+            )
+        return http
+
+    def request(self, *args, **kwargs):
+        return self.http.request(*args, **kwargs)
+
+    def close(self):
+        http = getattr(self._local, "http", None)
+        if http is not None:
+            http.close()
+            self._local.http = None
+
+
+class _CachedService:
+    __slots__ = ("credentials", "service", "expires_at")
+
+    def __init__(self, credentials: Credentials, service, expires_at: float):
+        self.credentials = credentials
+        self.service = service
+        self.expires_at = expires_at
+
+
+class _UserLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Callers holding or waiting for the lock
+        self.users = 0
+
+
+class ServiceCache:
+    """
+    Process-wide LRU cache of Gmail services and credentials, keyed by user id.
+
+    A cache hit skips the SocialToken/SocialApp queries and the client build.
+    Entries expire after `ttl` seconds, so tokens changed by other processes
+    are picked up, and the least recently used entry is evicted beyond
+    `maxsize` users.
+
+    Loading and token refresh are single-flight per user: concurrent callers
+    wait on the user's lock, and only the first one queries the database or
+    refreshes (and persists) an expired token; the others reuse its result.
+    This covers refreshes started by the service's transports too (see
+    _SharedCredentials). A user's lock is kept while any caller holds or
+    waits for it, even if the user's entry is evicted meanwhile.
+    """
+
+    def __init__(self, maxsize: int = SERVICE_CACHE_SIZE, ttl: float = SERVICE_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[int, _CachedService]" = OrderedDict()
+        self._user_locks: Dict[int, _UserLock] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.refreshes = 0
+
+    @contextmanager
+    def _user_lock(self, user_id: int):
+        """Hold the user's lock; it is dropped once no caller holds or waits for it."""
+        with self._lock:
+            user_lock = self._user_locks.setdefault(user_id, _UserLock())
+            user_lock.users += 1
+        try:
+            with user_lock.lock:
+                yield
+        finally:
+            with self._lock:
+                user_lock.users -= 1
+                if not user_lock.users:
+                    del self._user_locks[user_id]
+
+    def _lookup(self, user_id: int) -> Optional[_CachedService]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= self.clock():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry
+
+    def _store(self, user_id: int, entry: _CachedService):
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _load(self, user) -> _CachedService:
+        creds = _load_allauth_credentials(user)
+        http = _ThreadLocalHttp(_SharedCredentials(self, user, creds))
+        service = build("gmail", "v1", http=http, cache_discovery=False)
+        return _CachedService(creds, service, self.clock() + self.ttl)
+
+    def get(self, user):
+        """
+        Return the user's Gmail service, loading it and refreshing its token as needed.
+
+        Raises:
+            SocialToken.DoesNotExist, SocialApp.DoesNotExist: If the user has no Google login
+        """
+        loaded = False
+        entry = self._lookup(user.pk)
+        if entry is None:
+            with self._user_lock(user.pk):
+                # Another caller may have loaded it while we waited
+                entry = self._lookup(user.pk)
+                if entry is None:
+                    entry = self._load(user)
+                    self._store(user.pk, entry)
+                    loaded = True
+        with self._lock:
+            if loaded:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        creds = entry.credentials
+        if creds.expired and creds.refresh_token:
+            self.refresh(user, creds, creds.token)
+        return entry.service
+
+    def refresh(self, user, credentials: Credentials, stale_token: Optional[str]) -> bool:
+        """
+        Refresh and persist a user's token, unless another caller already
+        replaced stale_token (the token the caller found expired or rejected).
+
+        Returns:
+            bool: Whether this call refreshed
+        """
+        with self._user_lock(user.pk):
+            # Only the first waiter refreshes; the rest find a new token
+            if credentials.token != stale_token or not credentials.refresh_token:
+                return False
+            _maybe_refresh_and_persist(user, credentials, force=True)
+            with self._lock:
+                self.refreshes += 1
+            return True
+
+    def put(self, user_id: int, service, credentials: Credentials, ttl: Optional[float] = None):
+        """Cache a ready-made service for a user, e.g. one talking to a fake Gmail server."""
+        self._store(user_id, _CachedService(credentials, service, self.clock() + (self.ttl if ttl is None else ttl)))
+
+    def peek_credentials(self, user_id: int) -> Optional[Credentials]:
+        """Return the cached credentials of a user without touching LRU order."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            return entry.credentials if entry is not None else None
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.refreshes = 0
+
+
+service_cache = ServiceCache()
+
+
 def get_gmail_service(user):
     """
     Authenticated Gmail API service for a given Django user (django-allauth).
     Refreshes tokens when expired and persists updates.
+
+    Services are cached per user (see ServiceCache); the returned service may
+    be shared with other threads.
     """
     try:
-        creds = _load_allauth_credentials(user)
-        if not creds:
-            return None
-        creds = _maybe_refresh_and_persist(user, creds)
-        return build("gmail", "v1", credentials=creds)
+        return service_cache.get(user)
     except SocialToken.DoesNotExist:
         return None
     except SocialApp.DoesNotExist:
@@ -87,14 +356,80 @@ def get_gmail_service(user):
         return None
 
 
+def invalidate_gmail_service(user_id: int):
+    """Drop a user's cached service, e.g. after their Google token changed."""
+    service_cache.invalidate(user_id)
+
+
 # ---- Helpers (match your preferred script) ----
 def list_message_ids(service, q: str = "", max_results: int = 10) -> List[Dict]:
     """
     Search using Gmail's query language (e.g., 'in:inbox newer_than:7d subject:invoice')
-    Returns minimal [{id, threadId}...] dicts.
+    Returns minimal [{id, threadId}...] dicts, following result pages up to max_results.
     """
-    resp = service.users().messages().list(userId="me", q=q, maxResults=max_results).execute()
-    return resp.get("messages", [])
+    messages: List[Dict] = []
+    page_token = None
+    while len(messages) < max_results:
+        request = service.users().messages().list(
+            userId="me", q=q, maxResults=min(max_results - len(messages), 500), pageToken=page_token
+        )
+        resp = execute_with_retry(request)
+        messages.extend(resp.get("messages", []))
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            break
+    return messages[:max_results]
+
+
+# ---- Retry / concurrency ----
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        if error.resp.status in RETRY_STATUSES:
+            return True
+        # Gmail reports some rate limits as 403 with a rateLimitExceeded reason
+        if error.resp.status == 403:
+            reasons = {detail.get("reason") for detail in (error.error_details or []) if isinstance(detail, dict)}
+            return bool(reasons & RATE_LIMIT_REASONS)
+        return False
+    return isinstance(error, (socket.timeout, ConnectionError, httplib2.HttpLib2Error))
+
+
+def _backoff_delay(error: Exception, attempt: int, backoff_base: float) -> float:
+    """Seconds to wait before retry number attempt + 1."""
+    if isinstance(error, HttpError):
+        retry_after = error.resp.get("retry-after")
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), BACKOFF_MAX)
+            except ValueError:
+                pass
+    # Full jitter keeps many workers from retrying in lockstep
+    return random.uniform(0, min(BACKOFF_MAX, backoff_base * (2 ** attempt)))
+
+
+def execute_with_retry(request, http=None, max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE,
+                       sleep: Callable[[float], None] = time.sleep):
+    """
+    Execute a googleapiclient request, retrying 429/5xx and connection errors
+    with exponential backoff. Other errors (and the last failure) are raised.
+    """
+    attempt = 0
+    while True:
+        try:
+            return request.execute(http=http)
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                raise
+            sleep(_backoff_delay(e, attempt, backoff_base))
+            attempt += 1
+
+
+def _new_http(service):
+    """A fresh HTTP connection authorized like the service's own (one per worker thread)."""
+    base = httplib2.Http(timeout=HTTP_TIMEOUT)
+    if isinstance(service._http, (google_auth_httplib2.AuthorizedHttp, _ThreadLocalHttp)):
+        return google_auth_httplib2.AuthorizedHttp(service._http.credentials, http=base)
+    return base
 
 
 def get_headers_map(headers_list) -> Dict[str, str]:
@@ -107,79 +442,257 @@ def b64url_decode(s: str) -> str:
     return base64.urlsafe_b64decode(s).decode("utf-8", errors="ignore")
 
 
-def extract_bodies(payload) -> Dict[str, str]:
+def b64url_decode_prefix(data: str, limit: int) -> Tuple[str, int, bool]:
     """
-    Recursively walk MIME tree to extract text/plain and text/html bodies.
+    Decode at most `limit` bytes of base64url data.
+
+    Only the base64 characters needed for `limit` bytes are read, in
+    DECODE_CHUNK pieces, into one preallocated buffer that is turned into
+    text through a memoryview; a huge body costs about twice `limit` bytes
+    instead of several copies of the whole body.
+
+    Returns:
+        tuple: (text, decoded byte count, whether data was cut short)
+    """
+    if not data or limit <= 0:
+        return "", 0, bool(data)
+    chars = min(len(data), -(-limit // 3) * 4)
+    buffer = bytearray(chars // 4 * 3 + 3)
+    size = 0
+    for start in range(0, chars, DECODE_CHUNK):
+        piece = data[start:min(start + DECODE_CHUNK, chars)]
+        decoded = base64.urlsafe_b64decode(piece + "=" * (-len(piece) % 4))
+        buffer[size:size + len(decoded)] = decoded
+        size += len(decoded)
+    truncated = len(data) > chars or size > limit
+    view = memoryview(buffer)[:min(size, limit)]
+    return str(view, "utf-8", "ignore"), len(view), truncated
+
+
+def is_attachment(part) -> bool:
+    """Whether a MIME part is an attachment (named, stored separately, or disposition attachment)."""
+    if part.get("filename") or (part.get("body") or {}).get("attachmentId"):
+        return True
+    for header in part.get("headers") or ():
+        if header.get("name", "").lower() == "content-disposition":
+            return header.get("value", "").lower().startswith("attachment")
+    return False
+
+
+def extract_bodies(payload, max_body_bytes: int = MAX_BODY_BYTES, max_total_bytes: int = MAX_TOTAL_BODY_BYTES,
+                   max_parts: int = MAX_MIME_PARTS) -> Dict[str, Any]:
     """
-    out = {"text": "", "html": ""}
+    Find the first text/plain and text/html bodies of a MIME tree.
 
-    def walk(part):
-        mime = part.get("mimeType", "")
-        body = part.get("body", {}) or {}
-        data = body.get("data", "")
+    The tree is walked iteratively in document order, and the walk stops
+    as soon as both bodies are found. Attachments are skipped with their
+    subparts, without decoding. Each body is decoded up to max_body_bytes,
+    all bodies together up to max_total_bytes, and at most max_parts parts
+    are visited.
 
-        if mime == "text/plain" and data and not out["text"]:
-            out["text"] = b64url_decode(data)
-        elif mime == "text/html" and data and not out["html"]:
-            out["html"] = b64url_decode(data)
+    Returns:
+        dict: text, html, and truncated (whether a limit cut anything short)
+    """
+    out = {"text": "", "html": "", "truncated": False}
+    if not payload:
+        return out
+
+    budget = max_total_bytes
+    stack = [payload]
+    visited = 0
+    while stack and not (out["text"] and out["html"]):
+        visited += 1
+        if visited > max_parts:
+            out["truncated"] = True
+            break
+        part = stack.pop()
+        if is_attachment(part):
+            continue
+        subparts = part.get("parts")
+        if subparts:
+            # Reversed so the first subpart is visited next
+            stack.extend(reversed(subparts))
+            continue
+        mime = (part.get("mimeType") or "").lower()
+        key = "text" if mime == "text/plain" else "html" if mime == "text/html" else None
+        data = (part.get("body") or {}).get("data")
+        if key is None or out[key] or not data:
+            continue
+        text, size, truncated = b64url_decode_prefix(data, min(max_body_bytes, budget))
+        out[key] = text
+        out["truncated"] = out["truncated"] or truncated
+        budget -= size
+
+    # Fallback: single-part messages sometimes put content directly in body.data
+    if not (out["text"] or out["html"]) and not payload.get("parts") and not is_attachment(payload):
+        data = (payload.get("body") or {}).get("data")
+        if data:
+            out["text"], _size, truncated = b64url_decode_prefix(data, min(max_body_bytes, budget))
+            out["truncated"] = out["truncated"] or truncated
+    return out
 
-        for sub in part.get("parts", []) or []:
-            walk(sub)
 
-        # Fallback: single-part messages sometimes put content directly in body.data
-        if not part.get("parts") and data and not (out["text"] or out["html"]):
-            out["text"] = b64url_decode(data)
+def normalize_message(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a full Gmail message resource to:
+    { id, from, date, subject, text_body, html_body }
+    """
+    payload = msg.get("payload", {})
+    hdrs = get_headers_map(payload.get("headers", []))
+    bodies = extract_bodies(payload)
 
-    if payload:
-        walk(payload)
-    return out
+    return {
+        "id": msg["id"],
+        "from": hdrs.get("from", ""),
+        "date": hdrs.get("date", ""),
+        "subject": hdrs.get("subject", ""),
+        "text_body": (bodies["text"] or "").strip(),
+        "html_body": (bodies["html"] or "").strip(),
+    }
 
 
-def fetch_messages(service, ids: List[Dict], save_html: bool = False) -> List[Dict[str, Any]]:
+def summarize_message(msg: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Fetch full messages and return normalized dicts:
-    { id, from, date, subject, text_body, html_body, html_file? }
+    Reduce a metadata (or full) Gmail message resource to:
+    { id, thread_id, label_ids, from, date, subject, snippet, internal_date }
+    where internal_date is milliseconds since the epoch (or None).
+    """
+    hdrs = get_headers_map(msg.get("payload", {}).get("headers", []))
+    internal_date = msg.get("internalDate")
+    return {
+        "id": msg["id"],
+        "thread_id": msg.get("threadId", ""),
+        "label_ids": msg.get("labelIds", []),
+        "from": hdrs.get("from", ""),
+        "date": hdrs.get("date", ""),
+        "subject": hdrs.get("subject", ""),
+        "snippet": msg.get("snippet", ""),
+        "internal_date": int(internal_date) if internal_date else None,
+    }
+
+
+def fetch_message_resources(service, ids: List[Dict], format: str = "full", workers: int = FETCH_WORKERS,
+                            max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE,
+                            skip_missing: bool = False, metadata_headers: Optional[List[str]] = None,
+                            fields: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Fetch Gmail message resources for ids, in order.
+
+    metadata_headers restricts the headers of format="metadata" responses and
+    fields is a partial-response mask (e.g. METADATA_FIELDS).
+
+    Up to `workers` messages are fetched at once, each worker thread with its
+    own connection; transient failures are retried per message (see
+    execute_with_retry). A message that still fails raises, except that with
+    skip_missing a message deleted in the meantime (404) comes back as None.
     """
     if not ids:
         return []
 
-    messages = []
-    for i, m in enumerate(ids, start=1):
-        msg = service.users().messages().get(userId="me", id=m["id"], format="full").execute()
-        payload = msg.get("payload", {})
-        hdrs = get_headers_map(payload.get("headers", []))
-        bodies = extract_bodies(payload)
-
-        from_h = hdrs.get("from", "")
-        date_h = hdrs.get("date", "")
-        subj_h = hdrs.get("subject", "")
-        text_body = (bodies["text"] or "").strip()
-        html_body = (bodies["html"] or "").strip()
-
-        item = {
-            "id": m["id"],
-            "from": from_h,
-            "date": date_h,
-            "subject": subj_h,
-            "text_body": text_body,
-            "html_body": html_body,
-        }
+    messages_api = service.users().messages()
+    local = threading.local()
+
+    def fetch(m):
+        http = getattr(local, "http", None)
+        if http is None:
+            http = local.http = _new_http(service)
+        params = {"userId": "me", "id": m["id"], "format": format}
+        if metadata_headers:
+            params["metadataHeaders"] = metadata_headers
+        if fields:
+            params["fields"] = fields
+        request = messages_api.get(**params)
+        try:
+            return execute_with_retry(request, http=http, max_retries=max_retries, backoff_base=backoff_base)
+        except HttpError as e:
+            if skip_missing and e.resp.status == 404:
+                return None
+            raise
+
+    workers = max(1, min(workers, len(ids)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gmail-fetch") as pool:
+        try:
+            return list(pool.map(fetch, ids))
+        except Exception:
+            # Don't keep fetching the rest once the result is known to fail
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def fetch_message_summaries(service, ids: List[Dict], workers: int = FETCH_WORKERS,
+                            skip_missing: bool = False) -> List[Optional[Dict[str, Any]]]:
+    """
+    Fetch the listing tier of messages: LIST_HEADERS, snippet and labels only,
+    no bodies (see summarize_message). In the order of ids; with skip_missing,
+    deleted messages come back as None.
+    """
+    resources = fetch_message_resources(
+        service, ids, format="metadata", workers=workers, skip_missing=skip_missing,
+        metadata_headers=LIST_HEADERS, fields=METADATA_FIELDS,
+    )
+    return [summarize_message(msg) if msg is not None else None for msg in resources]
+
 
-        if save_html and html_body:
-            fn = f"message_{i}.html"
-            with open(fn, "w", encoding="utf-8") as f:
-                f.write(html_body)
-            item["html_file"] = fn
+def fetch_message_bodies(service, ids: List[Dict], workers: int = FETCH_WORKERS,
+                         skip_missing: bool = False) -> List[Optional[Dict[str, Any]]]:
+    """
+    Fetch the body tier of messages: { id, text_body, html_body }, in the
+    order of ids; with skip_missing, deleted messages come back as None.
+    """
+    resources = fetch_message_resources(
+        service, ids, format="full", workers=workers, skip_missing=skip_missing, fields=BODY_FIELDS,
+    )
+    bodies = []
+    for msg in resources:
+        if msg is None:
+            bodies.append(None)
+            continue
+        decoded = extract_bodies(msg.get("payload", {}))
+        bodies.append({
+            "id": msg["id"],
+            "text_body": (decoded["text"] or "").strip(),
+            "html_body": (decoded["html"] or "").strip(),
+        })
+    return bodies
+
+
+def list_messages(service, q: str = "", max_results: int = 10, workers: int = FETCH_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Search and return message summaries (no bodies), newest first.
+    """
+    ids = list_message_ids(service, q=q, max_results=max_results)
+    return [summary for summary in fetch_message_summaries(service, ids, workers=workers, skip_missing=True) if summary]
+
+
+def fetch_messages(service, ids: List[Dict], save_html: bool = False, workers: int = FETCH_WORKERS,
+                   max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE) -> List[Dict[str, Any]]:
+    """
+    Fetch full messages concurrently and return normalized dicts, in the order of ids:
+    { id, from, date, subject, text_body, html_body, html_blob? }
+
+    With save_html, HTML bodies are also kept in the blob store
+    (blobstore.get_blob_store) and html_blob holds their key.
+    """
+    resources = fetch_message_resources(
+        service, ids, workers=workers, max_retries=max_retries, backoff_base=backoff_base
+    )
+    messages = [normalize_message(msg) for msg in resources]
 
-        messages.append(item)
+    if save_html:
+        store = get_blob_store()
+        for item in messages:
+            if item["html_body"]:
+                item["html_blob"] = store.put(item["html_body"])
 
     return messages
 
 
 # ---- Public API: match the "better" script's shape ----
-def get_emails(user, query: str = "in:inbox newer_than:7d", max_results: int = 5, save_html: bool = False) -> Dict[str, Any]:
+def get_emails(user, query: str = "in:inbox newer_than:7d", max_results: int = 5, save_html: bool = False,
+               include_bodies: bool = True) -> Dict[str, Any]:
     """
     High-level: authenticate (django-allauth), search, fetch, and return normalized payload.
+    With include_bodies=False only the message summaries are fetched (see list_messages).
     """
     try:
         service = get_gmail_service(user)
@@ -191,8 +704,11 @@ def get_emails(user, query: str = "in:inbox newer_than:7d", max_results: int = 5
                 "error": "No valid Google credentials for this user.",
             }
 
-        ids = list_message_ids(service, q=query, max_results=max_results)
-        messages = fetch_messages(service, ids, save_html=save_html)
+        if include_bodies:
+            ids = list_message_ids(service, q=query, max_results=max_results)
+            messages = fetch_messages(service, ids, save_html=save_html)
+        else:
+            messages = list_messages(service, q=query, max_results=max_results)
 
         return {
             "success": True,
@@ -200,6 +716,9 @@ def get_emails(user, query: str = "in:inbox newer_than:7d", max_results: int = 5
             "messages": messages,
         }
     except Exception as e:
+        if isinstance(e, HttpError) and e.resp.status == 401:
+            # Revoked or replaced token: reload credentials next time
+            invalidate_gmail_service(user.pk)
         return {
             "success": False,
             "count": 0,
@@ -0,0 +1,197 @@
+import asyncio
+import math
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from google.oauth2.credentials import Credentials
+
+from googlelogin import gmail_async, gmail_service
+from googlelogin.fake_gmail import FakeGmailServer, FakeMailbox, build_fake_service
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def _proc_status_kib(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc is unavailable."""
+    kib = _proc_status_kib('VmRSS')
+    return kib * 1024 if kib is not None else None
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown."""
+    kib = _proc_status_kib('VmHWM')
+    if kib is not None:
+        return kib * 1024
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if maxrss > 1 << 32 else maxrss * 1024
+
+
+def reset_peak_rss():
+    """Restart peak RSS tracking from the current RSS (Linux only); returns whether it worked."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class Command(BaseCommand):
+    help = 'Measure Gmail message fetching against a local fake Gmail server (no Google account needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, nargs='+', default=[10, 100, 1000], help='Message counts to fetch')
+        parser.add_argument('--workers', type=int, default=gmail_service.FETCH_WORKERS, help='Concurrent fetches')
+        parser.add_argument('--latency', type=float, default=0.02, help='Seconds the fake server adds to every response')
+        parser.add_argument('--error-rate', type=float, default=0.02, help='Fraction of requests failed with 429/503')
+        parser.add_argument('--skip-sequential', action='store_true', help='Only time the concurrent fetch')
+        parser.add_argument('--mode', choices=['fetch', 'get_emails'], default='fetch',
+                            help='fetch: compare the fetch paths once per size; '
+                                 'get_emails: time repeated get_emails calls (throughput, latency, memory)')
+        parser.add_argument('--iterations', type=int, default=20, help='get_emails calls timed per size')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many more seconds added at random to each response')
+        parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of requests whose connection is dropped')
+        parser.add_argument('--mailbox-size', type=int, help='Messages in the fake mailbox (default: the largest count)')
+        parser.add_argument('--body-size', type=int, default=2000, help='Characters per text/plain body')
+        parser.add_argument('--mime-depth', type=int, default=0, help='multipart/mixed levels around the body')
+        parser.add_argument('--attachments', type=int, default=0, help='Attachments per message')
+        parser.add_argument('--attachment-size', type=int, default=0, help='Bytes per attachment')
+        parser.add_argument('--forwarded', type=int, default=0, help='Forwarded copies nested in each message')
+
+    def _fetch(self, server, service, ids, workers):
+        server.reset_counters()
+        start = time.perf_counter()
+        # Backoff is scaled down so injected errors cost about one extra round trip
+        messages = gmail_service.fetch_messages(service, ids, workers=workers, backoff_base=server.latency or 0.01)
+        return messages, time.perf_counter() - start
+
+    def _list(self, server, service, ids, workers):
+        server.reset_counters()
+        start = time.perf_counter()
+        summaries = gmail_service.fetch_message_summaries(service, ids, workers=workers)
+        return summaries, time.perf_counter() - start
+
+    def _async(self, server, count, workers):
+        async def run():
+            # No quota key: the fake server has no per-user rate limit
+            async with gmail_async.AsyncGmailClient(
+                base_url=server.url, max_connections=workers, backoff_base=server.latency or 0.01,
+            ) as client:
+                return await gmail_async.fetch_pipeline(client, max_results=count, workers=workers)
+
+        server.reset_counters()
+        start = time.perf_counter()
+        messages = asyncio.run(run())
+        return messages, time.perf_counter() - start
+
+    def _report(self, label, count, seconds, server):
+        self.stdout.write(
+            f"  - {label}: {seconds:.2f}s ({count / seconds:,.0f} msg/s), "
+            f"{server.requests} requests, {server.errors} injected errors retried, "
+            f"{server.bytes_sent / 1024:,.0f} KiB received"
+        )
+
+    def _get_emails(self, server, service, counts, iterations):
+        """Time get_emails through the service cache, as a view would call it."""
+        # Never saved: get_emails only needs the pk for the service cache
+        user = User(pk=0, username='gmail-benchmark')
+        gmail_service.service_cache.put(user.pk, service, Credentials(token='benchmark'), ttl=math.inf)
+        try:
+            for count in counts:
+                # Warm up: discovery, connections and the server's encoded messages
+                gmail_service.get_emails(user, max_results=count)
+                server.reset_counters()
+                baseline = current_rss()
+                tracked = reset_peak_rss()
+                latencies, fetched, failures = [], 0, 0
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    result = gmail_service.get_emails(user, max_results=count)
+                    latencies.append(time.perf_counter() - start)
+                    fetched += result['count']
+                    failures += not result['success']
+                peak = peak_rss()
+
+                memory = 'peak RSS unknown'
+                if peak is not None:
+                    memory = f"peak RSS {peak / (1 << 20):,.1f} MiB"
+                    if tracked and baseline is not None:
+                        memory += f" (+{max(0, peak - baseline) / (1 << 20):,.1f} MiB over the warmed-up process)"
+                self.stdout.write(
+                    f"{count} messages per call: {fetched / sum(latencies):,.0f} msg/s, "
+                    f"p50 {percentile(latencies, 50) * 1000:,.0f}ms, p99 {percentile(latencies, 99) * 1000:,.0f}ms, "
+                    f"{server.bytes_sent / iterations / 1024:,.0f} KiB received per call, {memory}"
+                )
+                self.stdout.write(
+                    f"  - {server.requests} requests, {server.errors} injected errors, "
+                    f"{server.dropped} dropped connections, {failures} failed calls"
+                )
+        finally:
+            gmail_service.service_cache.invalidate(user.pk)
+
+    def handle(self, *args, **options):
+        largest = max(options['messages'])
+        mailbox = FakeMailbox(
+            options['mailbox_size'] or largest,
+            body_size=options['body_size'],
+            mime_depth=options['mime_depth'],
+            attachments=options['attachments'],
+            attachment_size=options['attachment_size'],
+            forwarded=options['forwarded'],
+        )
+        with FakeGmailServer(
+            mailbox, latency=options['latency'], error_rate=options['error_rate'],
+            jitter=options['jitter'], drop_rate=options['drop_rate'],
+        ) as server:
+            service = build_fake_service(server.url)
+            if options['mode'] == 'get_emails':
+                self.stdout.write(
+                    f"get_emails benchmark ({options['latency'] * 1000:.0f}ms latency "
+                    f"+ up to {options['jitter'] * 1000:.0f}ms jitter, {options['error_rate']:.0%} injected errors, "
+                    f"{options['drop_rate']:.0%} dropped connections, {options['iterations']} calls per size; "
+                    f"the fake server runs in this process):"
+                )
+                return self._get_emails(server, service, options['messages'], options['iterations'])
+            self.stdout.write(
+                f"Gmail fetch benchmark ({options['latency'] * 1000:.0f}ms latency, "
+                f"{options['error_rate']:.0%} injected errors, {options['workers']} workers):"
+            )
+            for count in options['messages']:
+                ids = gmail_service.list_message_ids(service, max_results=count)
+                self.stdout.write(f"{count} messages:")
+                concurrent, seconds = self._fetch(server, service, ids, options['workers'])
+                self._report('concurrent', count, seconds, server)
+                pipelined, seconds = self._async(server, count, options['workers'])
+                self._report('async pipeline (incl. listing)', count, seconds, server)
+                if pipelined != concurrent:
+                    self.stderr.write(self.style.ERROR("    async and threaded results differ"))
+                summaries, seconds = self._list(server, service, ids, options['workers'])
+                self._report('metadata only', count, seconds, server)
+                if [s['subject'] for s in summaries] != [m['subject'] for m in concurrent]:
+                    self.stderr.write(self.style.ERROR("    metadata and full results differ"))
+                if not options['skip_sequential']:
+                    sequential, seconds = self._fetch(server, service, ids, 1)
+                    self._report('sequential', count, seconds, server)
+                    if sequential != concurrent:
+                        self.stderr.write(self.style.ERROR("    concurrent and sequential results differ"))
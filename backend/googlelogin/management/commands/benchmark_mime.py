@@ -0,0 +1,88 @@
+import base64
+import sys
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from googlelogin import gmail_service
+from googlelogin.fake_gmail import mime_payload
+
+
+def recursive_extract_bodies(payload):
+    """The previous extract_bodies: recursive, decodes whole bodies, walks the whole tree."""
+    out = {"text": "", "html": ""}
+
+    def decode(data):
+        return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
+
+    def walk(part):
+        mime = part.get("mimeType", "")
+        data = (part.get("body", {}) or {}).get("data", "")
+        if mime == "text/plain" and data and not out["text"]:
+            out["text"] = decode(data)
+        elif mime == "text/html" and data and not out["html"]:
+            out["html"] = decode(data)
+        for sub in part.get("parts", []) or []:
+            walk(sub)
+        if not part.get("parts") and data and not (out["text"] or out["html"]):
+            out["text"] = decode(data)
+
+    walk(payload)
+    return out
+
+
+def corpus():
+    """(name, payload) of synthetic messages that stress the MIME walk."""
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+
+    def body(size):
+        return (paragraph * (size // len(paragraph) + 1))[:size]
+
+    small = body(2_000)
+    return [
+        ('simple (2 KB alternative)', mime_payload(small, f"<p>{small}</p>")),
+        ('newsletter (1 MB text, 4 MB html)', mime_payload(body(1 << 20), f"<p>{body(4 << 20)}</p>")),
+        ('forwarded thread (40 x 20 KB)', mime_payload(body(20_000), f"<p>{body(20_000)}</p>", forwarded=40)),
+        ('deep nesting (300 levels, 64 KB attachment each)',
+         mime_payload(small, f"<p>{small}</p>", depth=300, attachments=1, attachment_size=64 << 10)),
+        ('attachments (20 x 1 MB)', mime_payload(small, f"<p>{small}</p>", attachments=20, attachment_size=1 << 20)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Measure MIME body extraction over synthetic large and deeply nested messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Extractions timed per message')
+
+    def _measure(self, extract, payload, repeat):
+        tracemalloc.start()
+        try:
+            result = extract(payload)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract(payload)
+        return result, (time.perf_counter() - start) / repeat, peak
+
+    def handle(self, *args, **options):
+        # The recursive walker needs headroom for the deep corpus
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 5000))
+        self.stdout.write("MIME extraction benchmark (time per message, peak memory allocated):")
+        for name, payload in corpus():
+            self.stdout.write(f"{name}:")
+            results = {}
+            for label, extract in (('recursive', recursive_extract_bodies), ('iterative', gmail_service.extract_bodies)):
+                result, seconds, peak = self._measure(extract, payload, options['repeat'])
+                results[label] = result
+                self.stdout.write(
+                    f"  - {label}: {seconds * 1000:.3f}ms ({1 / seconds:,.0f} msg/s), peak {peak / (1 << 20):.2f} MiB"
+                )
+            iterative, recursive = results['iterative'], results['recursive']
+            if iterative['truncated']:
+                self.stdout.write("    (iterative result truncated at the size limits)")
+            elif (iterative['text'], iterative['html']) != (recursive['text'], recursive['html']):
+                self.stdout.write("    (bodies differ)")
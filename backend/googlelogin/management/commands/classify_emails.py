@@ -0,0 +1,35 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from googlelogin import classifier
+
+
+class Command(BaseCommand):
+    help = "Match a user's mirrored Gmail messages to applications and update statuses from rejections, interviews and offers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username whose messages are classified')
+        parser.add_argument('--reclassify', action='store_true', help='Classify already classified messages again (statuses are never moved back)')
+        parser.add_argument('--batch-size', type=int, default=classifier.BATCH_SIZE, help='Messages per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        if options['reclassify']:
+            classifier.reset_classifications(user)
+
+        start = time.perf_counter()
+        result = classifier.classify_pending(user, batch_size=options['batch_size'])
+        duration = time.perf_counter() - start
+
+        rate = f" ({result.messages / duration:,.0f} msg/s)" if result.messages else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"Classified {result.messages} messages in {duration:.2f}s{rate}: "
+            f"{result.matched} matched to applications, {result.categorized} rejections/interviews/offers, "
+            f"{result.updated} statuses updated"
+        ))
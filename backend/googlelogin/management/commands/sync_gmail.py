@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from googlelogin.classifier import classify_pending
+from googlelogin.sync import sync_mailbox
+
+
+class Command(BaseCommand):
+    help = "Sync a user's local Gmail mirror (incrementally, unless the history id expired or --full is given)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username whose mailbox is synced')
+        parser.add_argument('--full', action='store_true', help='Rebuild the mirror from a full listing')
+        parser.add_argument('--max-messages', type=int, help='Newest messages mirrored by a full sync')
+        parser.add_argument('--no-classify', action='store_true', help="Don't classify new messages or update application statuses")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        try:
+            result = sync_mailbox(user, full=options['full'], max_messages=options['max_messages'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.mode.capitalize()} sync: {result.added} added, {result.deleted} removed, "
+            f"{result.relabeled} relabeled (history id {result.history_id})"
+        ))
+        if not options['no_classify']:
+            classified = classify_pending(user)
+            self.stdout.write(self.style.SUCCESS(
+                f"Classified {classified.messages} messages: {classified.matched} matched to applications, "
+                f"{classified.categorized} rejections/interviews/offers, {classified.updated} statuses updated"
+            ))
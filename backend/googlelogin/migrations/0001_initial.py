@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GmailMailbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('history_id', models.BigIntegerField(blank=True, help_text='Gmail history id the mirror is current with', null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, help_text='When the last sync finished', null=True)),
+                ('last_full_sync_at', models.DateTimeField(blank=True, help_text='When the mirror was last rebuilt from a full listing', null=True)),
+                ('user', models.OneToOneField(help_text='Owner of the mailbox', on_delete=django.db.models.deletion.CASCADE, related_name='gmail_mailbox', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GmailMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gmail_id', models.CharField(help_text='Gmail message id', max_length=64)),
+                ('thread_id', models.CharField(blank=True, help_text='Gmail thread id', max_length=64)),
+                ('label_ids', models.JSONField(default=list, help_text='Gmail label ids')),
+                ('sender', models.TextField(blank=True, help_text='From header')),
+                ('subject', models.TextField(blank=True, help_text='Subject header')),
+                ('date_header', models.CharField(blank=True, help_text='Date header as sent', max_length=255)),
+                ('internal_date', models.DateTimeField(blank=True, help_text='When Gmail received the message', null=True)),
+                ('snippet', models.TextField(blank=True, help_text='Short preview of the message')),
+                ('text_body', models.TextField(blank=True, help_text='Decoded text/plain body')),
+                ('html_body', models.TextField(blank=True, help_text='Decoded text/html body')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the message was mirrored')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the mirrored message last changed')),
+                ('user', models.ForeignKey(help_text='Owner of the mailbox', on_delete=django.db.models.deletion.CASCADE, related_name='gmail_messages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-internal_date'], name='gmail_message_user_date_idx')],
+                'unique_together': {('user', 'gmail_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:07
+
+from django.db import migrations, models
+
+
+def mark_existing_bodies(apps, schema_editor):
+    """Messages mirrored before this migration were fetched with their bodies."""
+    GmailMessage = apps.get_model('googlelogin', 'GmailMessage')
+    GmailMessage.objects.update(has_body=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('googlelogin', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gmailmessage',
+            name='has_body',
+            field=models.BooleanField(default=False, help_text='Whether the bodies have been fetched'),
+        ),
+        migrations.RunPython(mark_existing_bodies, migrations.RunPython.noop),
+    ]
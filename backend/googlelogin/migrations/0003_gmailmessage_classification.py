@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('googlelogin', '0002_gmailmessage_has_body'),
+        ('job_tracker', '0010_skillmention'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gmailmessage',
+            name='application',
+            field=models.ForeignKey(blank=True, help_text='Job application the message is about', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emails', to='job_tracker.jobapplication'),
+        ),
+        migrations.AddField(
+            model_name='gmailmessage',
+            name='category',
+            field=models.CharField(blank=True, choices=[('rejection', 'Rejection'), ('interview', 'Interview invitation'), ('offer', 'Offer')], help_text='What the message says about an application', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='gmailmessage',
+            name='classified_at',
+            field=models.DateTimeField(blank=True, help_text='When the classifier processed the message', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='gmailmessage',
+            index=models.Index(fields=['user', 'classified_at', 'internal_date'], name='gmail_message_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('googlelogin', '0003_gmailmessage_classification'),
+        ('job_tracker', '0010_skillmention'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gmailmessage',
+            name='html_blob',
+            field=models.CharField(blank=True, help_text='Blob store key of the text/html body, when kept there instead of html_body', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='gmailmessage',
+            index=models.Index(fields=['user', 'html_blob'], name='gmail_message_user_blob_idx'),
+        ),
+    ]
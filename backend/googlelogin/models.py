@@ -1,3 +1,70 @@
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class GmailMailbox(models.Model):
+    """
+    Model holding the sync state of one user's Gmail mirror.
+
+    history_id is the Gmail history id the mirror is up to date with; the
+    next sync only asks Gmail for changes after it (see sync.py).
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='gmail_mailbox', help_text="Owner of the mailbox")
+    history_id = models.BigIntegerField(blank=True, null=True, help_text="Gmail history id the mirror is current with")
+    last_synced_at = models.DateTimeField(blank=True, null=True, help_text="When the last sync finished")
+    last_full_sync_at = models.DateTimeField(blank=True, null=True, help_text="When the mirror was last rebuilt from a full listing")
+
+    def __str__(self):
+        """String representation of the mailbox."""
+        return f"Gmail mailbox of {self.user}"
+
+
+class GmailMessage(models.Model):
+    """
+    Model representing one message of a user's local Gmail mirror.
+
+    Holds the headers shown in listings and, once a message is opened, its
+    decoded bodies, so reads do not go to Gmail. Syncs only fetch message
+    metadata; bodies are fetched on first use (see sync.hydrate_bodies).
+    Message content never changes in Gmail; only labels do. HTML bodies are
+    kept in the blob store (see blobstore.py) and referenced by html_blob.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='gmail_messages', help_text="Owner of the mailbox")
+    gmail_id = models.CharField(max_length=64, help_text="Gmail message id")
+    thread_id = models.CharField(max_length=64, blank=True, help_text="Gmail thread id")
+    label_ids = models.JSONField(default=list, help_text="Gmail label ids")
+    sender = models.TextField(blank=True, help_text="From header")
+    subject = models.TextField(blank=True, help_text="Subject header")
+    date_header = models.CharField(max_length=255, blank=True, help_text="Date header as sent")
+    internal_date = models.DateTimeField(blank=True, null=True, help_text="When Gmail received the message")
+    snippet = models.TextField(blank=True, help_text="Short preview of the message")
+    text_body = models.TextField(blank=True, help_text="Decoded text/plain body")
+    html_body = models.TextField(blank=True, help_text="Decoded text/html body")
+    html_blob = models.CharField(max_length=64, blank=True, help_text="Blob store key of the text/html body, when kept there instead of html_body")
+    has_body = models.BooleanField(default=False, help_text="Whether the bodies have been fetched")
+
+    # Set by the email classifier (see classifier.py)
+    CATEGORY_CHOICES = [
+        ('rejection', 'Rejection'),
+        ('interview', 'Interview invitation'),
+        ('offer', 'Offer'),
+    ]
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, blank=True, help_text="What the message says about an application")
+    application = models.ForeignKey('job_tracker.JobApplication', on_delete=models.SET_NULL, blank=True, null=True, related_name='emails', help_text="Job application the message is about")
+    classified_at = models.DateTimeField(blank=True, null=True, help_text="When the classifier processed the message")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="When the message was mirrored")
+    updated_at = models.DateTimeField(auto_now=True, help_text="When the mirrored message last changed")
+
+    class Meta:
+        unique_together = ['user', 'gmail_id']
+        indexes = [
+            models.Index(fields=['user', '-internal_date'], name='gmail_message_user_date_idx'),
+            models.Index(fields=['user', 'classified_at', 'internal_date'], name='gmail_message_pending_idx'),
+            models.Index(fields=['user', 'html_blob'], name='gmail_message_user_blob_idx'),
+        ]
+
+    def __str__(self):
+        """String representation of the message."""
+        return f"{self.subject} ({self.gmail_id})"
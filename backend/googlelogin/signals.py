@@ -0,0 +1,30 @@
+"""
+Signal receivers that keep the cached Gmail services (see
+gmail_service.ServiceCache) consistent with the stored Google tokens.
+
+A new login or a revoked account replaces or deletes the SocialToken; the
+cached credentials of that user are dropped so the next request reloads
+them. Saves made by our own token refresh store the token already cached
+and leave the entry alone.
+"""
+
+from allauth.socialaccount.models import SocialToken
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .gmail_service import invalidate_gmail_service, service_cache
+
+
+@receiver(post_save, sender=SocialToken)
+def invalidate_service_on_token_save(sender, instance, **kwargs):
+    """Drop the cached service when the stored token no longer matches it."""
+    user_id = instance.account.user_id
+    creds = service_cache.peek_credentials(user_id)
+    if creds is not None and creds.token != instance.token:
+        invalidate_gmail_service(user_id)
+
+
+@receiver(post_delete, sender=SocialToken)
+def invalidate_service_on_token_delete(sender, instance, **kwargs):
+    """Drop the cached service of a user whose token was deleted."""
+    invalidate_gmail_service(instance.account.user_id)
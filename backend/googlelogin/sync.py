@@ -0,0 +1,373 @@
+"""
+Incremental Gmail sync into a local mirror.
+
+Each user's inbox is mirrored into GmailMessage rows, so reads such as the
+test_gmail view are served from the database instead of re-listing and
+re-downloading messages on every request. Syncs fetch only the listing
+tier of each message (headers, snippet, labels; see
+gmail_service.fetch_message_summaries); bodies are fetched the first time
+a message is opened and then kept (hydrate_bodies): text in the row, HTML
+in the content-addressed blob store.
+
+The first sync lists the newest GMAIL_SYNC_MAX_MESSAGES inbox messages and
+records the mailbox's historyId. Later syncs ask Gmail's history API only
+for changes since that id, then fetch the added messages, drop deleted or
+archived ones and update labels. Gmail keeps history for a limited time;
+when the stored id is too old (history.list answers 404), the mirror is
+rebuilt from a full listing, re-fetching only the messages it lacks.
+
+No transaction or lock is held while Gmail is read: the changes are
+applied afterwards in one short transaction, guarded by a compare-and-set
+on the mailbox's history id so concurrent syncs of a user apply at most
+one set of changes per history id.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+
+from .blobstore import get_blob_store
+from .classifier import classify_pending
+from .gmail_service import (
+    FETCH_WORKERS, execute_with_retry, fetch_message_bodies, fetch_message_summaries, get_gmail_service,
+    list_message_ids,
+)
+from .models import GmailMailbox, GmailMessage
+
+
+# Label whose messages are mirrored
+SYNC_LABEL = "INBOX"
+
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+
+def get_sync_limit() -> int:
+    """Return the number of newest messages a full sync mirrors."""
+    return getattr(settings, "GMAIL_SYNC_MAX_MESSAGES", 500)
+
+
+@dataclass
+class SyncResult:
+    mode: str
+    added: int = 0
+    deleted: int = 0
+    relabeled: int = 0
+    history_id: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "added": self.added,
+            "deleted": self.deleted,
+            "relabeled": self.relabeled,
+            "history_id": self.history_id,
+        }
+
+
+def summary_fields(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a message summary (gmail_service.summarize_message) to GmailMessage fields."""
+    internal_date = summary["internal_date"]
+    return {
+        "gmail_id": summary["id"],
+        "thread_id": summary["thread_id"],
+        "label_ids": summary["label_ids"],
+        "sender": summary["from"],
+        "subject": summary["subject"],
+        "date_header": summary["date"][:255],
+        "internal_date": (
+            datetime.fromtimestamp(internal_date / 1000, tz=dt_timezone.utc) if internal_date else None
+        ),
+        "snippet": summary["snippet"],
+    }
+
+
+def _fetch_new(user, service, gmail_ids: List[str], workers: int) -> List[GmailMessage]:
+    """Fetch summaries of messages not mirrored yet, as unsaved rows."""
+    if not gmail_ids:
+        return []
+    summaries = fetch_message_summaries(
+        service, [{"id": gmail_id} for gmail_id in gmail_ids], workers=workers, skip_missing=True
+    )
+    return [GmailMessage(user=user, **summary_fields(summary)) for summary in summaries if summary is not None]
+
+
+def _delete(user, gmail_ids) -> int:
+    gmail_ids = list(gmail_ids)
+    deleted = 0
+    for start in range(0, len(gmail_ids), 500):
+        deleted += GmailMessage.objects.filter(user=user, gmail_id__in=gmail_ids[start:start + 500]).delete()[0]
+    return deleted
+
+
+@dataclass
+class _Changes:
+    """Changes read from Gmail, not yet applied to the mirror."""
+    mode: str
+    history_id: int
+    new_rows: List[GmailMessage] = field(default_factory=list)
+    gone: List[str] = field(default_factory=list)
+    relabeled: List[GmailMessage] = field(default_factory=list)
+
+
+def _apply(user, mailbox: GmailMailbox, start_history_id: Optional[int], changes: _Changes) -> SyncResult:
+    """
+    Apply changes and advance the mailbox to their history id, in one short transaction.
+
+    The mailbox is advanced with a compare-and-set on the history id the
+    changes were read from. If another sync of the same user got there
+    first, the changes are dropped (that sync covered them) and the result
+    has mode "skipped".
+    """
+    now = timezone.now()
+    fields = {"history_id": changes.history_id, "last_synced_at": now}
+    if changes.mode == "full":
+        fields["last_full_sync_at"] = now
+
+    with transaction.atomic():
+        claimed = GmailMailbox.objects.filter(pk=mailbox.pk, history_id=start_history_id)
+        if start_history_id is None:
+            claimed = GmailMailbox.objects.filter(pk=mailbox.pk, history_id__isnull=True)
+        if not claimed.update(**fields):
+            mailbox.refresh_from_db()
+            return SyncResult(mode="skipped", history_id=mailbox.history_id)
+
+        result = SyncResult(mode=changes.mode, history_id=changes.history_id)
+        GmailMessage.objects.bulk_update(changes.relabeled, ["label_ids"], batch_size=500)
+        result.relabeled = len(changes.relabeled)
+        result.deleted = _delete(user, changes.gone)
+        # ignore_conflicts: rows stored by an earlier, interrupted sync are kept
+        GmailMessage.objects.bulk_create(changes.new_rows, batch_size=500, ignore_conflicts=True)
+        result.added = len(changes.new_rows)
+
+    for name, value in fields.items():
+        setattr(mailbox, name, value)
+    return result
+
+
+def full_sync(user, service, mailbox: GmailMailbox, max_messages: Optional[int] = None,
+              workers: int = FETCH_WORKERS) -> SyncResult:
+    """
+    Rebuild the mirror from a listing of the newest inbox messages.
+
+    The baseline historyId is read before listing, so changes made while the
+    sync runs are picked up by the next incremental sync.
+    """
+    start_history_id = mailbox.history_id
+    max_messages = max_messages or get_sync_limit()
+    profile = execute_with_retry(service.users().getProfile(userId="me"))
+    listed = [m["id"] for m in list_message_ids(service, q=f"in:{SYNC_LABEL.lower()}", max_results=max_messages)]
+    stored = set(GmailMessage.objects.filter(user=user).values_list("gmail_id", flat=True))
+
+    changes = _Changes(mode="full", history_id=int(profile["historyId"]))
+    changes.new_rows = _fetch_new(user, service, [gmail_id for gmail_id in listed if gmail_id not in stored], workers)
+    changes.gone = list(stored - set(listed))
+    return _apply(user, mailbox, start_history_id, changes)
+
+
+def _history_changes(service, start_history_id: int):
+    """
+    Read all history records after start_history_id.
+
+    Returns:
+        tuple: ({gmail_id: current label ids, or None if deleted}, latest history id)
+    """
+    changes: Dict[str, Optional[List[str]]] = {}
+    page_token = None
+    while True:
+        response = execute_with_retry(service.users().history().list(
+            userId="me", startHistoryId=start_history_id, historyTypes=HISTORY_TYPES,
+            maxResults=500, pageToken=page_token,
+        ))
+        for record in response.get("history", []):
+            # Records are in history order, so later ones win
+            for key in ("messagesAdded", "labelsAdded", "labelsRemoved"):
+                for change in record.get(key, []):
+                    message = change["message"]
+                    changes[message["id"]] = message.get("labelIds", [])
+            for change in record.get("messagesDeleted", []):
+                changes[change["message"]["id"]] = None
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return changes, int(response.get("historyId", start_history_id))
+
+
+def incremental_sync(user, service, mailbox: GmailMailbox, workers: int = FETCH_WORKERS) -> SyncResult:
+    """
+    Apply the changes recorded since the mailbox's history id.
+
+    Raises:
+        HttpError: 404 when the history id has expired (see sync_mailbox)
+    """
+    start_history_id = mailbox.history_id
+    history, history_id = _history_changes(service, start_history_id)
+    changes = _Changes(mode="incremental", history_id=history_id)
+
+    changes.gone = [gmail_id for gmail_id, labels in history.items() if labels is None or SYNC_LABEL not in labels]
+    present = {gmail_id: labels for gmail_id, labels in history.items() if labels and SYNC_LABEL in labels}
+    stored = {
+        message.gmail_id: message
+        for message in GmailMessage.objects.filter(user=user, gmail_id__in=list(present)).only("id", "gmail_id", "label_ids")
+    }
+    for gmail_id, labels in present.items():
+        message = stored.get(gmail_id)
+        if message is not None and message.label_ids != labels:
+            message.label_ids = labels
+            changes.relabeled.append(message)
+    changes.new_rows = _fetch_new(user, service, [gmail_id for gmail_id in present if gmail_id not in stored], workers)
+    return _apply(user, mailbox, start_history_id, changes)
+
+
+def sync_mailbox(user, service=None, full: bool = False, max_messages: Optional[int] = None,
+                 workers: int = FETCH_WORKERS) -> SyncResult:
+    """
+    Bring a user's mirror up to date, incrementally when possible.
+
+    Gmail is read outside any transaction; the changes are then applied in
+    one short transaction that also advances the mailbox's history id (see
+    _apply). Concurrent syncs of the same user may both read Gmail, but only
+    the first to finish applies its changes.
+
+    Args:
+        user: Owner of the mailbox
+        service: Gmail API client (built from the user's credentials when omitted)
+        full: Force a full resync
+        max_messages: Messages mirrored by a full sync (defaults to GMAIL_SYNC_MAX_MESSAGES)
+        workers: Concurrent message fetches
+
+    Raises:
+        ValueError: If the user has no usable Google credentials
+    """
+    service = service or get_gmail_service(user)
+    if service is None:
+        raise ValueError("No valid Google credentials for this user.")
+
+    mailbox, _created = GmailMailbox.objects.get_or_create(user=user)
+    if full or mailbox.history_id is None:
+        return full_sync(user, service, mailbox, max_messages, workers)
+    try:
+        return incremental_sync(user, service, mailbox, workers)
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        # The stored history id is too old for Gmail to answer from
+        return full_sync(user, service, mailbox, max_messages, workers)
+
+
+def hydrate_bodies(user, gmail_ids: List[str], service=None, workers: int = FETCH_WORKERS) -> Dict[str, Dict[str, str]]:
+    """
+    Return the bodies of mirrored messages, fetching the ones not loaded yet.
+
+    Fetched bodies are kept, so each body is downloaded once: text bodies in
+    their rows, HTML bodies in the blob store (keyed in html_blob). A body
+    whose blob has been evicted is fetched again. Messages that are not
+    mirrored, or were deleted from Gmail, are left out.
+
+    Returns:
+        dict: {gmail_id: {'text_body', 'html_body', 'html_blob'}}
+
+    Raises:
+        ValueError: If bodies must be fetched and the user has no usable Google credentials
+    """
+    store = get_blob_store()
+    rows = {
+        message.gmail_id: message
+        for message in GmailMessage.objects.filter(user=user, gmail_id__in=list(gmail_ids))
+        .only("id", "gmail_id", "text_body", "html_body", "html_blob", "has_body")
+    }
+    missing = []
+    for gmail_id, message in rows.items():
+        if message.has_body and message.html_blob:
+            html = store.get_text(message.html_blob)
+            if html is not None:
+                message.html_body = html
+                continue
+        if not message.has_body or message.html_blob:
+            missing.append(gmail_id)
+
+    if missing:
+        service = service or get_gmail_service(user)
+        if service is None:
+            raise ValueError("No valid Google credentials for this user.")
+        fetched = fetch_message_bodies(service, [{"id": gmail_id} for gmail_id in missing], workers=workers, skip_missing=True)
+        hydrated = []
+        for gmail_id, body in zip(missing, fetched):
+            if body is None:
+                del rows[gmail_id]
+                continue
+            message = rows[gmail_id]
+            message.text_body, message.html_body, message.has_body = body["text_body"], body["html_body"], True
+            message.html_blob = store.put(body["html_body"]) if body["html_body"] else ""
+            hydrated.append(message)
+        # html_body is not saved; the HTML lives in the blob store
+        GmailMessage.objects.bulk_update(hydrated, ["text_body", "html_blob", "has_body"], batch_size=500)
+    return {
+        gmail_id: {"text_body": message.text_body, "html_body": message.html_body, "html_blob": message.html_blob}
+        for gmail_id, message in rows.items()
+    }
+
+
+def message_body(user, gmail_id: str, service=None) -> Optional[Dict[str, str]]:
+    """Return one mirrored message's bodies (fetched on first use), or None if unknown."""
+    return hydrate_bodies(user, [gmail_id], service=service).get(gmail_id)
+
+
+def stored_messages(user, limit: int = 10, with_bodies: bool = False, service=None) -> List[Dict[str, Any]]:
+    """
+    Return the newest mirrored messages:
+    { id, from, date, subject, snippet, text_body?, html_body?, html_blob? }
+
+    Bodies are only included (and fetched if needed) with with_bodies.
+    """
+    rows = (
+        GmailMessage.objects.filter(user=user).order_by("-internal_date")
+        .values_list("gmail_id", "sender", "date_header", "subject", "snippet")[:limit]
+    )
+    messages = [
+        {"id": gmail_id, "from": sender, "date": date, "subject": subject, "snippet": snippet}
+        for gmail_id, sender, date, subject, snippet in rows
+    ]
+    if with_bodies:
+        bodies = hydrate_bodies(user, [message["id"] for message in messages], service=service)
+        for message in messages:
+            message.update(bodies.get(message["id"], {"text_body": "", "html_body": "", "html_blob": ""}))
+    return messages
+
+
+def get_synced_emails(user, max_results: int = 10) -> Dict[str, Any]:
+    """
+    Sync the user's mirror, then read the newest messages from it.
+
+    Same payload shape as gmail_service.get_emails with include_bodies=False;
+    bodies are loaded per message with message_body. New messages are run
+    through the classifier, which may update application statuses. When the
+    sync fails the mirrored messages are still returned, with success False
+    and the error.
+    """
+    result = classified = error = None
+    try:
+        result = sync_mailbox(user)
+        # New messages may move applications forward
+        classified = classify_pending(user)
+    except Exception as e:
+        error = str(e)
+
+    messages = stored_messages(user, max_results)
+    payload = {
+        "success": error is None,
+        "count": len(messages),
+        "messages": messages,
+    }
+    if result is not None:
+        payload["sync"] = result.as_dict()
+    if classified is not None:
+        payload["classified"] = classified.as_dict()
+    if error is not None:
+        payload["error"] = error
+    return payload
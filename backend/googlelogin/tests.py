@@ -1,3 +1,543 @@
-from django.test import TestCase
+"""
+Gmail Integration Tests
 
-# Create your tests here.
+Behavioural tests for the Gmail mirror: sync, classification, body
+extraction, the blob store, the service cache and the async fetch
+pipeline. Gmail is replaced by the local fake
+server (see fake_gmail.py), so no credentials or network are needed.
+"""
+
+import asyncio
+import base64
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from allauth.socialaccount.models import SocialAccount, SocialApp, SocialToken
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase, TransactionTestCase, override_settings
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+import httplib2
+
+from job_tracker.models import JobApplication, StatusTransition
+
+from .blobstore import LOW_WATER, BlobStore, get_blob_store
+from .classifier import CompanyIndex, classify_pending, classify_text
+from .fake_gmail import FakeGmailServer, FakeMailbox, build_fake_service, mime_payload
+from .gmail_async import AsyncGmailClient, TokenBucket, aget_emails, fetch_pipeline
+from .gmail_service import (
+    MAX_MIME_PARTS, ServiceCache, b64url_decode_prefix, extract_bodies, fetch_messages, list_message_ids,
+    list_messages, service_cache,
+)
+from .models import GmailMailbox, GmailMessage
+from .sync import hydrate_bodies, incremental_sync, sync_mailbox
+
+
+class SyncTests(TestCase):
+    """sync_mailbox keeps the mirror equal to the fake inbox."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='mailbox-owner')
+        self.mailbox = FakeMailbox(30, body_size=200)
+        self.server = FakeGmailServer(self.mailbox).start()
+        self.addCleanup(self.server.stop)
+        self.service = build_fake_service(self.server.url)
+
+    def mirrored_ids(self):
+        return set(GmailMessage.objects.filter(user=self.user).values_list('gmail_id', flat=True))
+
+    def history_id(self):
+        return GmailMailbox.objects.get(user=self.user).history_id
+
+    def test_full_then_incremental(self):
+        result = sync_mailbox(self.user, self.service, max_messages=20)
+        self.assertEqual((result.mode, result.added), ('full', 20))
+        self.assertEqual(self.mirrored_ids(), set(self.mailbox.ids()[:20]))
+
+        added = self.mailbox.add_messages(2)
+        inbox = self.mailbox.ids()
+        self.mailbox.delete([inbox[5]])
+        self.mailbox.set_labels(inbox[6], [])
+        self.mailbox.set_labels(inbox[7], ['INBOX', 'IMPORTANT'])
+        result = sync_mailbox(self.user, self.service)
+        self.assertEqual(result.as_dict(), {
+            'mode': 'incremental', 'added': 2, 'deleted': 2, 'relabeled': 1, 'history_id': self.mailbox.history_id,
+        })
+        self.assertEqual(self.mirrored_ids(), set(self.mailbox.ids()[:20]) - {inbox[5], inbox[6]} | set(added))
+        self.assertEqual(GmailMessage.objects.get(gmail_id=inbox[7]).label_ids, ['INBOX', 'IMPORTANT'])
+        self.assertEqual(self.history_id(), self.mailbox.history_id)
+
+    def test_expired_history_falls_back_to_full_sync(self):
+        sync_mailbox(self.user, self.service, max_messages=20)
+        stale = self.mirrored_ids()
+        self.mailbox.add_messages(3)
+        self.mailbox.delete([self.mailbox.ids()[10]])
+        self.mailbox.expire_history()
+
+        self.server.reset_counters()
+        result = sync_mailbox(self.user, self.service, max_messages=20)
+        self.assertEqual(result.mode, 'full')
+        # history.list answered 404 before the full listing
+        self.assertGreaterEqual(self.server.errors, 1)
+        self.assertEqual(self.mirrored_ids(), set(self.mailbox.ids()[:20]))
+        self.assertEqual(result.added, len(self.mirrored_ids() - stale))
+        self.assertEqual(self.history_id(), self.mailbox.history_id)
+
+    def test_concurrent_syncs_apply_once(self):
+        sync_mailbox(self.user, self.service, max_messages=20)
+        # Two syncs that read the mailbox at the same history id
+        first = GmailMailbox.objects.get(user=self.user)
+        second = GmailMailbox.objects.get(user=self.user)
+        added = self.mailbox.add_messages(2)
+        self.mailbox.delete([self.mailbox.ids()[4]])
+
+        self.assertEqual(incremental_sync(self.user, self.service, first).mode, 'incremental')
+        mirrored = self.mirrored_ids()
+        result = incremental_sync(self.user, self.service, second)
+        self.assertEqual(result.mode, 'skipped')
+        self.assertEqual(result.history_id, self.mailbox.history_id)
+        self.assertEqual(self.mirrored_ids(), mirrored)
+        self.assertTrue(set(added) <= mirrored)
+
+
+class ClassifierTests(TestCase):
+    """Emails are linked to applications and only move their status forward."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='applicant')
+        today = date.today()
+        self.acme = self.application("Acme, Inc.", "Backend Engineer", today - timedelta(days=10))
+        self.acme_design = self.application("Acme, Inc.", "Product Designer", today - timedelta(days=5))
+        self.globex = self.application("Globex Corporation", "Data Scientist", today)
+        self.index = CompanyIndex.for_user(self.user.pk)
+
+    def application(self, company, position, applied_date, status='applied'):
+        return JobApplication.objects.create(
+            user=self.user, company_name=company, position=position, applied_date=applied_date, status=status,
+        )
+
+    def message(self, gmail_id, sender, subject, snippet, minutes):
+        return GmailMessage.objects.create(
+            user=self.user, gmail_id=gmail_id, sender=sender, subject=subject, snippet=snippet,
+            internal_date=datetime(2025, 1, 1, tzinfo=dt_timezone.utc) + timedelta(minutes=minutes),
+        )
+
+    def test_classify_text(self):
+        self.assertEqual(classify_text("Interview invitation", "Please share your availability."), 'interview')
+        self.assertEqual(classify_text("Your application", "Unfortunately we regret to inform you..."), 'rejection')
+        self.assertEqual(classify_text("Great news", "We are pleased to offer you the role."), 'offer')
+        self.assertEqual(classify_text("Thank you for applying", "We received your application."), '')
+        # A single weak phrase is not enough
+        self.assertEqual(classify_text("Hello", "Congratulations on your graduation"), '')
+        # Rejections that mention interviews are still rejections
+        self.assertEqual(
+            classify_text("Your interview", "Unfortunately, we decided not to proceed after the technical interview."),
+            'rejection',
+        )
+        self.assertIsNone(classify_text("Job alert: 5 new jobs for you", "Schedule an interview today"))
+
+    def test_match(self):
+        self.assertEqual(self.index.match("Globex Careers <jobs@globex.com>", "Hello", ""), self.globex.pk)
+        # Shared ATS domains fall back to names in the sender, subject and text
+        self.assertEqual(self.index.match("Globex via Greenhouse <no-reply@greenhouse.io>", "Hi", ""), self.globex.pk)
+        self.assertEqual(self.index.match("recruiter@gmail.com", "Your Globex application", ""), self.globex.pk)
+        # Applications at the same company are told apart by position words
+        self.assertEqual(self.index.match("talent@acme.com", "Product Designer role", ""), self.acme_design.pk)
+        self.assertEqual(self.index.match("talent@acme.com", "Backend Engineer role", ""), self.acme.pk)
+        self.assertIsNone(self.index.match("someone@initech.com", "Hello", "Nothing about any company here"))
+
+    def test_statuses_only_move_forward(self):
+        self.message('1', "talent@acme.com", "Interview invitation", "Backend Engineer: schedule an interview", 1)
+        self.message('2', "talent@acme.com", "Backend Engineer application", "Unfortunately, we regret to inform you", 2)
+        # Arrives after the rejection: must not reopen the application
+        self.message('3', "talent@acme.com", "Backend Engineer next round", "We would like to invite you to interview", 3)
+        self.message('4', "jobs@globex.com", "Job offer", "We are pleased to offer you the position", 4)
+        self.message('5', "news@globex.com", "Globex newsletter", "Schedule an interview with our webinar", 5)
+
+        # One message per batch, so each status change is its own update and transition
+        result = classify_pending(self.user, batch_size=1)
+        self.assertEqual(result.as_dict(), {'messages': 5, 'matched': 4, 'categorized': 4, 'updated': 3})
+        statuses = dict(JobApplication.objects.filter(user=self.user).values_list('id', 'status'))
+        self.assertEqual(statuses, {self.acme.pk: 'rejected', self.acme_design.pk: 'applied', self.globex.pk: 'accepted'})
+        self.assertEqual(
+            list(StatusTransition.objects.filter(application=self.acme).order_by('id').values_list('to_status', flat=True)),
+            ['applied', 'interview', 'rejected'],
+        )
+        self.assertEqual(GmailMessage.objects.get(gmail_id='5').category, '')
+
+        # Already classified messages are not processed again
+        self.assertEqual(classify_pending(self.user).messages, 0)
+
+    def test_withdrawn_applications_are_left_alone(self):
+        withdrawn = self.application("Initech", "QA Engineer", date.today(), status='withdrawn')
+        self.message('1', "hr@initech.com", "Interview invitation", "Please share your availability", 1)
+        self.assertEqual(classify_pending(self.user).updated, 0)
+        withdrawn.refresh_from_db()
+        self.assertEqual(withdrawn.status, 'withdrawn')
+        self.assertEqual(GmailMessage.objects.get(gmail_id='1').application_id, withdrawn.pk)
+
+
+def leaf(mime_type, text, **fields):
+    """Return a MIME leaf part carrying text."""
+    return dict(
+        mimeType=mime_type, body={'data': base64.urlsafe_b64encode(text.encode()).decode('ascii')}, **fields,
+    )
+
+
+def multipart(*parts):
+    return {'mimeType': 'multipart/mixed', 'parts': list(parts)}
+
+
+class ExtractBodiesTests(TestCase):
+    """extract_bodies keeps within its limits and never decodes attachments."""
+
+    def test_nested_payload(self):
+        payload = mime_payload("plain body", "<p>html body</p>", depth=3, attachments=2, attachment_size=1000, forwarded=2)
+        self.assertEqual(extract_bodies(payload), {'text': "plain body", 'html': "<p>html body</p>", 'truncated': False})
+
+    def test_attachments_are_skipped(self):
+        attachments = [
+            leaf('text/plain', "named", filename='notes.txt'),
+            leaf('text/plain', "disposition", headers=[{'name': 'Content-Disposition', 'value': 'attachment'}]),
+            {'mimeType': 'text/html', 'filename': '', 'body': {'attachmentId': 'abc', 'size': 10}},
+            # Subparts of an attached message are skipped with it
+            dict(multipart(leaf('text/plain', "forwarded")), filename='forwarded.eml'),
+        ]
+        payload = multipart(*attachments, leaf('text/plain', "body"), leaf('text/html', "<b>body</b>"))
+        self.assertEqual(extract_bodies(payload), {'text': "body", 'html': "<b>body</b>", 'truncated': False})
+        # A message that is only an attachment has no body
+        self.assertEqual(extract_bodies(attachments[0])['text'], "")
+
+    def test_single_part_fallback(self):
+        self.assertEqual(extract_bodies(leaf('application/octet-stream', "raw"))['text'], "raw")
+
+    def test_body_limits(self):
+        payload = multipart(leaf('text/plain', "t" * 100), leaf('text/html', "h" * 100))
+        bodies = extract_bodies(payload, max_body_bytes=40)
+        self.assertEqual((bodies['text'], bodies['html'], bodies['truncated']), ("t" * 40, "h" * 40, True))
+        # The total budget is shared by both bodies, in document order
+        bodies = extract_bodies(payload, max_body_bytes=40, max_total_bytes=50)
+        self.assertEqual((bodies['text'], bodies['html'], bodies['truncated']), ("t" * 40, "h" * 10, True))
+        self.assertFalse(extract_bodies(payload, max_body_bytes=100)['truncated'])
+
+    def test_part_limit(self):
+        filler = [{'mimeType': 'application/octet-stream', 'body': {}} for _ in range(MAX_MIME_PARTS)]
+        payload = multipart(*filler, leaf('text/plain', "late body"))
+        self.assertEqual(extract_bodies(payload), {'text': "", 'html': "", 'truncated': True})
+        self.assertEqual(extract_bodies(payload, max_parts=MAX_MIME_PARTS + 2)['text'], "late body")
+
+    def test_decode_prefix(self):
+        data = base64.urlsafe_b64encode("é".encode() * 10).decode('ascii').rstrip("=")
+        self.assertEqual(b64url_decode_prefix(data, 100), ("é" * 10, 20, False))
+        # A character cut in half by the limit is dropped
+        self.assertEqual(b64url_decode_prefix(data, 5), ("éé", 5, True))
+        self.assertEqual(b64url_decode_prefix("", 10), ("", 0, False))
+
+
+class BlobStoreTests(TestCase):
+    """The blob store deduplicates content and evicts least recently used blobs."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.rng = random.Random(0)
+
+    def content(self, size=4000):
+        # Random bytes do not compress, so stored sizes are predictable
+        return self.rng.randbytes(size)
+
+    def disk_bytes(self):
+        return sum(
+            os.path.getsize(os.path.join(dirpath, name))
+            for dirpath, _dirnames, filenames in os.walk(self.root) for name in filenames
+        )
+
+    def test_dedup(self):
+        store = BlobStore(self.root)
+        data = self.content()
+        key = store.put(data)
+        size = store.total_bytes()
+        self.assertEqual(store.put(data), key)
+        self.assertEqual(store.total_bytes(), size)
+        self.assertEqual(self.disk_bytes(), size)
+        self.assertEqual(store.get(key), data)
+        self.assertEqual(store.get_text(store.put("text body")), "text body")
+
+        self.assertTrue(store.delete(key))
+        self.assertIsNone(store.get(key))
+        self.assertFalse(store.delete(key))
+
+    def test_lru_eviction(self):
+        store = BlobStore(self.root)
+        keys = [store.put(self.content()) for _ in range(5)]
+        # Oldest first, all older than TOUCH_INTERVAL
+        now = time.time()
+        for age, key in zip([500, 400, 300, 200, 100], keys):
+            os.utime(store.path(key), (now - age, now - age))
+        store.max_bytes = store.total_bytes()
+
+        # Reading the oldest blob makes it the most recently used
+        self.assertIsNotNone(store.get(keys[0]))
+        new_key = store.put(self.content())
+
+        self.assertLessEqual(store.total_bytes(), store.max_bytes * LOW_WATER)
+        self.assertEqual(store.total_bytes(), self.disk_bytes())
+        self.assertEqual(
+            [store.exists(key) for key in keys + [new_key]],
+            [True, False, False, True, True, True],
+        )
+
+
+class HydrateBodiesTests(TestCase):
+    """Bodies are fetched once and fetched again after eviction."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(GMAIL_BLOB_STORE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        get_blob_store.cache_clear()
+        self.addCleanup(get_blob_store.cache_clear)
+
+        self.user = User.objects.create(username='reader')
+        self.server = FakeGmailServer(FakeMailbox(5, body_size=300)).start()
+        self.addCleanup(self.server.stop)
+        self.service = build_fake_service(self.server.url)
+        sync_mailbox(self.user, self.service)
+        self.ids = self.server.mailbox.ids()
+
+    def test_refetch_after_eviction(self):
+        bodies = hydrate_bodies(self.user, self.ids, self.service)
+        self.assertEqual(GmailMessage.objects.filter(user=self.user, has_body=True).count(), len(self.ids))
+        keys = {gmail_id: body['html_blob'] for gmail_id, body in bodies.items()}
+        self.assertTrue(all(keys.values()))
+        self.assertFalse(GmailMessage.objects.exclude(html_body="").exists())
+
+        # Without a service, only bodies already kept can be returned (the
+        # user has no credentials to build one)
+        self.assertEqual(hydrate_bodies(self.user, self.ids), bodies)
+
+        evicted = self.ids[0]
+        get_blob_store().delete(keys[evicted])
+        with self.assertRaises(ValueError):
+            hydrate_bodies(self.user, self.ids)
+        self.assertEqual(hydrate_bodies(self.user, self.ids, self.service), bodies)
+        self.assertTrue(get_blob_store().exists(keys[evicted]))
+
+
+def run_threads(count, target):
+    """Run target(index) in count threads started together; returns their results."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        try:
+            barrier.wait()
+            results[index] = target(index)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class ServiceCacheTests(TransactionTestCase):
+    """Concurrent callers refresh an expired token once and persist it once."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='gmail-user')
+        app = SocialApp.objects.create(provider='google', name='Google', client_id='id', secret='secret')
+        account = SocialAccount.objects.create(user=self.user, provider='google', uid='1')
+        SocialToken.objects.create(
+            app=app, account=account, token='expired', token_secret='refresh-token',
+            expires_at=datetime.now(dt_timezone.utc) - timedelta(minutes=5),
+        )
+        self.cache = ServiceCache()
+
+        self.lock = threading.Lock()
+        self.refresh_calls = 0
+        self.release_refresh = threading.Event()
+        self.release_refresh.set()
+        patcher = mock.patch.object(Credentials, 'refresh', autospec=True, side_effect=self.fake_refresh)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.token_saves = 0
+        post_save.connect(self.count_save, sender=SocialToken)
+        self.addCleanup(post_save.disconnect, self.count_save, sender=SocialToken)
+
+    def fake_refresh(self, credentials, request):
+        with self.lock:
+            self.refresh_calls += 1
+            number = self.refresh_calls
+        self.release_refresh.wait(5)
+        # Long enough for every waiting thread to pile up on the user's lock
+        time.sleep(0.05)
+        credentials.token = f'token-{number}'
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    def count_save(self, **kwargs):
+        with self.lock:
+            self.token_saves += 1
+
+    def stored_token(self):
+        return SocialToken.objects.get(account__user=self.user).token
+
+    def test_concurrent_get(self):
+        services = run_threads(8, lambda _index: self.cache.get(self.user))
+        self.assertEqual(len(set(map(id, services))), 1)
+        self.assertEqual((self.refresh_calls, self.token_saves, self.cache.refreshes), (1, 1, 1))
+        self.assertEqual(self.stored_token(), 'token-1')
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_transport_refreshes_are_single_flight(self):
+        credentials = self.cache.get(self.user)._http.credentials
+        self.assertEqual((self.refresh_calls, self.token_saves), (1, 1))
+
+        # The token expires while worker threads are fetching
+        credentials.credentials.expiry = datetime.utcnow() - timedelta(minutes=1)
+
+        def request(_index):
+            headers = {}
+            credentials.before_request(None, 'GET', 'https://gmail.googleapis.com/', headers)
+            return headers['authorization']
+
+        self.assertEqual(set(run_threads(8, request)), {'Bearer token-2'})
+        self.assertEqual((self.refresh_calls, self.token_saves), (2, 2))
+
+        # Every thread's request is rejected with the same token: one refresh
+        def rejected(index):
+            request(index)
+            credentials.refresh(None)
+
+        run_threads(8, rejected)
+        self.assertEqual((self.refresh_calls, self.token_saves), (3, 3))
+        self.assertEqual(self.stored_token(), 'token-3')
+
+    def test_eviction_keeps_the_lock_of_a_refreshing_user(self):
+        cache = ServiceCache(maxsize=1)
+        self.release_refresh.clear()
+        first = threading.Thread(target=lambda: (cache.get(self.user), connection.close()))
+        first.start()
+        while not self.refresh_calls:
+            time.sleep(0.01)
+
+        # Another user's entry evicts this user's while the refresh is running
+        cache.put(self.user.pk + 1, object(), Credentials('other'))
+        second = threading.Thread(target=lambda: (cache.get(self.user), connection.close()))
+        second.start()
+        time.sleep(0.1)
+        self.release_refresh.set()
+        first.join()
+        second.join()
+
+        # The second caller waited and then loaded the refreshed token
+        self.assertEqual((self.refresh_calls, self.token_saves), (1, 1))
+        self.assertEqual(cache.peek_credentials(self.user.pk).token, 'token-1')
+
+
+class FetchPipelineTests(TestCase):
+    """The async pipeline returns what the thread-pool fetch does, and fails as a whole."""
+
+    def setUp(self):
+        # Jittered latency so messages finish out of listing order
+        self.server = FakeGmailServer(FakeMailbox(40, body_size=300), jitter=0.01, seed=1).start()
+        self.addCleanup(self.server.stop)
+        self.service = build_fake_service(self.server.url)
+
+    def pipeline(self, client_class=AsyncGmailClient, **kwargs):
+        async def run():
+            async with client_class(base_url=self.server.url) as client:
+                return await fetch_pipeline(client, workers=4, **kwargs)
+        return asyncio.run(run())
+
+    def test_matches_thread_pool_fetch(self):
+        expected = fetch_messages(self.service, list_message_ids(self.service, max_results=30))
+        self.assertEqual(self.pipeline(max_results=30), expected)
+
+    def test_matches_summaries(self):
+        expected = list_messages(self.service, max_results=30)
+        self.assertEqual(self.pipeline(max_results=30, include_bodies=False), expected)
+
+    def test_failure_cancels_other_stages(self):
+        failing_id = self.server.mailbox.ids()[5]
+        gets = []
+
+        class FailingClient(AsyncGmailClient):
+            async def get_message(self, message_id, **kwargs):
+                gets.append(message_id)
+                if message_id == failing_id:
+                    raise HttpError(httplib2.Response({"status": 404}), b"", uri=message_id)
+                return await super().get_message(message_id, **kwargs)
+
+        pending = []
+
+        async def run():
+            async with FailingClient(base_url=self.server.url) as client:
+                try:
+                    await fetch_pipeline(client, max_results=40, workers=4)
+                finally:
+                    pending.extend(asyncio.all_tasks() - {asyncio.current_task()})
+
+        with self.assertRaises(HttpError) as raised:
+            asyncio.run(run())
+        self.assertEqual(raised.exception.resp.status, 404)
+        # Nothing is left running, and bounded queues stopped the list stage early
+        self.assertEqual(pending, [])
+        self.assertLess(len(gets), 40)
+
+
+class TokenBucketTests(TestCase):
+    """Requests beyond the bucket's capacity wait for it to refill."""
+
+    def test_reserve_delays_beyond_capacity(self):
+        with mock.patch('googlelogin.gmail_async.time.monotonic', return_value=100.0) as clock:
+            bucket = TokenBucket(rate=100, capacity=10)
+            self.assertEqual([bucket.reserve(5), bucket.reserve(5)], [0.0, 0.0])
+            self.assertAlmostEqual(bucket.reserve(5), 0.05)
+            self.assertAlmostEqual(bucket.reserve(5), 0.10)
+
+            clock.return_value = 100.2
+            # Refilled to capacity, not beyond
+            self.assertEqual(bucket.reserve(10), 0.0)
+            self.assertAlmostEqual(bucket.reserve(5), 0.05)
+
+    def test_acquire_waits(self):
+        bucket = TokenBucket(rate=200, capacity=5)
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire(5)
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.045)
+
+
+class AsyncGetEmailsTests(TestCase):
+    """aget_emails handles failures like get_emails."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='async-reader')
+        service_cache.put(self.user.pk, object(), Credentials('revoked'))
+        self.addCleanup(service_cache.invalidate, self.user.pk)
+
+    def test_unauthorized_drops_cached_service(self):
+        unauthorized = HttpError(httplib2.Response({"status": 401}), b"", uri="/gmail/v1/users/me/messages")
+        with mock.patch.object(AsyncGmailClient, 'get', side_effect=unauthorized):
+            result = asyncio.run(aget_emails(self.user))
+        self.assertFalse(result['success'])
+        self.assertIsNone(service_cache.peek_credentials(self.user.pk))
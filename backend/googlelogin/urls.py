@@ -9,4 +9,7 @@ urlpatterns = [
     path("api/auth/csrf-token/", views.get_csrf_token, name="csrf_token"),
     path("auth-success/", views.auth_success, name="auth_success"),
     path("test-gmail/", views.test_gmail, name="test_gmail"),
+    path("api/gmail/messages/", views.gmail_messages, name="gmail_messages"),
+    path("test-gmail/messages/<str:gmail_id>/body/", views.gmail_message_body, name="gmail_message_body"),
+    path("test-gmail/blobs/<str:key>/", views.gmail_blob, name="gmail_blob"),
 ]
\ No newline at end of file
@@ -1,11 +1,15 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import logout as auth_logout
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.middleware.csrf import get_token
 from django.contrib.auth.decorators import login_required
 from job_tracker.serializers import UserSerializer
 from .gmail_service import get_gmail_service, get_emails  # Changed from get_recent_messages
+from .gmail_async import aget_emails
+from .sync import get_synced_emails, message_body
+from .blobstore import KEY_PATTERN, get_blob_store
+from .models import GmailMessage
 def home(request):
     return render(request, 'home.html')
 
@@ -40,16 +44,12 @@ def test_gmail(request):
     error_message = None
     
     try:
-        # Use get_emails directly - it handles everything internally
-        result = get_emails(
-            user=request.user,
-            query="in:inbox", 
-            max_results=10
-        )
+        # Syncs the local mirror, then reads the newest messages from it
+        result = get_synced_emails(user=request.user, max_results=10)
         
-        if result["success"]:
-            messages = result["messages"]
-        else:
+        # Mirrored messages are shown even when the sync itself failed
+        messages = result["messages"]
+        if not result["success"]:
             error_message = result.get("error", "Could not connect to Gmail. Please check your permissions.")
     
     except Exception as e:
@@ -62,4 +62,74 @@ def test_gmail(request):
     return render(request, 'home.html', {
         'messages': messages,
         'error_message': error_message
-    })
\ No newline at end of file
+    })
+
+
+@login_required
+def gmail_message_body(request, gmail_id):
+    """Return a mirrored message's bodies, fetching them from Gmail on first use"""
+    try:
+        body = message_body(request.user, gmail_id)
+    except Exception as e:
+        return JsonResponse({'error': f"Error accessing Gmail: {str(e)}"}, status=502)
+    if body is None:
+        return JsonResponse({'error': 'Message not found'}, status=404)
+    return JsonResponse(body)
+
+
+@login_required
+def gmail_blob(request, key):
+    """
+    Serve a stored HTML body by its blob key.
+
+    Only keys of the user's own mirrored messages are served. Clients that
+    accept gzip get the stored bytes as they are; others get them
+    decompressed while streaming. The HTML is sandboxed: it is third-party
+    content and must not run scripts on this origin.
+    """
+    if not KEY_PATTERN.fullmatch(key) or not GmailMessage.objects.filter(user=request.user, html_blob=key).exists():
+        raise Http404("Message body not found")
+    accepts_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    reader = get_blob_store().open(key, decode=not accepts_gzip)
+    if reader is None:
+        # Evicted; opening the message fetches it again
+        raise Http404("Message body not found")
+
+    response = StreamingHttpResponse(reader, content_type='text/html; charset=utf-8')
+    if accepts_gzip:
+        response['Content-Encoding'] = 'gzip'
+        response['Content-Length'] = str(reader.size)
+    response['Vary'] = 'Accept-Encoding'
+    response['Content-Security-Policy'] = 'sandbox'
+    response['X-Content-Type-Options'] = 'nosniff'
+    # Content never changes under a key
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+
+async def gmail_messages(request):
+    """
+    Return the user's Gmail messages as JSON, fetched on the event loop.
+
+    Query parameters: q (Gmail search, default "in:inbox newer_than:7d"),
+    max_results (1-100, default 10) and bodies (0 for headers only). The
+    request holds no worker thread while Gmail answers, so under ASGI
+    (uvicorn jobtracker.asgi:application) one process serves many of them.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    try:
+        max_results = int(request.GET.get('max_results', 10))
+    except ValueError:
+        return JsonResponse({'error': 'max_results must be an integer'}, status=400)
+    if not 1 <= max_results <= 100:
+        return JsonResponse({'error': 'max_results must be between 1 and 100'}, status=400)
+
+    result = await aget_emails(
+        user,
+        query=request.GET.get('q', 'in:inbox newer_than:7d'),
+        max_results=max_results,
+        include_bodies=request.GET.get('bodies', '1') != '0',
+    )
+    return JsonResponse(result, status=200 if result['success'] else 502)
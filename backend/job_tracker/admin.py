@@ -6,7 +6,7 @@ It defines how models are displayed and managed in the admin panel.
 """
 
 from django.contrib import admin
-from .models import JobApplication, ResumeTemplate, Experience, Project, Education, MeetingNote, Notification
+from .models import JobApplication, ApplicationStats, StatusTransition, ResumeTemplate, Experience, Project, Education, MeetingNote, Notification
 
 
 @admin.register(JobApplication)
@@ -41,7 +41,7 @@ class JobApplicationAdmin(admin.ModelAdmin):
             'fields': ('status', 'applied_date', 'location', 'salary_range')
         }),
         ('Additional Information', {
-            'fields': ('notes', 'meeting_minutes')
+            'fields': ('job_description', 'notes', 'meeting_minutes')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -50,6 +50,39 @@ class JobApplicationAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for StatusTransition model.
+    
+    Transitions are an append-only log, so they can be browsed but not edited.
+    """
+    
+    list_display = ['application', 'from_status', 'to_status', 'occurred_at']
+    list_filter = ['to_status', 'occurred_at']
+    search_fields = ['application__position', 'application__company_name']
+    date_hierarchy = 'occurred_at'
+    readonly_fields = ['application', 'from_status', 'to_status', 'occurred_at', 'created_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ApplicationStats)
+class ApplicationStatsAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for ApplicationStats model.
+    
+    Counters are maintained automatically, so they are shown read-only.
+    """
+    
+    list_display = ['user', 'total', 'applied', 'interview', 'rejected', 'accepted', 'withdrawn', 'updated_at']
+    readonly_fields = ['user', 'total', 'applied', 'interview', 'rejected', 'accepted', 'withdrawn', 'updated_at']
+
+
 @admin.register(ResumeTemplate)
 class ResumeTemplateAdmin(admin.ModelAdmin):
     """
@@ -226,10 +259,10 @@ class NotificationAdmin(admin.ModelAdmin):
     """
     
     # Fields to display in the list view
-    list_display = ['title', 'user', 'job_application', 'show_date', 'is_read', 'is_active', 'created_at']
+    list_display = ['title', 'user', 'job_application', 'show_date', 'is_delivered', 'is_read', 'is_active', 'created_at']
     
     # Fields to filter by in the admin interface
-    list_filter = ['is_read', 'is_active', 'show_date', 'created_at', 'user']
+    list_filter = ['is_delivered', 'is_read', 'is_active', 'show_date', 'created_at', 'user']
     
     # Fields to search by
     search_fields = ['title', 'message', 'user__username', 'job_application__position', 'job_application__company_name']
@@ -238,7 +271,7 @@ class NotificationAdmin(admin.ModelAdmin):
     date_hierarchy = 'show_date'  # Changed from 'created_at' to 'show_date'
     
     # Make certain fields read-only
-    readonly_fields = ['created_at', 'updated_at', 'should_show']
+    readonly_fields = ['is_delivered', 'delivered_at', 'created_at', 'updated_at', 'should_show']
     
     # Group related fields together
     fieldsets = (
@@ -249,7 +282,7 @@ class NotificationAdmin(admin.ModelAdmin):
             'fields': ('show_date', 'is_read', 'is_active')  # Changed from 'Notification Settings'
         }),
         ('System Information', {
-            'fields': ('should_show', 'created_at', 'updated_at'),
+            'fields': ('should_show', 'is_delivered', 'delivered_at', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
@@ -0,0 +1,189 @@
+"""
+Job Tracker Analytics
+
+This module computes analytics from the StatusTransition event log:
+
+- the application funnel (the Applied -> Interview -> Accepted/Rejected/
+  Withdrawn flow shown as a Sankey diagram), computed in the database and
+  cached per user (and current-status filter) until an application is
+  saved or deleted
+- per-application timelines
+- time spent in each stage
+"""
+
+from collections import defaultdict
+from statistics import median
+
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import JobApplication, StatusTransition
+
+
+# Funnel stages in display order, matching the frontend Sankey colours
+FUNNEL_STAGES = [
+    {'id': 'applied', 'label': 'Applied', 'color': '#17a2b8'},
+    {'id': 'interview', 'label': 'Interview', 'color': '#ffc107'},
+    {'id': 'rejected', 'label': 'Rejected', 'color': '#dc3545'},
+    {'id': 'accepted', 'label': 'Accepted', 'color': '#28a745'},
+    {'id': 'withdrawn', 'label': 'Withdrawn', 'color': '#6c757d'},
+]
+
+# Outcomes an application can end in, after or without an interview
+OUTCOMES = ['accepted', 'rejected', 'withdrawn']
+
+# Cached funnels expire even without writes, as a safety net for caches
+# that are not shared between worker processes
+FUNNEL_CACHE_TIMEOUT = 60 * 5
+
+
+def funnel_cache_key(user_id=None, status=None):
+    """
+    Return the cache key for a user's funnel (or the unscoped funnel when
+    user_id is None), optionally limited to applications with one status.
+    """
+    key = f"job_tracker:funnel:{user_id if user_id is not None else 'all'}"
+    return f"{key}:{status}" if status else key
+
+
+def invalidate_funnel(user_id=None):
+    """Drop the cached funnels (every status filter) for a user together with the unscoped ones."""
+    statuses = [None] + [value for value, _label in JobApplication.STATUS_CHOICES]
+    keys = [funnel_cache_key(None, status) for status in statuses]
+    if user_id is not None:
+        keys += [funnel_cache_key(user_id, status) for status in statuses]
+    cache.delete_many(keys)
+
+
+def _funnel_counts(queryset):
+    """
+    Count every funnel flow in a single aggregate query.
+
+    An application counts as interviewed when its transition log contains a
+    move into interview. Outcomes are split by whether the application went
+    through an interview first.
+    """
+    interviewed = Q(Exists(
+        StatusTransition.objects.filter(application=OuterRef('pk'), to_status='interview')
+    ))
+    aggregates = {
+        'total': Count('id'),
+        'interviewed': Count('id', filter=interviewed),
+    }
+    for outcome in OUTCOMES:
+        aggregates[f'interview_{outcome}'] = Count('id', filter=Q(status=outcome) & interviewed)
+        aggregates[f'applied_{outcome}'] = Count('id', filter=Q(status=outcome) & ~interviewed)
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def build_funnel(counts):
+    """
+    Turn funnel counts into Sankey nodes and links.
+
+    Args:
+        counts: dict returned by _funnel_counts
+
+    Returns:
+        dict: {'nodes': [...], 'links': [...]} with zero-value entries omitted
+    """
+    links = []
+    if counts['interviewed']:
+        links.append({'source': 'applied', 'target': 'interview', 'value': counts['interviewed']})
+    for outcome in OUTCOMES:
+        if counts[f'applied_{outcome}']:
+            links.append({'source': 'applied', 'target': outcome, 'value': counts[f'applied_{outcome}']})
+        if counts[f'interview_{outcome}']:
+            links.append({'source': 'interview', 'target': outcome, 'value': counts[f'interview_{outcome}']})
+
+    used = {'applied'} if counts['total'] else set()
+    for link in links:
+        used.add(link['target'])
+    nodes = [dict(stage) for stage in FUNNEL_STAGES if stage['id'] in used]
+    return {'nodes': nodes, 'links': links}
+
+
+def get_funnel(queryset, user_id=None, status=None):
+    """
+    Return the Sankey funnel for a queryset of applications, using the cache.
+
+    Args:
+        queryset: QuerySet of JobApplication rows the funnel is computed over
+        user_id: Owner the queryset is scoped to (None when unscoped); used as cache key
+        status: Only count applications whose current status is this one
+
+    Returns:
+        dict: {'nodes': [...], 'links': [...]}
+    """
+    key = funnel_cache_key(user_id, status)
+    funnel = cache.get(key)
+    if funnel is None:
+        if status:
+            queryset = queryset.filter(status=status)
+        funnel = build_funnel(_funnel_counts(queryset))
+        cache.set(key, funnel, FUNNEL_CACHE_TIMEOUT)
+    return funnel
+
+
+def application_timeline(application):
+    """
+    Return the ordered status transitions of one application.
+
+    Returns:
+        list: dicts with from_status, to_status and occurred_at
+    """
+    return list(
+        application.status_transitions.order_by('occurred_at', 'id')
+        .values('from_status', 'to_status', 'occurred_at')
+    )
+
+
+def time_in_stage(queryset, now=None):
+    """
+    Measure how long applications stay in each status.
+
+    The transition log is streamed in (application, time) order; the time in
+    a stage is the gap until the next transition of the same application.
+    Stages an application is still in are reported separately as open, with
+    their age measured up to now.
+
+    Args:
+        queryset: QuerySet of JobApplication rows to include
+        now: Reference time for open stages (defaults to the current time)
+
+    Returns:
+        dict: Per status: completed count, average and median days, and the
+            number and average age of open stages
+    """
+    now = now or timezone.now()
+    durations = defaultdict(list)
+    open_ages = defaultdict(list)
+
+    transitions = (
+        StatusTransition.objects
+        .filter(application__in=queryset.order_by().values('pk'))
+        .order_by('application_id', 'occurred_at', 'id')
+        .values_list('application_id', 'to_status', 'occurred_at')
+    )
+    previous = None
+    for application_id, status, occurred_at in transitions.iterator(chunk_size=2000):
+        if previous is not None and previous[0] == application_id:
+            durations[previous[1]].append((occurred_at - previous[2]).total_seconds() / 86400)
+        elif previous is not None:
+            open_ages[previous[1]].append((now - previous[2]).total_seconds() / 86400)
+        previous = (application_id, status, occurred_at)
+    if previous is not None:
+        open_ages[previous[1]].append((now - previous[2]).total_seconds() / 86400)
+
+    result = {}
+    for stage in FUNNEL_STAGES:
+        days = durations.get(stage['id'], [])
+        ages = open_ages.get(stage['id'], [])
+        result[stage['id']] = {
+            'completed': len(days),
+            'average_days': round(sum(days) / len(days), 2) if days else None,
+            'median_days': round(median(days), 2) if days else None,
+            'open': len(ages),
+            'open_average_days': round(sum(ages) / len(ages), 2) if ages else None,
+        }
+    return result
@@ -16,3 +16,7 @@ class JobTrackerConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'job_tracker'
+
+    def ready(self):
+        """Connect signal receivers that keep derived data in sync."""
+        from . import signals  # noqa: F401
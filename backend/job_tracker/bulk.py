@@ -0,0 +1,380 @@
+"""
+Job Tracker Bulk Operations
+
+This module implements bulk create, update and delete of job applications.
+Each operation validates every item, reports per-item errors, and writes
+the valid items with bulk_create/bulk_update/delete in a single
+transaction. The per-row signal receivers are suspended for the duration
+of the write, and the derived data they would maintain (status transitions,
+stats counters, search and skill indexes, cached funnel) is updated in batches instead.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import analytics, search, signals, skills, stats
+from .models import JobApplication, StatusTransition
+
+
+# Rows written per INSERT/UPDATE statement
+BATCH_SIZE = 500
+
+# How conflicts on (user, company_name, position) are resolved on create
+CONFLICT_ERROR = 'error'
+CONFLICT_SKIP = 'skip'
+CONFLICT_UPSERT = 'upsert'
+CONFLICT_MODES = [CONFLICT_ERROR, CONFLICT_SKIP, CONFLICT_UPSERT]
+
+
+class JobApplicationBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Validates one item of a bulk request.
+
+    The unique_together validator is disabled: conflicts are detected for
+    the whole batch with one query instead of one query per item.
+    """
+
+    class Meta:
+        model = JobApplication
+        exclude = ['user']
+        read_only_fields = ('created_at', 'updated_at', 'interview_date', 'rejected_date', 'accepted_date', 'withdrawn_date')
+        validators = []
+
+
+class BulkResult:
+    """Counts and per-item errors of one bulk operation."""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.errors = []
+
+    def add_error(self, index, errors):
+        self.errors.append({'index': index, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'deleted': self.deleted,
+            'errors': sorted(self.errors, key=lambda error: error['index']),
+        }
+
+
+def _validate_items(items, partial=False):
+    """
+    Validate every item with one reusable serializer instance.
+
+    Returns:
+        tuple: (list of (index, validated_data), BulkResult holding the errors)
+    """
+    result = BulkResult()
+    serializer = JobApplicationBulkItemSerializer(partial=partial)
+    valid = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            result.add_error(index, {'non_field_errors': ['Expected an object.']})
+            continue
+        try:
+            valid.append((index, serializer.run_validation(item)))
+        except serializers.ValidationError as e:
+            result.add_error(index, e.detail)
+    return valid, result
+
+
+def _existing_by_key(user_id, keys):
+    """Return {(company_name, position): JobApplication} for the user's rows matching keys."""
+    existing = {}
+    companies = sorted({company for company, _position in keys})
+    for start in range(0, len(companies), BATCH_SIZE):
+        rows = JobApplication.objects.filter(user_id=user_id, company_name__in=companies[start:start + BATCH_SIZE])
+        for application in rows:
+            key = (application.company_name, application.position)
+            if key in keys:
+                existing[key] = application
+    return existing
+
+
+def _apply_updates(applications, changes, now):
+    """
+    Apply validated changes to loaded applications.
+
+    Status changes fill the legacy status date column on the first visit to
+    a status and produce a StatusTransition.
+
+    Returns:
+        tuple: (list of changed field names per application, list of
+            StatusTransition, list of (old, new) statuses)
+    """
+    changed_fields = []
+    transitions = []
+    status_changes = []
+    for application, attrs in zip(applications, changes):
+        old_status = application.status
+        fields = ['updated_at']
+        for attr, value in attrs.items():
+            # Only write columns whose value actually changes
+            if getattr(application, attr) != value:
+                setattr(application, attr, value)
+                fields.append(attr)
+        if application.status != old_status:
+            date_field = JobApplication.STATUS_DATE_FIELDS.get(application.status)
+            if date_field and not getattr(application, date_field):
+                setattr(application, date_field, now)
+                fields.append(date_field)
+            transitions.append(StatusTransition(
+                application=application, from_status=old_status,
+                to_status=application.status, occurred_at=now,
+            ))
+            status_changes.append((old_status, application.status))
+        application.updated_at = now
+        changed_fields.append(fields)
+    return changed_fields, transitions, status_changes
+
+
+def _write_updates(applications, changed_fields):
+    """
+    Write updated applications back to the database.
+
+    Applications receiving identical values (e.g. a batch of status changes)
+    are written with one plain UPDATE ... WHERE id IN (...) per group; the
+    remaining one-off changes go through bulk_update. This avoids building
+    a CASE expression per row for the common case.
+    """
+    groups = defaultdict(list)
+    for application, fields in zip(applications, changed_fields):
+        values = tuple(sorted((field, getattr(application, field)) for field in set(fields)))
+        groups[values].append(application.pk)
+
+    singles = []
+    single_fields = set()
+    for values, pks in groups.items():
+        if len(pks) == 1:
+            singles.append(pks[0])
+            single_fields.update(field for field, _value in values)
+            continue
+        for start in range(0, len(pks), BATCH_SIZE):
+            JobApplication.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).update(**dict(values))
+
+    if singles:
+        singles = set(singles)
+        JobApplication.objects.bulk_update(
+            [application for application in applications if application.pk in singles],
+            sorted(single_fields),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def _with_changed_text(applications, changed_fields):
+    """Return the applications whose skill-indexed text changed."""
+    return [
+        application for application, fields in zip(applications, changed_fields)
+        if skills.INDEXED_FIELDS.intersection(fields)
+    ]
+
+
+def insert_applications(user, applications, now=None):
+    """
+    Insert new applications of one user and maintain their derived data.
+
+    Must be called inside transaction.atomic() and signals.suspended(); the
+    caller is responsible for invalidating the user's funnel afterwards.
+
+    Args:
+        user: Owner of the applications
+        applications: Unsaved JobApplication instances
+        now: Time recorded for the initial status transitions
+
+    Returns:
+        list: The created applications
+    """
+    now = now or timezone.now()
+    created = JobApplication.objects.bulk_create(applications, batch_size=BATCH_SIZE)
+    StatusTransition.objects.bulk_create([
+        StatusTransition(application=application, from_status=None, to_status=application.status, occurred_at=now)
+        for application in created
+    ], batch_size=BATCH_SIZE)
+    stats.record_changes(user.pk, created=[application.status for application in created])
+    search.index_applications(created)
+    skills.index_applications(created)
+    return created
+
+
+def bulk_create_applications(user, items, on_conflict=CONFLICT_ERROR):
+    """
+    Create many applications for a user in one transaction.
+
+    Args:
+        user: Owner of the new applications
+        items: List of application dicts
+        on_conflict: What to do when (company_name, position) already exists:
+            'error' reports the item, 'skip' leaves the existing row alone,
+            'upsert' updates the existing row with the item's fields
+
+    Returns:
+        dict: created/updated/skipped counts and per-item errors
+    """
+    valid, result = _validate_items(items)
+
+    # Reject duplicate keys inside the request itself
+    seen = {}
+    unique = []
+    for index, data in valid:
+        key = (data['company_name'], data['position'])
+        if key in seen:
+            result.add_error(index, {'non_field_errors': [f'Duplicate of item {seen[key]} in this request.']})
+            continue
+        seen[key] = index
+        unique.append((index, data))
+
+    existing = _existing_by_key(user.pk, set(seen))
+    to_create = []
+    to_update = []
+    update_changes = []
+    for index, data in unique:
+        application = existing.get((data['company_name'], data['position']))
+        if application is None:
+            to_create.append(JobApplication(user=user, **data))
+        elif on_conflict == CONFLICT_SKIP:
+            result.skipped += 1
+        elif on_conflict == CONFLICT_UPSERT:
+            to_update.append(application)
+            update_changes.append(data)
+        else:
+            result.add_error(index, {'non_field_errors': [
+                'An application for this company and position already exists.'
+            ]})
+
+    now = timezone.now()
+    with transaction.atomic(), signals.suspended():
+        created = insert_applications(user, to_create, now)
+        if to_update:
+            changed_fields, transitions, status_changes = _apply_updates(to_update, update_changes, now)
+            _write_updates(to_update, changed_fields)
+            StatusTransition.objects.bulk_create(transitions, batch_size=BATCH_SIZE)
+            stats.record_changes(user.pk, transitions=status_changes)
+            search.index_applications(to_update)
+            skills.index_applications(_with_changed_text(to_update, changed_fields))
+    analytics.invalidate_funnel(user.pk)
+
+    result.created = len(created)
+    result.updated = len(to_update)
+    return result.as_dict()
+
+
+def bulk_update_applications(queryset, items):
+    """
+    Partially update many applications in one transaction.
+
+    Args:
+        queryset: QuerySet of applications the caller may update
+        items: List of dicts, each with an 'id' plus the fields to change
+
+    Returns:
+        dict: updated count and per-item errors
+    """
+    ids = []
+    payloads = []
+    result = BulkResult()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or 'id' not in item:
+            result.add_error(index, {'id': ['This field is required.']})
+            continue
+        ids.append((index, item['id']))
+        payloads.append({key: value for key, value in item.items() if key != 'id'})
+
+    valid, validation = _validate_items(payloads, partial=True)
+    for error in validation.errors:
+        result.add_error(ids[error['index']][0], error['errors'])
+
+    applications = queryset.order_by().in_bulk([ids[position][1] for position, _data in valid])
+    found = []
+    renamed = defaultdict(set)
+    for position, data in valid:
+        index, pk = ids[position]
+        application = applications.get(pk)
+        if application is None:
+            result.add_error(index, {'id': ['Not found.']})
+            continue
+        key = (data.get('company_name', application.company_name), data.get('position', application.position))
+        if key != (application.company_name, application.position):
+            renamed[application.user_id].add(key)
+        found.append((index, application, data, key))
+
+    # Renames must not collide with another application of the same user
+    taken = {}
+    for user_id, keys in renamed.items():
+        for key, application in _existing_by_key(user_id, keys).items():
+            taken[(user_id, key)] = application.pk
+    to_update = []
+    changes = []
+    for index, application, data, key in found:
+        owner = taken.setdefault((application.user_id, key), application.pk)
+        if owner != application.pk:
+            result.add_error(index, {'non_field_errors': [
+                'An application for this company and position already exists.'
+            ]})
+            continue
+        to_update.append(application)
+        changes.append(data)
+
+    now = timezone.now()
+    old_status = {application.pk: application.status for application in to_update}
+    with transaction.atomic(), signals.suspended():
+        changed_fields, transitions, _status_changes = _apply_updates(to_update, changes, now)
+        _write_updates(to_update, changed_fields)
+        StatusTransition.objects.bulk_create(transitions, batch_size=BATCH_SIZE)
+
+        per_user = defaultdict(list)
+        for application in to_update:
+            per_user[application.user_id].append((old_status[application.pk], application.status))
+        for user_id, status_changes in per_user.items():
+            stats.record_changes(user_id, transitions=status_changes)
+        search.index_applications(to_update)
+        skills.index_applications(_with_changed_text(to_update, changed_fields))
+    for user_id in per_user:
+        analytics.invalidate_funnel(user_id)
+
+    result.updated = len(to_update)
+    return result.as_dict()
+
+
+def bulk_delete_applications(queryset, ids):
+    """
+    Delete many applications in one transaction.
+
+    Args:
+        queryset: QuerySet of applications the caller may delete
+        ids: Primary keys to delete
+
+    Returns:
+        dict: deleted count (missing ids are ignored)
+    """
+    result = BulkResult()
+    ids = list(ids)
+    with transaction.atomic(), signals.suspended():
+        per_user = defaultdict(list)
+        deleted_ids = []
+        for start in range(0, len(ids), BATCH_SIZE):
+            chunk = queryset.order_by().filter(pk__in=ids[start:start + BATCH_SIZE])
+            counts = chunk.values('user_id', 'status').annotate(count=Count('id'))
+            for row in counts:
+                per_user[row['user_id']].extend([row['status']] * row['count'])
+            deleted_ids.extend(chunk.values_list('pk', flat=True))
+            chunk.delete()
+
+        for user_id, statuses in per_user.items():
+            stats.record_changes(user_id, deleted=statuses)
+        search.remove_applications(deleted_ids)
+    for user_id in per_user:
+        analytics.invalidate_funnel(user_id)
+
+    result.deleted = len(deleted_ids)
+    return result.as_dict()
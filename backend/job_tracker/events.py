@@ -0,0 +1,251 @@
+"""
+Job Tracker Notification Events
+
+This module pushes notification events to connected clients as Server-Sent
+Events (see the notification_stream view). It sends two kinds of event:
+
+- unread_count: the user's new unread notification count
+- notification: a notification that was just delivered to the user
+
+Each worker process keeps an in-memory broker of subscribers grouped by
+user. Writes made in the process publish through signals (see signals.py),
+so a change costs one COUNT per affected user no matter how many
+connections that user has. Nothing polls the database per connection.
+
+Changes made by other processes, such as the notification scheduler or
+other workers, are picked up by a single sync task per process. While any
+client is connected, it checks for notifications updated since its last
+run every NOTIFICATION_STREAM_SYNC_INTERVAL seconds.
+"""
+
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Notification
+
+
+# Events buffered per connection; a client that falls further behind is
+# sent a fresh unread count instead of the events it missed
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Seconds between keep-alive comments on idle streams
+KEEPALIVE_INTERVAL = 15
+
+
+def get_sync_interval():
+    """Return the seconds between checks for changes made by other processes."""
+    return getattr(settings, 'NOTIFICATION_STREAM_SYNC_INTERVAL', 5)
+
+
+def unread_counts(user_ids):
+    """
+    Count unread delivered notifications for several users in one query.
+
+    Returns:
+        dict: {user_id: unread_count}, including users with no notifications
+    """
+    counts = dict.fromkeys(user_ids, 0)
+    rows = (
+        Notification.objects.filter(user_id__in=user_ids, is_delivered=True, is_active=True, is_read=False)
+        .order_by().values('user_id').annotate(count=Count('id'))
+    )
+    for row in rows:
+        counts[row['user_id']] = row['count']
+    return counts
+
+
+def serialize_notification(notification):
+    """Return the fields of a notification sent in notification events."""
+    return {
+        'id': notification.id,
+        'job_application': notification.job_application_id,
+        'title': notification.title,
+        'message': notification.message,
+        'show_date': notification.show_date.isoformat(),
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+def format_event(event, data):
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscriber:
+    """One open stream: a bounded event queue bound to the stream's event loop."""
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def _put(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def send(self, event, data):
+        """Queue an event from any thread."""
+        self.loop.call_soon_threadsafe(self._put, (event, data))
+
+
+class NotificationBroker:
+    """
+    In-process registry of open notification streams, grouped by user.
+
+    publish_* methods may be called from any thread (sync views run in a
+    thread pool under ASGI); events are handed to each stream's event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._sync_task = None
+        # Last unread count pushed per subscribed user, so new streams of a
+        # user who is already connected start without a query
+        self._unread = {}
+        # Notifications published since the last sync, so it does not repeat them
+        self._published = set()
+
+    def subscribe(self, user_id):
+        """Register a stream for user_id; must be called from its event loop."""
+        subscriber = Subscriber(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+            if self._sync_task is None or self._sync_task.done():
+                self._sync_task = asyncio.create_task(self._sync_other_processes())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a stream; the last one of a user drops the user entirely."""
+        with self._lock:
+            streams = self._subscribers.get(subscriber.user_id)
+            if streams is not None:
+                streams.discard(subscriber)
+                if not streams:
+                    del self._subscribers[subscriber.user_id]
+                    self._unread.pop(subscriber.user_id, None)
+
+    def subscribed_user_ids(self, user_ids=None):
+        """Return the users with at least one open stream, optionally limited to user_ids."""
+        with self._lock:
+            subscribed = set(self._subscribers)
+        return subscribed if user_ids is None else subscribed & set(user_ids)
+
+    def connection_count(self):
+        """Return the number of open streams in this process."""
+        with self._lock:
+            return sum(len(streams) for streams in self._subscribers.values())
+
+    def _send(self, user_id, event, data):
+        with self._lock:
+            streams = list(self._subscribers.get(user_id, ()))
+        for subscriber in streams:
+            subscriber.send(event, data)
+
+    def publish_unread_counts(self, user_ids=None):
+        """
+        Recompute and push unread counts to the given users' streams.
+
+        Args:
+            user_ids: Users whose notifications changed (None means every
+                subscribed user, for writes whose owners are unknown)
+        """
+        user_ids = self.subscribed_user_ids(user_ids)
+        if not user_ids:
+            return
+        counts = unread_counts(user_ids)
+        with self._lock:
+            self._unread.update(counts)
+        for user_id, count in counts.items():
+            self._send(user_id, 'unread_count', {'unread_count': count})
+
+    def unread_count(self, user_id):
+        """Return a subscribed user's unread count, querying only if no stream of theirs has it yet."""
+        with self._lock:
+            count = self._unread.get(user_id)
+        if count is None:
+            count = unread_counts([user_id])[user_id]
+            with self._lock:
+                if user_id in self._subscribers:
+                    self._unread.setdefault(user_id, count)
+        return count
+
+    def publish_notification(self, notification):
+        """Push a newly delivered notification to its owner's streams."""
+        if self.subscribed_user_ids([notification.user_id]):
+            with self._lock:
+                self._published.add(notification.pk)
+            self._send(notification.user_id, 'notification', serialize_notification(notification))
+
+    def sync_since(self, since):
+        """
+        Publish changes other processes made to subscribed users' notifications.
+
+        Returns:
+            datetime: The time to pass as since on the next call
+        """
+        now = timezone.now()
+        user_ids = self.subscribed_user_ids()
+        if not user_ids:
+            return now
+        changed = (
+            Notification.objects.filter(user_id__in=user_ids, updated_at__gt=since, updated_at__lte=now)
+            .order_by('updated_at')
+        )
+        with self._lock:
+            already_published, self._published = self._published, set()
+        changed_users = set()
+        for notification in changed.iterator():
+            changed_users.add(notification.user_id)
+            newly_delivered = notification.is_delivered and notification.delivered_at > since
+            if newly_delivered and notification.pk not in already_published:
+                self.publish_notification(notification)
+        if changed_users:
+            self.publish_unread_counts(changed_users)
+        return now
+
+    async def _sync_other_processes(self):
+        since = timezone.now()
+        while self.subscribed_user_ids():
+            await asyncio.sleep(get_sync_interval())
+            since = await sync_to_async(self.sync_since)(since)
+
+
+broker = NotificationBroker()
+
+
+async def stream_events(user_id):
+    """
+    Yield Server-Sent Events for one user until the client disconnects.
+
+    The current unread count is sent first; after that the stream only
+    carries events published to the broker, plus periodic keep-alives.
+    """
+    subscriber = broker.subscribe(user_id)
+    try:
+        yield f"retry: {get_sync_interval() * 1000}\n\n"
+        count = await sync_to_async(broker.unread_count)(user_id)
+        yield format_event('unread_count', {'unread_count': count})
+        while True:
+            try:
+                event, data = await asyncio.wait_for(subscriber.queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event(event, data)
+            if subscriber.overflowed and subscriber.queue.empty():
+                subscriber.overflowed = False
+                counts = await sync_to_async(unread_counts)([user_id])
+                yield format_event('unread_count', {'unread_count': counts[user_id]})
+    finally:
+        broker.unsubscribe(subscriber)
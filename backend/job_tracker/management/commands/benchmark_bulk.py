@@ -0,0 +1,57 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_tracker import bulk
+from job_tracker.models import JobApplication
+
+
+class Command(BaseCommand):
+    help = 'Measure bulk create/update/delete throughput for job applications (all writes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Number of applications per bulk request')
+
+    def _report(self, label, rows, seconds):
+        rate = rows / seconds if seconds else float('inf')
+        self.stdout.write(f"  - {label}: {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        items = [
+            {
+                'company_name': f'Benchmark Company {i}',
+                'position': 'Software Developer',
+                'applied_date': '2025-01-01',
+                'location': 'Edmonton, AB',
+                'notes': f'Synthetic application {i} created by benchmark_bulk',
+            }
+            for i in range(rows)
+        ]
+
+        self.stdout.write(f"Bulk benchmark with {rows} rows per request:")
+        with transaction.atomic():
+            user = User.objects.create(username='bulk-benchmark')
+            queryset = JobApplication.objects.filter(user=user)
+
+            start = time.perf_counter()
+            result = bulk.bulk_create_applications(user, items)
+            self._report('create', result['created'], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = bulk.bulk_create_applications(user, items, on_conflict=bulk.CONFLICT_UPSERT)
+            self._report('upsert', result['updated'], time.perf_counter() - start)
+
+            ids = list(queryset.values_list('id', flat=True))
+            start = time.perf_counter()
+            result = bulk.bulk_update_applications(queryset, [{'id': pk, 'status': 'interview'} for pk in ids])
+            self._report('update', result['updated'], time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = bulk.bulk_delete_applications(queryset, ids)
+            self._report('delete', result['deleted'], time.perf_counter() - start)
+
+            # Leave the database exactly as it was
+            transaction.set_rollback(True)
@@ -0,0 +1,81 @@
+import time
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_tracker import resume
+from job_tracker.models import Education, Experience, Project, ResumeTemplate
+
+
+class Command(BaseCommand):
+    help = 'Measure resume rendering time per output format with many entries (all writes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=300, help='Number of experience, project and education entries each')
+        parser.add_argument('--iterations', type=int, default=20, help='Renders timed per measurement')
+
+    def _time(self, iterations, render):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            render()
+        return (time.perf_counter() - start) / iterations * 1000
+
+    def handle(self, *args, **options):
+        entries = options['entries']
+        iterations = options['iterations']
+        start_date = date(2000, 1, 1)
+
+        self.stdout.write(f"Resume benchmark with {entries} entries per section, {iterations} renders per measurement:")
+        with transaction.atomic():
+            template = ResumeTemplate.get_or_create_template()
+            template.skills = template.skills or 'Python, Django, React'
+            template.summary = template.summary or 'Benchmark summary'
+            template.save()
+            Experience.objects.bulk_create([
+                Experience(
+                    company=f'Benchmark Company {i}', position='Software Developer', location='Edmonton, AB',
+                    start_date=start_date + timedelta(days=i), description=f'Built <b>things</b> & shipped them {i}\n' * 3,
+                )
+                for i in range(entries)
+            ])
+            projects = Project.objects.bulk_create([
+                Project(
+                    name=f'Benchmark Project {i}', description=f'Project description {i}', technologies='Python, React',
+                    url=f'https://example.com/project/{i}', start_date=start_date + timedelta(days=i),
+                )
+                for i in range(entries)
+            ])
+            Education.objects.bulk_create([
+                Education(
+                    institution=f'Benchmark University {i}', degree='BSc', field_of_study='Computing Science',
+                    start_date=start_date + timedelta(days=i),
+                )
+                for i in range(entries)
+            ])
+
+            rows_by_model = {model: list(queryset()) for model, queryset in resume.SECTION_QUERYSETS.items()}
+            for output in resume.RENDERERS:
+                renderer = resume.get_renderer(output)
+                uncached = self._time(iterations, lambda: resume.render_document(renderer, template, rows_by_model))
+
+                def cold():
+                    cache.clear()
+                    return resume.get_rendered_resume(fresh=True, output=output)
+                cold_ms = self._time(iterations, cold)
+                cached_ms = self._time(iterations, lambda: resume.get_rendered_resume(fresh=True, output=output))
+
+                # Editing one project re-renders only the projects section
+                def after_edit():
+                    projects[0].save(update_fields=['updated_at'])
+                    return resume.get_rendered_resume(fresh=True, output=output)
+                edit_ms = self._time(iterations, after_edit)
+
+                self.stdout.write(
+                    f"  - {output}: render only {uncached:.2f}ms, cold {cold_ms:.2f}ms, "
+                    f"cached {cached_ms:.2f}ms, after one project edit {edit_ms:.2f}ms"
+                )
+
+            # Leave the database exactly as it was
+            transaction.set_rollback(True)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from job_tracker import transfer
+
+
+class Command(BaseCommand):
+    help = 'Stream job applications, meeting notes or notifications to a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(transfer.DATASETS), help='Which records to export')
+        parser.add_argument('--file-format', choices=transfer.FORMATS, default=transfer.FORMAT_CSV)
+        parser.add_argument('--output', '-o', help='File to write (defaults to standard output)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=transfer.EXPORT_CHUNK_SIZE,
+            help='Number of rows read from the database per chunk',
+        )
+
+    def handle(self, *args, **options):
+        chunks = transfer.export_rows(
+            options['dataset'],
+            file_format=options['file_format'],
+            chunk_size=options['chunk_size'],
+        )
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported {options['dataset']} to {options['output']}."))
@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker import transfer
+
+
+class Command(BaseCommand):
+    help = 'Import job applications, meeting notes or notifications from a CSV or NDJSON file in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(transfer.DATASETS), help='Which records to import')
+        parser.add_argument('path', help='CSV or NDJSON file to read')
+        parser.add_argument(
+            '--file-format',
+            choices=transfer.FORMATS,
+            help='Input format (inferred from the file extension when omitted)',
+        )
+        parser.add_argument('--user', required=True, help='Username that owns the imported records')
+        parser.add_argument(
+            '--skip-existing',
+            action='store_true',
+            help='Skip rows that already exist instead of reporting them as errors',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=transfer.IMPORT_BATCH_SIZE,
+            help='Number of rows inserted per transaction',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        file_format = options['file_format']
+        if not file_format:
+            file_format = transfer.FORMAT_NDJSON if options['path'].endswith(('.ndjson', '.jsonl')) else transfer.FORMAT_CSV
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+            result = transfer.import_rows(
+                options['dataset'],
+                lines,
+                user,
+                file_format=file_format,
+                skip_existing=options['skip_existing'],
+                batch_size=options['batch_size'],
+            )
+
+        for error in result['errors']:
+            self.stdout.write(f"  - line {error['line']}: {error['errors']}")
+        if result['error_count'] > len(result['errors']):
+            self.stdout.write(f"  ... and {result['error_count'] - len(result['errors'])} more error(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']}, skipped {result['skipped']}, {result['error_count']} error(s)."
+        ))
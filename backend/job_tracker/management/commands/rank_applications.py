@@ -0,0 +1,30 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker import matching
+
+
+class Command(BaseCommand):
+    help = "Rank a user's applications by how well the resume matches their job descriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username whose applications are ranked')
+        parser.add_argument('--limit', type=int, default=20, help='Number of best matches to print')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        start = time.perf_counter()
+        results = matching.rank_applications(user.pk)
+        duration = time.perf_counter() - start
+
+        for result in results[:options['limit']]:
+            self.stdout.write(
+                f"  {result['score']:.4f}  {result['company_name']} - {result['position']} ({result['status']})"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Ranked {len(results)} applications in {duration * 1000:.1f}ms"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from job_tracker.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index over job applications and meeting notes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of applications read from the database per batch',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        self.stdout.write(f"Rebuilding search index using the '{backend.name}' backend...")
+        count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} application(s)."))
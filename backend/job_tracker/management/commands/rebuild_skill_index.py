@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from job_tracker.skills import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the skill index over job descriptions and application notes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of applications read from the database per batch',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding skill index...")
+        count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} application(s)."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.stats import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Check the materialized application stats counters and rebuild them from source'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report counters that are out of sync; do not rewrite them',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = rebuild_counters(dry_run=options['check'])
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Application stats counters are consistent."))
+            return
+
+        for user_id, stored, actual in mismatches:
+            self.stdout.write(f"  - user {user_id}: stored={stored} actual={actual}")
+
+        if options['check']:
+            raise CommandError(f"{len(mismatches)} user(s) have stale counters.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {len(mismatches)} user(s)."))
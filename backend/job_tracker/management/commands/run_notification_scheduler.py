@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from job_tracker import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Periodically mark notifications whose show_date has passed as delivered'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tick',
+            type=float,
+            default=None,
+            help='Seconds between runs (defaults to the NOTIFICATION_SCHEDULER_TICK setting)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=scheduler.DELIVERY_BATCH_SIZE,
+            help='Number of notifications updated per statement',
+        )
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+
+    def _report(self, started_at, delivered, duration):
+        self.stdout.write(f"[{started_at:%Y-%m-%d %H:%M:%S}] Delivered {delivered} notification(s) in {duration * 1000:.0f}ms")
+
+    def handle(self, *args, **options):
+        tick = options['tick'] if options['tick'] is not None else scheduler.get_tick_seconds()
+        if not options['once']:
+            self.stdout.write(f"Notification scheduler running every {tick:g}s (Ctrl+C to stop)")
+        try:
+            scheduler.run(tick=tick, batch_size=options['batch_size'], once=options['once'], on_tick=self._report)
+        except KeyboardInterrupt:
+            self.stdout.write("Notification scheduler stopped.")
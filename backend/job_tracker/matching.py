@@ -0,0 +1,410 @@
+"""
+Job Tracker Match Analysis
+
+This module scores how well the resume matches job descriptions with
+TF-IDF cosine similarity, entirely offline.
+
+Text is tokenized into lowercase terms (keeping technology names such as
+c++, c# and node.js intact) with common English words removed. Each
+document becomes a sparse vector: a sorted array of term ids plus an array
+of weights (sublinear term frequency times inverse document frequency),
+normalized to unit length. Term ids are stable 64-bit hashes of the terms,
+so vectors built in different processes are comparable. The cosine score
+is the dot product over the term ids both vectors share.
+
+The term counts of every saved job description are stored as binary
+arrays (JobDescriptionVector) and only rebuilt when the description text
+changes. Document frequencies are stored per user (MatchCorpus) and
+updated from the old and new term ids of the vectors that changed, so the
+corpus is never re-tokenized. Ranking all of a user's applications is one
+sparse matrix-vector product over the stored vectors.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import JobApplication, JobDescriptionVector, MatchCorpus
+from .resume import RESUME_CACHE_TIMEOUT, get_rendered_resume
+
+
+# Terms returned as the top contributors to a score
+TOP_TERMS = 10
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+# Common English words, plus words every resume contains (dates, links,
+# section headings) that say nothing about a match
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each etc few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most my
+myself no nor not now of off on once only or other our ours ourselves out over own same she should so
+some such than that the their theirs them themselves then there these they this those through to too
+under until up us very was we were what when where which while who whom why will with would you your
+yours yourself yourselves
+january february march april may june july august september october november december present
+http https www com experience education projects skills professional summary gpa
+""".split())
+
+
+def tokenize(text):
+    """
+    Split text into lowercase terms, dropping stop words and single characters.
+
+    Returns:
+        list: Terms in order of appearance
+    """
+    return [
+        term for term in TOKEN_RE.findall((text or '').lower())
+        if len(term) > 1 and term not in STOP_WORDS
+    ]
+
+
+@lru_cache(maxsize=65536)
+def term_id(term):
+    """Return a stable 64-bit id for a term (the same in every process)."""
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), 'little', signed=True)
+
+
+def _pack(array, dtype):
+    """Encode an array for a BinaryField."""
+    return np.ascontiguousarray(array, dtype=dtype).tobytes()
+
+
+def _unpack(data, dtype):
+    """Decode an array stored with _pack (backends return bytes or memoryview)."""
+    return np.frombuffer(data, dtype=dtype)
+
+
+def description_terms(text):
+    """
+    Return the term ids and counts of a job description.
+
+    Returns:
+        tuple: (sorted int64 id array, uint16 count array aligned with it)
+    """
+    counts = Counter(tokenize(text))
+    ids = np.fromiter((term_id(term) for term in counts), dtype=np.int64, count=len(counts))
+    occurrences = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    order = np.argsort(ids)
+    return ids[order], np.minimum(occurrences[order], np.iinfo(np.uint16).max).astype(np.uint16)
+
+
+class DocumentFrequencies:
+    """
+    Number of documents containing each term, for computing IDF weights.
+
+    Attributes:
+        documents: Number of documents counted
+        term_ids: Sorted int64 array of the terms seen
+        counts: int64 array of documents containing each term
+    """
+
+    def __init__(self, documents=0, term_ids=None, counts=None):
+        self.documents = documents
+        self.term_ids = term_ids if term_ids is not None else np.empty(0, dtype=np.int64)
+        self.counts = counts if counts is not None else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """Load the frequencies stored in a MatchCorpus."""
+        return cls(
+            corpus.documents,
+            _unpack(corpus.term_ids, '<i8').astype(np.int64),
+            _unpack(corpus.term_documents, '<u4').astype(np.int64),
+        )
+
+    @classmethod
+    def from_documents(cls, documents):
+        """Count the frequencies of documents given as term id arrays."""
+        frequencies = cls()
+        frequencies.update(added=documents)
+        return frequencies
+
+    def save_to(self, corpus):
+        """Store the frequencies in a MatchCorpus (the caller saves it)."""
+        corpus.documents = self.documents
+        corpus.term_ids = _pack(self.term_ids, '<i8')
+        corpus.term_documents = _pack(self.counts, '<u4')
+
+    def update(self, added=(), removed=()):
+        """
+        Add and remove documents given as arrays of their distinct term ids.
+
+        A changed document is passed both as removed (old terms) and added
+        (new terms). Runs in time proportional to the vocabulary, however
+        many documents there are.
+        """
+        added, removed = list(added), list(removed)
+        if not added and not removed:
+            return
+        self.documents += len(added) - len(removed)
+        ids = np.concatenate([self.term_ids, *added, *removed])
+        deltas = np.concatenate(
+            [self.counts]
+            + [np.ones(len(terms), dtype=np.int64) for terms in added]
+            + [np.full(len(terms), -1, dtype=np.int64) for terms in removed]
+        )
+        term_ids, inverse = np.unique(ids, return_inverse=True)
+        counts = np.bincount(inverse, weights=deltas, minlength=len(term_ids)).astype(np.int64)
+        keep = counts > 0
+        self.term_ids, self.counts = term_ids[keep], counts[keep]
+
+    def idf(self, ids):
+        """
+        Return smoothed IDF weights for an array of term ids.
+
+        Uses ln((1 + N) / (1 + df)) + 1, which stays positive for terms that
+        occur in every document and handles terms never seen before.
+        """
+        df = np.zeros(len(ids), dtype=np.float64)
+        if len(self.term_ids):
+            positions = np.minimum(np.searchsorted(self.term_ids, ids), len(self.term_ids) - 1)
+            found = self.term_ids[positions] == ids
+            df[found] = self.counts[positions[found]]
+        return np.log((1 + self.documents) / (1 + df)) + 1
+
+
+class TermVector:
+    """
+    A sparse, unit-length TF-IDF vector.
+
+    Attributes:
+        ids: Sorted int64 array of term ids
+        weights: float64 array of weights, aligned with ids
+        terms: {term id: term}, for explaining scores
+    """
+
+    __slots__ = ('ids', 'weights', 'terms')
+
+    def __init__(self, ids, weights, terms):
+        self.ids = ids
+        self.weights = weights
+        self.terms = terms
+
+    @classmethod
+    def from_counts(cls, counts, frequencies):
+        """
+        Build a vector from term counts.
+
+        Args:
+            counts: {term: occurrences in the document}
+            frequencies: DocumentFrequencies of the corpus
+        """
+        terms = list(counts)
+        ids = np.fromiter((term_id(term) for term in terms), dtype=np.int64, count=len(terms))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(terms))
+        weights = (1 + np.log(tf)) * frequencies.idf(ids)
+        norm = np.linalg.norm(weights)
+        if norm:
+            weights /= norm
+        order = np.argsort(ids)
+        return cls(ids[order], weights[order], dict(zip(ids.tolist(), terms)))
+
+    def weights_for(self, ids):
+        """Return this vector's weight for each term id in an array (0 where absent)."""
+        weights = np.zeros(len(ids), dtype=np.float64)
+        if len(self.ids):
+            positions = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+            found = self.ids[positions] == ids
+            weights[found] = self.weights[positions[found]]
+        return weights
+
+    def contributions(self, other):
+        """
+        Return the shared term ids and each one's share of the dot product.
+
+        Returns:
+            tuple: (term id array, contribution array)
+        """
+        shared, mine, theirs = np.intersect1d(self.ids, other.ids, assume_unique=True, return_indices=True)
+        return shared, self.weights[mine] * other.weights[theirs]
+
+
+def score_vectors(resume_vector, job_vector, top=TOP_TERMS):
+    """
+    Compute the cosine similarity of two vectors and its top terms.
+
+    Returns:
+        dict: {'score': float between 0 and 1, 'top_terms': [{'term', 'weight'}]}
+    """
+    shared, contributions = resume_vector.contributions(job_vector)
+    best = np.argsort(contributions)[::-1][:top]
+    return {
+        'score': round(min(float(contributions.sum()), 1.0), 4),
+        'top_terms': [
+            {'term': resume_vector.terms[int(shared[i])], 'weight': round(float(contributions[i]), 4)}
+            for i in best
+        ],
+    }
+
+
+def resume_counts(rendered):
+    """Return the term counts of a rendered resume, cached by its ETag."""
+    key = f"job_tracker:match:resume:{rendered['etag']}"
+    counts = cache.get(key)
+    if counts is None:
+        counts = Counter(tokenize(rendered['content']))
+        cache.set(key, counts, RESUME_CACHE_TIMEOUT)
+    return counts
+
+
+def _stale_applications(user_id):
+    """
+    Return (id, job_description, updated_at) of the user's applications whose vector may be stale.
+
+    These are applications with a description but no vector, and
+    applications changed since their vector was last checked.
+    """
+    stale = (
+        Q(description_vector__isnull=True, job_description__gt='')
+        | Q(updated_at__gt=F('description_vector__application_updated_at'))
+    )
+    return list(
+        JobApplication.objects.filter(user_id=user_id).filter(stale)
+        .values_list('id', 'job_description', 'updated_at')
+    )
+
+
+def refresh_vectors(user_id):
+    """
+    Bring the user's stored description vectors and document frequencies up to date.
+
+    Only applications changed since their vector was last checked are read,
+    and only those whose description text changed are re-tokenized. The
+    frequencies are updated from the old and new term ids of the changed
+    vectors; they are recounted from the stored vectors only when
+    applications were deleted (deletes cascade to vectors without notice).
+
+    Returns:
+        DocumentFrequencies: The user's current document frequencies
+    """
+    with transaction.atomic():
+        corpus, created = MatchCorpus.objects.select_for_update().get_or_create(user_id=user_id)
+        frequencies = DocumentFrequencies.from_corpus(corpus)
+        stale = _stale_applications(user_id)
+        vectors = JobDescriptionVector.objects.in_bulk([pk for pk, _text, _updated_at in stale])
+
+        added, removed = [], []
+        to_create, to_update, to_delete = [], [], []
+        for pk, text, updated_at in stale:
+            vector = vectors.get(pk)
+            text_hash = hashlib.sha1((text or '').encode()).hexdigest()
+            if vector is not None:
+                vector.application_updated_at = updated_at
+                if vector.text_hash == text_hash:
+                    to_update.append(vector)
+                    continue
+                removed.append(_unpack(vector.term_ids, '<i8'))
+            ids, counts = description_terms(text)
+            if not len(ids):
+                if vector is not None:
+                    to_delete.append(pk)
+                continue
+            if vector is None:
+                vector = JobDescriptionVector(application_id=pk, application_updated_at=updated_at)
+                to_create.append(vector)
+            else:
+                to_update.append(vector)
+            vector.text_hash = text_hash
+            vector.term_ids = _pack(ids, '<i8')
+            vector.term_counts = _pack(counts, '<u2')
+            added.append(ids)
+
+        JobDescriptionVector.objects.bulk_create(to_create, batch_size=500)
+        JobDescriptionVector.objects.bulk_update(
+            to_update, ['text_hash', 'term_ids', 'term_counts', 'application_updated_at'], batch_size=500,
+        )
+        JobDescriptionVector.objects.filter(pk__in=to_delete).delete()
+        frequencies.update(added=added, removed=removed)
+
+        stored = JobDescriptionVector.objects.filter(application__user_id=user_id)
+        if stored.count() != frequencies.documents:
+            frequencies = DocumentFrequencies.from_documents(
+                _unpack(term_ids, '<i8') for term_ids in stored.values_list('term_ids', flat=True).iterator(chunk_size=500)
+            )
+        if stale or created or frequencies.documents != corpus.documents:
+            frequencies.save_to(corpus)
+            corpus.save()
+    return frequencies
+
+
+def rank_applications(user_id, limit=None):
+    """
+    Score every application of a user that has a job description against the resume.
+
+    The stored vectors are laid out as one sparse matrix (concatenated term
+    ids and weights with row offsets), and all scores come from a single
+    matrix-vector product with the resume vector.
+
+    Args:
+        user_id: Owner of the applications
+        limit: Return only the best limit applications
+
+    Returns:
+        list: Dicts with id, company_name, position, status and score, best first
+    """
+    frequencies = refresh_vectors(user_id)
+    rows = list(
+        JobDescriptionVector.objects.filter(application__user_id=user_id)
+        .values_list('term_ids', 'term_counts', 'application_id', 'application__company_name',
+                     'application__position', 'application__status')
+    )
+    if not rows:
+        return []
+
+    ids = [_unpack(row[0], '<i8') for row in rows]
+    lengths = np.fromiter((len(row_ids) for row_ids in ids), dtype=np.int64, count=len(rows))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    ids = np.concatenate(ids)
+    tf = np.concatenate([_unpack(row[1], '<u2') for row in rows]).astype(np.float64)
+
+    weights = (1 + np.log(tf)) * frequencies.idf(ids)
+    norms = np.sqrt(np.add.reduceat(weights * weights, starts))
+    resume_vector = TermVector.from_counts(resume_counts(get_rendered_resume()), frequencies)
+    scores = np.add.reduceat(weights * resume_vector.weights_for(ids), starts) / norms
+
+    order = np.argsort(-scores, kind='stable')[:limit]
+    return [
+        {
+            'id': rows[index][2],
+            'company_name': rows[index][3],
+            'position': rows[index][4],
+            'status': rows[index][5],
+            'score': round(min(float(scores[index]), 1.0), 4),
+        }
+        for index in order.tolist()
+    ]
+
+
+def match_application(application, job_description=None, top=TOP_TERMS):
+    """
+    Score the resume against an application's job description.
+
+    Args:
+        application: JobApplication whose owner's descriptions form the corpus
+        job_description: Text to score instead of the saved job_description
+        top: Number of top contributing terms to return
+
+    Returns:
+        dict: {'score': float between 0 and 1, 'top_terms': [{'term', 'weight'}]}
+
+    Raises:
+        ValueError: If there is no job description to score
+    """
+    job_description = job_description if job_description is not None else application.job_description
+    job_counts = Counter(tokenize(job_description))
+    if not job_counts:
+        raise ValueError('The application has no job description to match against.')
+
+    frequencies = refresh_vectors(application.user_id)
+    resume_vector = TermVector.from_counts(resume_counts(get_rendered_resume()), frequencies)
+    job_vector = TermVector.from_counts(job_counts, frequencies)
+    return score_vectors(resume_vector, job_vector, top)
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_counters(apps, schema_editor):
+    """Backfill ApplicationStats from the existing applications."""
+    JobApplication = apps.get_model('job_tracker', 'JobApplication')
+    ApplicationStats = apps.get_model('job_tracker', 'ApplicationStats')
+    statuses = ['applied', 'interview', 'rejected', 'accepted', 'withdrawn']
+    aggregates = {'total': Count('id')}
+    for key in statuses:
+        aggregates[key] = Count('id', filter=Q(status=key))
+    rows = JobApplication.objects.order_by().values('user_id').annotate(**aggregates)
+    ApplicationStats.objects.bulk_create([ApplicationStats(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0003_alter_jobapplication_accepted_date_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0, help_text='Total number of applications')),
+                ('applied', models.IntegerField(default=0, help_text='Applications with status applied')),
+                ('interview', models.IntegerField(default=0, help_text='Applications with status interview')),
+                ('rejected', models.IntegerField(default=0, help_text='Applications with status rejected')),
+                ('accepted', models.IntegerField(default=0, help_text='Applications with status accepted')),
+                ('withdrawn', models.IntegerField(default=0, help_text='Applications with status withdrawn')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When these counters were last updated')),
+                ('user', models.OneToOneField(help_text='User these counters belong to', on_delete=django.db.models.deletion.CASCADE, related_name='application_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'application stats',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+
+def create_fts_index(apps, schema_editor):
+    """Create and fill the FTS5 search table when running on SQLite with FTS5 support."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE job_tracker_application_fts USING fts5("
+            "company_name, position, notes, location, meeting_notes, tokenize='unicode61')"
+        )
+    except OperationalError:
+        # SQLite built without FTS5: search falls back to the SearchPosting index
+        return
+    schema_editor.execute(
+        "INSERT INTO job_tracker_application_fts "
+        "(rowid, company_name, position, notes, location, meeting_notes) "
+        "SELECT app.id, app.company_name, app.position, COALESCE(app.notes, ''), COALESCE(app.location, ''), "
+        "COALESCE((SELECT group_concat(note.content, char(10)) FROM job_tracker_meetingnote AS note "
+        "WHERE note.job_application_id = app.id), '') "
+        "FROM job_tracker_jobapplication AS app"
+    )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS job_tracker_application_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0004_applicationstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(help_text='Indexed field the term occurs in', max_length=20)),
+                ('term', models.CharField(help_text='Normalized (lowercase) term', max_length=64)),
+                ('frequency', models.PositiveIntegerField(default=1, help_text='Number of occurrences of the term in the field')),
+                ('application', models.ForeignKey(help_text='Job application containing the term', on_delete=django.db.models.deletion.CASCADE, related_name='search_postings', to='job_tracker.jobapplication')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'application'], name='search_posting_term_idx')],
+                'unique_together': {('application', 'field', 'term')},
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
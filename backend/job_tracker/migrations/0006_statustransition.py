@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_transitions(apps, schema_editor):
+    """
+    Reconstruct a transition log for existing applications.
+
+    Every application starts as 'applied' at its creation time, followed by
+    one transition per recorded status date in time order. If the current
+    status is not the last one reached, a final transition at updated_at
+    brings the log in line with the row.
+    """
+    JobApplication = apps.get_model('job_tracker', 'JobApplication')
+    StatusTransition = apps.get_model('job_tracker', 'StatusTransition')
+    date_fields = [
+        ('interview', 'interview_date'),
+        ('rejected', 'rejected_date'),
+        ('accepted', 'accepted_date'),
+        ('withdrawn', 'withdrawn_date'),
+    ]
+    transitions = []
+    for application in JobApplication.objects.order_by('id').iterator(chunk_size=500):
+        events = sorted(
+            (getattr(application, field), status)
+            for status, field in date_fields
+            if getattr(application, field)
+        )
+        current = 'applied'
+        transitions.append(StatusTransition(
+            application_id=application.id, from_status=None, to_status=current,
+            occurred_at=application.created_at,
+        ))
+        for occurred_at, status in events:
+            transitions.append(StatusTransition(
+                application_id=application.id, from_status=current, to_status=status,
+                occurred_at=occurred_at,
+            ))
+            current = status
+        if current != application.status:
+            transitions.append(StatusTransition(
+                application_id=application.id, from_status=current, to_status=application.status,
+                occurred_at=application.updated_at,
+            ))
+        if len(transitions) >= 500:
+            StatusTransition.objects.bulk_create(transitions)
+            transitions = []
+    StatusTransition.objects.bulk_create(transitions)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('applied', 'Applied'), ('interview', 'Interview'), ('rejected', 'Rejected'), ('accepted', 'Accepted'), ('withdrawn', 'Withdrawn')], help_text='Status before the change (empty when the application was created)', max_length=20, null=True)),
+                ('to_status', models.CharField(choices=[('applied', 'Applied'), ('interview', 'Interview'), ('rejected', 'Rejected'), ('accepted', 'Accepted'), ('withdrawn', 'Withdrawn')], help_text='Status after the change', max_length=20)),
+                ('occurred_at', models.DateTimeField(help_text='When the status changed (client-reported time when available)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When this transition was recorded')),
+                ('application', models.ForeignKey(help_text='Job application whose status changed', on_delete=django.db.models.deletion.CASCADE, related_name='status_transitions', to='job_tracker.jobapplication')),
+            ],
+            options={
+                'ordering': ['occurred_at', 'id'],
+                'indexes': [models.Index(fields=['application', 'occurred_at'], name='transition_app_time_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_transitions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:39
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def deliver_due_notifications(apps, schema_editor):
+    """Mark notifications whose show_date has already passed as delivered."""
+    Notification = apps.get_model('job_tracker', 'Notification')
+    Notification.objects.filter(show_date__lte=timezone.now()).update(is_delivered=True, delivered_at=F('show_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0006_statustransition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, help_text='When this notification was delivered', null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='is_delivered',
+            field=models.BooleanField(default=False, help_text='Whether this notification is due and visible to the user'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_delivered', True)), fields=['-created_at'], name='notification_delivered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_delivered', False)), fields=['show_date'], name='notification_due_idx'),
+        ),
+        migrations.RunPython(deliver_due_notifications, migrations.RunPython.noop),
+    ]
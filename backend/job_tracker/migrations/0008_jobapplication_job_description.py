@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0007_notification_delivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='job_description',
+            field=models.TextField(blank=True, help_text='Text of the job posting, used for match analysis', null=True),
+        ),
+    ]
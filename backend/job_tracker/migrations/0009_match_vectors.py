@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('job_tracker', '0008_jobapplication_job_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDescriptionVector',
+            fields=[
+                ('application', models.OneToOneField(help_text='Job application whose description this is', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='description_vector', serialize=False, to='job_tracker.jobapplication')),
+                ('text_hash', models.CharField(help_text='SHA-1 of the description the vector was built from', max_length=40)),
+                ('term_ids', models.BinaryField(help_text='Sorted term ids as little-endian int64')),
+                ('term_counts', models.BinaryField(help_text='Occurrences of each term as little-endian uint16')),
+                ('application_updated_at', models.DateTimeField(help_text="The application's updated_at when the vector was last checked")),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MatchCorpus',
+            fields=[
+                ('user', models.OneToOneField(help_text='User whose job descriptions these are', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='match_corpus', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('documents', models.PositiveIntegerField(default=0, help_text='Number of job descriptions counted')),
+                ('term_ids', models.BinaryField(default=b'', help_text='Sorted term ids as little-endian int64')),
+                ('term_documents', models.BinaryField(default=b'', help_text='Descriptions containing each term as little-endian uint32')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='When the frequencies were last updated')),
+            ],
+            options={
+                'verbose_name_plural': 'match corpora',
+            },
+        ),
+    ]
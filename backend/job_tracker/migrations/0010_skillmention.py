@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0009_match_vectors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillMention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(help_text='Canonical skill name', max_length=64)),
+                ('in_description', models.BooleanField(default=False, help_text='Whether the job description mentions the skill')),
+                ('in_notes', models.BooleanField(default=False, help_text='Whether the notes mention the skill')),
+                ('application', models.ForeignKey(help_text='Job application mentioning the skill', on_delete=django.db.models.deletion.CASCADE, related_name='skill_mentions', to='job_tracker.jobapplication')),
+                ('user', models.ForeignKey(help_text='Owner of the application', on_delete=django.db.models.deletion.CASCADE, related_name='skill_mentions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'skill'], name='skill_mention_user_skill_idx')],
+                'unique_together': {('application', 'skill')},
+            },
+        ),
+    ]
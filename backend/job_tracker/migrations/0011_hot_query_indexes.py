@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0010_skillmention'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['-applied_date', 'id'], name='jobapp_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['-created_at'], name='jobapp_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'status'], name='jobapp_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meetingnote',
+            index=models.Index(fields=['job_application', '-created_at'], name='meeting_note_app_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_delivered', True), ('is_read', False)), fields=['user'], name='notification_unread_idx'),
+        ),
+    ]
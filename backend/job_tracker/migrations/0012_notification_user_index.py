@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0011_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_delivered_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_delivered', True)), fields=['user', '-created_at'], name='notification_delivered_idx'),
+        ),
+    ]
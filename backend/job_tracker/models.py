@@ -26,11 +26,20 @@ class JobApplication(models.Model):
         ('withdrawn', 'Withdrawn'),       # Application withdrawn by candidate
     ]
     
+    # Column holding the time each status was first reached
+    STATUS_DATE_FIELDS = {
+        'interview': 'interview_date',
+        'rejected': 'rejected_date',
+        'accepted': 'accepted_date',
+        'withdrawn': 'withdrawn_date',
+    }
+    
     # Core application fields
     user = models.ForeignKey(User, on_delete=models.CASCADE, help_text="User who submitted this application")
     company_name = models.CharField(max_length=200, help_text="Name of the company")
     position = models.CharField(max_length=200, help_text="Job title or position name")
     job_url = models.URLField(blank=True, null=True, help_text="URL to the job posting")
+    job_description = models.TextField(blank=True, null=True, help_text="Text of the job posting, used for match analysis")
     
     # Application tracking
     status = models.CharField(
@@ -64,6 +73,16 @@ class JobApplication(models.Model):
         ordering = ['-applied_date']
         # Ensure user cannot have duplicate applications for same company/position
         unique_together = ['user', 'company_name', 'position']
+        indexes = [
+            # List pages: keyset pagination on (-applied_date, id), read in
+            # either direction (see pagination.ApplicationCursorPagination)
+            models.Index(fields=['-applied_date', 'id'], name='jobapp_applied_idx'),
+            # The recent action: newest created first
+            models.Index(fields=['-created_at'], name='jobapp_created_idx'),
+            # Status counts (stats?source=aggregate) are answered from this
+            # index alone, per user or over all users
+            models.Index(fields=['user', 'status'], name='jobapp_user_status_idx'),
+        ]
     
     def __str__(self):
         """String representation of the job application."""
@@ -76,6 +95,171 @@ class JobApplication(models.Model):
         return (timezone.now().date() - self.applied_date).days
 
 
+class StatusTransition(models.Model):
+    """
+    Model representing one status change of a job application.
+    
+    Transitions form an append-only event log: a row is written when an
+    application is created and every time its status changes, and rows are
+    never updated afterwards. Timeline and funnel analytics read from here.
+    """
+    
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='status_transitions', help_text="Job application whose status changed")
+    from_status = models.CharField(
+        max_length=20,
+        choices=JobApplication.STATUS_CHOICES,
+        blank=True,
+        null=True,
+        help_text="Status before the change (empty when the application was created)"
+    )
+    to_status = models.CharField(max_length=20, choices=JobApplication.STATUS_CHOICES, help_text="Status after the change")
+    occurred_at = models.DateTimeField(help_text="When the status changed (client-reported time when available)")
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True, help_text="When this transition was recorded")
+    
+    class Meta:
+        ordering = ['occurred_at', 'id']
+        indexes = [
+            models.Index(fields=['application', 'occurred_at'], name='transition_app_time_idx'),
+        ]
+    
+    def __str__(self):
+        """String representation of the transition."""
+        return f"{self.from_status or 'new'} -> {self.to_status} ({self.application_id})"
+    
+    def save(self, *args, **kwargs):
+        """Insert the transition; existing transitions are never modified."""
+        if not self._state.adding:
+            raise ValueError("Status transitions are append-only and cannot be modified.")
+        return super().save(*args, **kwargs)
+
+
+class SearchPosting(models.Model):
+    """
+    Model representing one entry of the pure-Python search inverted index.
+    
+    Records how many times a term occurs in one field of one job application.
+    Only used when the SQLite FTS5 index is unavailable (see search.py).
+    """
+    
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='search_postings', help_text="Job application containing the term")
+    field = models.CharField(max_length=20, help_text="Indexed field the term occurs in")
+    term = models.CharField(max_length=64, help_text="Normalized (lowercase) term")
+    frequency = models.PositiveIntegerField(default=1, help_text="Number of occurrences of the term in the field")
+    
+    class Meta:
+        unique_together = ['application', 'field', 'term']
+        indexes = [
+            models.Index(fields=['term', 'application'], name='search_posting_term_idx'),
+        ]
+    
+    def __str__(self):
+        """String representation of the posting."""
+        return f"{self.term} in {self.field} of application {self.application_id}"
+
+
+class SkillMention(models.Model):
+    """
+    Model representing one entry of the skill inverted index.
+    
+    Records that an application's job description or notes mention a skill
+    from the skill vocabulary (see skills.py). The owner is stored on the
+    row so per-user skill counts are answered from the (user, skill) index
+    without touching the applications table.
+    """
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='skill_mentions', help_text="Owner of the application")
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='skill_mentions', help_text="Job application mentioning the skill")
+    skill = models.CharField(max_length=64, help_text="Canonical skill name")
+    in_description = models.BooleanField(default=False, help_text="Whether the job description mentions the skill")
+    in_notes = models.BooleanField(default=False, help_text="Whether the notes mention the skill")
+    
+    class Meta:
+        unique_together = ['application', 'skill']
+        indexes = [
+            models.Index(fields=['user', 'skill'], name='skill_mention_user_skill_idx'),
+        ]
+    
+    def __str__(self):
+        """String representation of the mention."""
+        return f"{self.skill} in application {self.application_id}"
+
+
+class ApplicationStats(models.Model):
+    """
+    Model holding materialized per-user application counters.
+
+    One row per user with the total number of applications and the number in
+    each status. Rows are kept in sync by signals on create, update and delete,
+    and can be rebuilt from source with the rebuild_stats management command.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='application_stats', help_text="User these counters belong to")
+
+    # Counters (one per status plus the overall total)
+    total = models.IntegerField(default=0, help_text="Total number of applications")
+    applied = models.IntegerField(default=0, help_text="Applications with status applied")
+    interview = models.IntegerField(default=0, help_text="Applications with status interview")
+    rejected = models.IntegerField(default=0, help_text="Applications with status rejected")
+    accepted = models.IntegerField(default=0, help_text="Applications with status accepted")
+    withdrawn = models.IntegerField(default=0, help_text="Applications with status withdrawn")
+
+    # Timestamps
+    updated_at = models.DateTimeField(auto_now=True, help_text="When these counters were last updated")
+
+    class Meta:
+        verbose_name_plural = 'application stats'
+
+    def __str__(self):
+        """String representation of the counters."""
+        return f"Application stats for {self.user}"
+
+
+class JobDescriptionVector(models.Model):
+    """
+    Model holding the term counts of one application's job description.
+
+    Stored in a compact binary form (see matching.py) so match ranking can
+    score every application without re-tokenizing its description. A vector
+    is recomputed only when its application changed after it was built and
+    the description text differs from the one it was built from.
+    """
+
+    application = models.OneToOneField(JobApplication, on_delete=models.CASCADE, primary_key=True, related_name='description_vector', help_text="Job application whose description this is")
+    text_hash = models.CharField(max_length=40, help_text="SHA-1 of the description the vector was built from")
+    term_ids = models.BinaryField(help_text="Sorted term ids as little-endian int64")
+    term_counts = models.BinaryField(help_text="Occurrences of each term as little-endian uint16")
+    application_updated_at = models.DateTimeField(help_text="The application's updated_at when the vector was last checked")
+
+    def __str__(self):
+        """String representation of the vector."""
+        return f"Description vector of application {self.application_id}"
+
+
+class MatchCorpus(models.Model):
+    """
+    Model holding per-user document frequencies of job description terms.
+
+    One row per user with the number of stored description vectors and, for
+    every term, the number of them containing it. Updated incrementally as
+    vectors change (see matching.py).
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='match_corpus', help_text="User whose job descriptions these are")
+    documents = models.PositiveIntegerField(default=0, help_text="Number of job descriptions counted")
+    term_ids = models.BinaryField(default=b'', help_text="Sorted term ids as little-endian int64")
+    term_documents = models.BinaryField(default=b'', help_text="Descriptions containing each term as little-endian uint32")
+    updated_at = models.DateTimeField(auto_now=True, help_text="When the frequencies were last updated")
+
+    class Meta:
+        verbose_name_plural = 'match corpora'
+
+    def __str__(self):
+        """String representation of the corpus."""
+        return f"Match corpus for {self.user}"
+
+
 class ResumeTemplate(models.Model):
     """
     Model representing a resume template.
@@ -183,6 +367,11 @@ class MeetingNote(models.Model):
     class Meta:
         # Order meeting notes by creation date (most recent first)
         ordering = ['-created_at']
+        indexes = [
+            # An application's notes, newest first (nested in application
+            # responses through prefetch_related)
+            models.Index(fields=['job_application', '-created_at'], name='meeting_note_app_created_idx'),
+        ]
     
     def __str__(self):
         """String representation of the meeting note."""
@@ -210,6 +399,10 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False, help_text="Whether the user has read this notification")
     is_active = models.BooleanField(default=True, help_text="Whether this notification is still active")
     
+    # Delivery: set once show_date has passed, by save() or the notification scheduler
+    is_delivered = models.BooleanField(default=False, help_text="Whether this notification is due and visible to the user")
+    delivered_at = models.DateTimeField(blank=True, null=True, help_text="When this notification was delivered")
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, help_text="When this notification was created")
     updated_at = models.DateTimeField(auto_now=True, help_text="When this notification was last updated")
@@ -219,11 +412,49 @@ class Notification(models.Model):
         ordering = ['-created_at']
         # Ensure user cannot have duplicate notifications for same job application and title
         unique_together = ['user', 'job_application', 'title']
+        indexes = [
+            # Partial indexes: their conditions match the filters used by
+            # NotificationViewSet (a user's delivered notifications, newest first) and the
+            # notification scheduler (not yet delivered, by show_date)
+            models.Index(
+                fields=['user', '-created_at'], name='notification_delivered_idx',
+                condition=models.Q(is_delivered=True, is_active=True),
+            ),
+            models.Index(fields=['show_date'], name='notification_due_idx', condition=models.Q(is_delivered=False)),
+            # Unread counts (NotificationViewSet.unread_count, notification streams)
+            models.Index(
+                fields=['user'], name='notification_unread_idx',
+                condition=models.Q(is_delivered=True, is_active=True, is_read=False),
+            ),
+        ]
     
     def __str__(self):
         """String representation of the notification."""
         return f"{self.title} - {self.job_application.position} at {self.job_application.company_name}"
     
+    def save(self, *args, **kwargs):
+        """
+        Keep the delivery state in step with show_date.
+        
+        Notifications that are already due are delivered right away; moving
+        show_date into the future hands the notification back to the scheduler.
+        """
+        from django.utils import timezone
+        now = timezone.now()
+        self._just_delivered = False
+        if self.show_date and self.show_date > now:
+            self.is_delivered = False
+            self.delivered_at = None
+        elif not self.is_delivered:
+            self.is_delivered = True
+            self.delivered_at = now
+            # Read by the post_save receiver that pushes new notifications to clients
+            self._just_delivered = True
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_delivered', 'delivered_at'}
+        super().save(*args, **kwargs)
+    
     @property
     def should_show(self):
         """Check if notification should be shown based on current time and show_date."""
@@ -0,0 +1,150 @@
+"""
+Job Tracker Pagination
+
+This module contains pagination classes for the job tracker API.
+ApplicationCursorPagination pages job applications with a keyset (seek)
+cursor on (-applied_date, id), so fetching any page costs the same
+index range scan no matter how deep into the list the client is.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ApplicationCursorPagination(BasePagination):
+    """
+    Keyset pagination for job applications ordered by (-applied_date, id).
+
+    The cursor encodes the (applied_date, id) of the boundary row and the
+    direction of travel. Pages are fetched with a WHERE clause on the
+    boundary instead of an OFFSET, so rows are never skipped or repeated
+    when applications are added between requests.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return one page of the queryset as a list.
+
+        Args:
+            queryset: QuerySet of JobApplication rows to paginate
+            request: The incoming request (cursor and page size are read from it)
+            view: The calling view
+
+        Returns:
+            list: The rows on the requested page
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse = False
+            rows = list(queryset.order_by('-applied_date', 'id')[:self.limit + 1])
+        else:
+            applied_date, pk, reverse = self.cursor
+            if reverse:
+                # Walk backwards from the boundary, then flip the page back into display order
+                queryset = queryset.filter(
+                    Q(applied_date__gt=applied_date) | Q(applied_date=applied_date, id__lt=pk)
+                ).order_by('applied_date', '-id')
+            else:
+                queryset = queryset.filter(
+                    Q(applied_date__lt=applied_date) | Q(applied_date=applied_date, id__gt=pk)
+                ).order_by('-applied_date', 'id')
+            rows = list(queryset[:self.limit + 1])
+
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+
+        if reverse:
+            rows.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        """Return the page size requested by the client, clamped to max_page_size."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor query parameter.
+
+        Returns:
+            tuple: (applied_date, id, reverse) or None when no cursor was given
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return date.fromisoformat(data['d']), int(data['i']), bool(data.get('r', False))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        """Build the page URL whose boundary is the given row."""
+        data = {'d': row.applied_date.isoformat(), 'i': row.pk}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode('ascii')
+        ).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Empty page past the end: going back means starting over
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,422 @@
+"""
+Job Tracker Resume Rendering
+
+This module renders the resume from the ResumeTemplate and the Experience,
+Project and Education sections as Markdown, sanitized HTML or plain text,
+and caches the result.
+
+A resume is a fixed list of sections (contact, experience, education,
+projects, skills, summary). Each section is rendered from the rows of one
+table by a renderer; renderers for the different output formats share
+that section model and are registered in RENDERERS.
+
+Caching works at two levels, both keyed on table versions: a fingerprint
+of each table's row count and latest updated_at, read for all four tables
+in one query. Any save changes a max(updated_at) and any delete changes a
+count, so an edit never serves stale output, and the versions come from
+the database so every worker process agrees on them.
+
+- Each rendered section is cached under the version of its own table, so
+  editing one project re-renders only the projects section.
+- The assembled document is cached under the combined version, with a
+  strong ETag (a hash of the output) for conditional requests.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import CharField, Count, Max, Value
+from django.utils.html import escape
+
+from .models import Education, Experience, Project, ResumeTemplate
+
+
+# Cached renders are keyed on content versions, so this only bounds how
+# long unused versions linger in the cache
+RESUME_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Sections in display order, with the model each one is rendered from
+SECTIONS = [
+    ('contact', ResumeTemplate),
+    ('experience', Experience),
+    ('education', Education),
+    ('projects', Project),
+    ('skills', ResumeTemplate),
+    ('summary', ResumeTemplate),
+]
+
+# Models whose rows make up the resume
+RESUME_MODELS = [ResumeTemplate, Experience, Project, Education]
+
+# Rows of the section models, in display order
+SECTION_QUERYSETS = {
+    Experience: lambda: Experience.objects.order_by('-start_date'),
+    Project: lambda: Project.objects.order_by('-start_date'),
+    Education: lambda: Education.objects.order_by('-start_date'),
+}
+
+
+def table_versions():
+    """
+    Return a version per resume table, computed in one query.
+
+    Returns:
+        dict: {model: short hex digest of the row count and latest updated_at}
+    """
+    queries = [
+        model.objects.order_by()
+        .annotate(table=Value(model._meta.model_name, output_field=CharField()))
+        .values('table')
+        .annotate(rows=Count('id'), latest=Max('updated_at'))
+        .values_list('table', 'rows', 'latest')
+        for model in RESUME_MODELS
+    ]
+    rows = {table: (count, latest) for table, count, latest in queries[0].union(*queries[1:], all=True)}
+    # Empty tables produce no row
+    return {
+        model: hashlib.sha1(repr(rows.get(model._meta.model_name)).encode()).hexdigest()[:12]
+        for model in RESUME_MODELS
+    }
+
+
+def content_version(versions=None):
+    """Return one version covering all resume content."""
+    versions = versions or table_versions()
+    return hashlib.sha1(repr([versions[model] for model in RESUME_MODELS]).encode()).hexdigest()[:16]
+
+
+def make_etag(content):
+    """Return a strong ETag for rendered output."""
+    return '"%s"' % hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+def contact_links(links):
+    """
+    Parse the template's links (one per line) for the contact line.
+
+    Links get an https:// prefix when they have no protocol; GitHub and
+    LinkedIn links get a display label.
+
+    Returns:
+        list: (label, url) pairs; label is None for links shown as their URL
+    """
+    parsed = []
+    for link in (line.strip() for line in (links or '').split('\n')):
+        if not link:
+            continue
+        if not link.startswith(('http://', 'https://')):
+            link = 'https://' + link
+        if 'github.com' in link.lower():
+            parsed.append(('GitHub', link))
+        elif 'linkedin.com' in link.lower():
+            parsed.append(('LinkedIn', link))
+        else:
+            parsed.append((None, link))
+    return parsed
+
+
+def date_range(start_date, end_date, is_current):
+    """Return the 'Month Year - Month Year' text of a section entry."""
+    end = 'Present' if is_current or not end_date else end_date.strftime('%B %Y')
+    return f"{start_date.strftime('%B %Y')} - {end}"
+
+
+class Renderer:
+    """
+    Base class of resume renderers.
+
+    Subclasses render the contact line, section wrappers and entries of one
+    output format; document() joins the rendered sections.
+    """
+
+    name = None
+    content_type = None
+
+    def document(self, sections):
+        return ''.join(sections)
+
+
+class MarkdownRenderer(Renderer):
+    """Renders the resume as Markdown (the format the resume editor works in)."""
+
+    name = 'markdown'
+    content_type = 'text/markdown; charset=utf-8'
+
+    def contact(self, template):
+        parts = [template.email, template.phone, template.city]
+        parts += [f"[{label}]({url})" if label else url for label, url in contact_links(template.links)]
+        return f"# {template.name}\n{' | '.join(parts)}\n\n"
+
+    def section(self, title, body):
+        return f"## {title}\n{body}\n"
+
+    def experience(self, exp):
+        parts = [f"### {exp.position} | {exp.company}\n", f"**{date_range(exp.start_date, exp.end_date, exp.is_current)}**\n"]
+        if exp.location:
+            parts.append(f"*{exp.location}*\n")
+        parts.append(f"{exp.description}\n\n")
+        return ''.join(parts)
+
+    def education(self, edu):
+        parts = [f"### {edu.degree} | {edu.institution}\n", f"**{date_range(edu.start_date, edu.end_date, edu.is_current)}**\n"]
+        if edu.field_of_study:
+            parts.append(f"*{edu.field_of_study}*\n")
+        if edu.gpa:
+            parts.append(f"GPA: {edu.gpa}\n")
+        parts.append("\n")
+        return ''.join(parts)
+
+    def project(self, proj):
+        title = f"[{proj.name}]({proj.url})" if proj.url else proj.name
+        if proj.technologies:
+            title = f"{title} | {proj.technologies}"
+        return ''.join([
+            f"### {title}\n",
+            f"**{date_range(proj.start_date, proj.end_date, proj.is_ongoing)}**\n",
+            f"{proj.description}\n\n",
+        ])
+
+    def skills(self, template):
+        return f"## Skills\n{template.skills}\n\n"
+
+    def summary(self, template):
+        return f"## Professional Summary\n{template.summary}\n"
+
+
+class HtmlRenderer(Renderer):
+    """
+    Renders the resume as an HTML fragment.
+
+    All user content is escaped, and only http(s) URLs are used as link
+    targets, so the output is safe to insert into a page as is.
+    """
+
+    name = 'html'
+    content_type = 'text/html; charset=utf-8'
+
+    def _link(self, url, label):
+        if not url.lower().startswith(('http://', 'https://')):
+            return escape(label)
+        return f'<a href="{escape(url)}">{escape(label)}</a>'
+
+    def _text(self, text):
+        return escape(text or '').replace('\n', '<br>\n')
+
+    def contact(self, template):
+        parts = [escape(template.email), escape(template.phone), escape(template.city)]
+        parts += [self._link(url, label or url) for label, url in contact_links(template.links)]
+        return f'<header>\n<h1>{escape(template.name)}</h1>\n<p class="contact">{" | ".join(parts)}</p>\n</header>\n'
+
+    def section(self, title, body):
+        return f'<section>\n<h2>{escape(title)}</h2>\n{body}</section>\n'
+
+    def _entry(self, heading, dates, *lines):
+        parts = [f'<article>\n<h3>{heading}</h3>\n<p class="dates">{escape(dates)}</p>\n']
+        parts += [f'{line}\n' for line in lines if line]
+        parts.append('</article>\n')
+        return ''.join(parts)
+
+    def experience(self, exp):
+        return self._entry(
+            f"{escape(exp.position)} | {escape(exp.company)}",
+            date_range(exp.start_date, exp.end_date, exp.is_current),
+            f'<p class="location">{escape(exp.location)}</p>' if exp.location else '',
+            f'<p>{self._text(exp.description)}</p>',
+        )
+
+    def education(self, edu):
+        return self._entry(
+            f"{escape(edu.degree)} | {escape(edu.institution)}",
+            date_range(edu.start_date, edu.end_date, edu.is_current),
+            f'<p class="field">{escape(edu.field_of_study)}</p>' if edu.field_of_study else '',
+            f'<p>GPA: {escape(edu.gpa)}</p>' if edu.gpa else '',
+        )
+
+    def project(self, proj):
+        title = self._link(proj.url, proj.name) if proj.url else escape(proj.name)
+        if proj.technologies:
+            title = f"{title} | {escape(proj.technologies)}"
+        return self._entry(
+            title,
+            date_range(proj.start_date, proj.end_date, proj.is_ongoing),
+            f'<p>{self._text(proj.description)}</p>',
+        )
+
+    def skills(self, template):
+        return self.section('Skills', f'<p>{self._text(template.skills)}</p>\n')
+
+    def summary(self, template):
+        return self.section('Professional Summary', f'<p>{self._text(template.summary)}</p>\n')
+
+    def document(self, sections):
+        return '<div class="resume">\n' + ''.join(sections) + '</div>\n'
+
+
+class PlainTextRenderer(Renderer):
+    """Renders the resume as plain text, e.g. for pasting into application forms."""
+
+    name = 'text'
+    content_type = 'text/plain; charset=utf-8'
+
+    def contact(self, template):
+        parts = [template.email, template.phone, template.city]
+        parts += [f"{label}: {url}" if label else url for label, url in contact_links(template.links)]
+        return f"{template.name}\n{' | '.join(parts)}\n\n"
+
+    def section(self, title, body):
+        return f"{title.upper()}\n{'=' * len(title)}\n{body}\n"
+
+    def _entry(self, heading, dates, *lines):
+        return ''.join([f"{heading}\n{dates}\n"] + [f"{line}\n" for line in lines if line] + ["\n"])
+
+    def experience(self, exp):
+        return self._entry(
+            f"{exp.position} | {exp.company}",
+            date_range(exp.start_date, exp.end_date, exp.is_current),
+            exp.location, exp.description,
+        )
+
+    def education(self, edu):
+        return self._entry(
+            f"{edu.degree} | {edu.institution}",
+            date_range(edu.start_date, edu.end_date, edu.is_current),
+            edu.field_of_study, f"GPA: {edu.gpa}" if edu.gpa else '',
+        )
+
+    def project(self, proj):
+        title = proj.name
+        if proj.technologies:
+            title = f"{title} | {proj.technologies}"
+        return self._entry(
+            title,
+            date_range(proj.start_date, proj.end_date, proj.is_ongoing),
+            proj.url, proj.description,
+        )
+
+    def skills(self, template):
+        return self.section('Skills', f"{template.skills}\n")
+
+    def summary(self, template):
+        return self.section('Professional Summary', f"{template.summary}\n")
+
+
+# Output formats by name; add a renderer class here to support a new format
+RENDERERS = {renderer.name: renderer for renderer in [MarkdownRenderer, HtmlRenderer, PlainTextRenderer]}
+
+
+def get_renderer(output):
+    """Return a renderer instance for an output format, raising ValueError for unknown formats."""
+    try:
+        return RENDERERS[output]()
+    except KeyError:
+        raise ValueError(f"Unknown output '{output}'. Choose from: {', '.join(RENDERERS)}.")
+
+
+def render_section(renderer, section, template, rows):
+    """
+    Render one section, or return '' when it has no content.
+
+    Args:
+        renderer: Renderer instance
+        section: Section name from SECTIONS
+        template: ResumeTemplate (used by contact, skills and summary)
+        rows: Rows of the section's model (used by experience, education, projects)
+    """
+    if section == 'contact':
+        return renderer.contact(template)
+    if section in ('skills', 'summary'):
+        value = getattr(template, section)
+        return getattr(renderer, section)(template) if value and value.strip() else ''
+
+    entry, title = {
+        'experience': (renderer.experience, 'Work Experience'),
+        'education': (renderer.education, 'Education'),
+        'projects': (renderer.project, 'Projects'),
+    }[section]
+    body = ''.join(entry(row) for row in rows)
+    return renderer.section(title, body) if body.strip() else ''
+
+
+def render_document(renderer, template, rows_by_model):
+    """
+    Render a whole resume without caching.
+
+    Args:
+        renderer: Renderer instance
+        template: ResumeTemplate with the personal information
+        rows_by_model: {model: rows in display order} for the section models
+    """
+    return renderer.document([
+        render_section(renderer, section, template, rows_by_model.get(model))
+        for section, model in SECTIONS
+    ])
+
+
+def section_cache_key(renderer, section, version):
+    """Return the cache key of one rendered section at its table's version."""
+    return f"job_tracker:resume:section:{renderer.name}:{section}:{version}"
+
+
+def render_cached_sections(renderer, template, versions):
+    """
+    Assemble a resume from cached sections, rendering only the stale ones.
+
+    Only the tables behind stale sections are queried.
+
+    Args:
+        renderer: Renderer instance
+        template: ResumeTemplate with the personal information
+        versions: dict returned by table_versions()
+
+    Returns:
+        str: The rendered document
+    """
+    keys = {section: section_cache_key(renderer, section, versions[model]) for section, model in SECTIONS}
+    cached = cache.get_many(keys.values())
+
+    rows_by_model = {}
+    rendered = {}
+    for section, model in SECTIONS:
+        key = keys[section]
+        if key in cached:
+            continue
+        if model in SECTION_QUERYSETS and model not in rows_by_model:
+            rows_by_model[model] = list(SECTION_QUERYSETS[model]())
+        rendered[key] = render_section(renderer, section, template, rows_by_model.get(model))
+    if rendered:
+        cache.set_many(rendered, RESUME_CACHE_TIMEOUT)
+        cached.update(rendered)
+    return renderer.document([cached[keys[section]] for section, _model in SECTIONS])
+
+
+def resume_cache_key(version, fresh, output='markdown'):
+    """Return the cache key of a whole render for a content version."""
+    return f"job_tracker:resume:{output}:{'fresh' if fresh else 'current'}:{version}"
+
+
+def get_rendered_resume(fresh=False, output='markdown'):
+    """
+    Return the rendered resume and its ETag, rendering only what changed.
+
+    Args:
+        fresh: Render from the database even when the template has
+            user-edited custom_markdown
+        output: Name of a renderer in RENDERERS. custom_markdown is Markdown,
+            so other formats always render from the database
+
+    Returns:
+        dict: {'content': str, 'etag': str, 'content_type': str}
+    """
+    renderer = get_renderer(output)
+    versions = table_versions()
+    key = resume_cache_key(content_version(versions), fresh, renderer.name)
+    rendered = cache.get(key)
+    if rendered is None:
+        template = ResumeTemplate.get_or_create_template()
+        if template.custom_markdown and not fresh and renderer.name == MarkdownRenderer.name:
+            content = template.custom_markdown
+        else:
+            content = render_cached_sections(renderer, template, versions)
+        rendered = {'content': content, 'etag': make_etag(content), 'content_type': renderer.content_type}
+        cache.set(key, rendered, RESUME_CACHE_TIMEOUT)
+    return rendered
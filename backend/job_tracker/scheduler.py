@@ -0,0 +1,85 @@
+"""
+Job Tracker Notification Scheduler
+
+Notifications become visible once their show_date has passed. Instead of
+filtering on show_date on every read, this scheduler periodically promotes
+due notifications to the delivered state, so reads only need an indexed
+lookup on is_delivered.
+
+Run it with the run_notification_scheduler management command.
+"""
+
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Notification
+from .signals import notifications_changed
+
+
+# Notifications promoted per UPDATE statement
+DELIVERY_BATCH_SIZE = 500
+
+
+def get_tick_seconds():
+    """Return the configured scheduler interval in seconds."""
+    return getattr(settings, 'NOTIFICATION_SCHEDULER_TICK', 60)
+
+
+def deliver_due_notifications(now=None, batch_size=DELIVERY_BATCH_SIZE):
+    """
+    Mark every notification whose show_date has passed as delivered.
+
+    Due notifications are selected through the (is_delivered, show_date)
+    index and updated batch_size at a time, so each UPDATE holds its locks
+    only briefly.
+
+    Args:
+        now: Reference time (defaults to the current time)
+        batch_size: Notifications updated per statement
+
+    Returns:
+        int: Number of notifications delivered
+    """
+    now = now or timezone.now()
+    delivered = 0
+    while True:
+        ids = list(
+            Notification.objects.filter(is_delivered=False, show_date__lte=now)
+            .order_by('show_date')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        # is_delivered=False again: a concurrent save() may have delivered some already
+        delivered += Notification.objects.filter(pk__in=ids, is_delivered=False).update(
+            is_delivered=True, delivered_at=now, updated_at=now,
+        )
+        notifications_changed.send(sender=Notification, user_ids=None, delivered_ids=ids)
+        if len(ids) < batch_size:
+            break
+    return delivered
+
+
+def run(tick=None, batch_size=DELIVERY_BATCH_SIZE, once=False, on_tick=None):
+    """
+    Deliver due notifications every tick seconds until interrupted.
+
+    Args:
+        tick: Seconds between runs (defaults to NOTIFICATION_SCHEDULER_TICK)
+        batch_size: Notifications updated per statement
+        once: Run a single tick and return
+        on_tick: Called with (started_at, delivered_count, duration_seconds) after every tick
+    """
+    tick = tick if tick is not None else get_tick_seconds()
+    while True:
+        started_at = timezone.now()
+        start = time.monotonic()
+        delivered = deliver_due_notifications(started_at, batch_size=batch_size)
+        duration = time.monotonic() - start
+        if on_tick:
+            on_tick(started_at, delivered, duration)
+        if once:
+            return
+        time.sleep(max(tick - duration, 0))
@@ -0,0 +1,460 @@
+"""
+Job Tracker Search
+
+This module maintains a full-text search index over job applications and
+their meeting notes. Two interchangeable backends are provided:
+
+- Fts5SearchBackend: an SQLite FTS5 virtual table ranked with bm25()
+- PostingsSearchBackend: a pure-Python inverted index stored in the
+  SearchPosting table, usable on any database
+
+The index is updated incrementally by signals whenever an application or a
+meeting note is written, and can be rebuilt with the rebuild_search_index
+management command.
+"""
+
+import math
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.utils import OperationalError
+from django.utils.html import escape
+
+from .models import JobApplication, MeetingNote, SearchPosting
+
+
+# Name of the FTS5 virtual table (created by migration 0005 on SQLite)
+FTS_TABLE = 'job_tracker_application_fts'
+
+# Indexed fields in column order, with their ranking weights
+SEARCH_FIELDS = ['company_name', 'position', 'notes', 'location', 'meeting_notes']
+FIELD_WEIGHTS = {
+    'company_name': 5.0,
+    'position': 4.0,
+    'notes': 1.0,
+    'location': 2.0,
+    'meeting_notes': 1.0,
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Longest term stored in the postings table
+MAX_TERM_LENGTH = 64
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    if not text:
+        return []
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall(text.lower())]
+
+
+def parse_query(query):
+    """
+    Turn a user query into search terms.
+
+    Every term must match. The last term is treated as a prefix so results
+    update while the user is still typing.
+
+    Returns:
+        tuple: (list of whole-word terms, prefix term or None)
+    """
+    terms = tokenize(query)
+    if not terms:
+        return [], None
+    if query.rstrip() != query:
+        # Trailing whitespace means the last word is complete
+        return terms, None
+    return terms[:-1], terms[-1]
+
+
+def document_fields(application, meeting_notes=None):
+    """
+    Build the indexed text fields for an application.
+
+    Args:
+        application: JobApplication instance
+        meeting_notes: Optional list of note contents; queried when omitted
+
+    Returns:
+        dict: Mapping of field name to text
+    """
+    if meeting_notes is None:
+        meeting_notes = MeetingNote.objects.filter(
+            job_application_id=application.pk
+        ).order_by('created_at').values_list('content', flat=True)
+    return {
+        'company_name': application.company_name or '',
+        'position': application.position or '',
+        'notes': application.notes or '',
+        'location': application.location or '',
+        'meeting_notes': '\n'.join(meeting_notes),
+    }
+
+
+def highlight(text, terms, prefix=None, context=8):
+    """
+    Build an HTML snippet around the first matching word in text.
+
+    The text is HTML-escaped and every matching word is wrapped in <mark>.
+
+    Args:
+        text: Source text
+        terms: Whole-word terms to highlight
+        prefix: Optional prefix term to highlight
+        context: Number of words to keep on each side of the first match
+
+    Returns:
+        str: The snippet, or None when nothing in text matches
+    """
+    if not text:
+        return None
+    terms = set(terms)
+    words = list(TOKEN_RE.finditer(text))
+
+    def matches(word):
+        word = word.lower()
+        return word in terms or (prefix is not None and word.startswith(prefix))
+
+    first = next((i for i, word in enumerate(words) if matches(word.group())), None)
+    if first is None:
+        return None
+
+    start_word = max(0, first - context)
+    end_word = min(len(words), first + context + 1)
+    start = words[start_word].start() if start_word > 0 else 0
+    end = words[end_word - 1].end() if end_word < len(words) else len(text)
+
+    parts = ['…'] if start > 0 else []
+    position = start
+    for word in words[start_word:end_word]:
+        if matches(word.group()):
+            parts.append(escape(text[position:word.start()]))
+            parts.append(f'<mark>{escape(word.group())}</mark>')
+            position = word.end()
+    parts.append(escape(text[position:end]))
+    if end < len(text):
+        parts.append('…')
+    return ''.join(parts)
+
+
+class Fts5SearchBackend:
+    """Search backend using an SQLite FTS5 virtual table keyed by application id."""
+
+    name = 'fts5'
+
+    def index(self, application, meeting_notes=None):
+        """Insert or replace the index row for an application."""
+        self.index_many([application], {application.pk: meeting_notes} if meeting_notes is not None else None)
+
+    def index_many(self, applications, notes_by_id=None):
+        """Insert or replace the index rows for several applications with two batched statements."""
+        rows = []
+        for application in applications:
+            notes = notes_by_id.get(application.pk, []) if notes_by_id is not None else None
+            fields = document_fields(application, notes)
+            rows.append([application.pk] + [fields[name] for name in SEARCH_FIELDS])
+        if not rows:
+            return
+        columns = ', '.join(SEARCH_FIELDS)
+        placeholders = ', '.join(['%s'] * len(SEARCH_FIELDS))
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[row[0]] for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (%s, {placeholders})',
+                rows,
+            )
+
+    def remove(self, application_id):
+        """Drop an application from the index."""
+        self.remove_many([application_id])
+
+    def remove_many(self, application_ids):
+        """Drop several applications from the index."""
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[pk] for pk in application_ids])
+
+    def clear(self):
+        """Remove every row from the index."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def _match_expression(self, terms, prefix):
+        """Build an FTS5 MATCH expression; terms are quoted so user input is never parsed as syntax."""
+        parts = [f'"{term}"' for term in terms]
+        if prefix:
+            parts.append(f'"{prefix}"*')
+        return ' AND '.join(parts)
+
+    def search(self, terms, prefix, offset, limit, user_id=None):
+        """
+        Run a ranked search.
+
+        Returns:
+            tuple: (total hit count, list of (application_id, score))
+        """
+        match = self._match_expression(terms, prefix)
+        weights = ', '.join(str(FIELD_WEIGHTS[name]) for name in SEARCH_FIELDS)
+        where = f'{FTS_TABLE} MATCH %s'
+        params = [match]
+        join = ''
+        if user_id is not None:
+            join = f'JOIN job_tracker_jobapplication AS app ON app.id = {FTS_TABLE}.rowid'
+            where += ' AND app.user_id = %s'
+            params.append(user_id)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} {join} WHERE {where}', params)
+            total = cursor.fetchone()[0]
+            # bm25() is lower-is-better; negate it so callers see higher-is-better scores
+            cursor.execute(
+                f'SELECT {FTS_TABLE}.rowid, -bm25({FTS_TABLE}, {weights}) AS score '
+                f'FROM {FTS_TABLE} {join} WHERE {where} '
+                f'ORDER BY score DESC, {FTS_TABLE}.rowid LIMIT %s OFFSET %s',
+                params + [limit, offset],
+            )
+            hits = [(row[0], row[1]) for row in cursor.fetchall()]
+        return total, hits
+
+
+class PostingsSearchBackend:
+    """
+    Pure-Python inverted index stored in the SearchPosting table.
+
+    Each posting records how often a term occurs in one field of one
+    application. Candidate documents are intersected in Python and ranked
+    with a field-weighted TF-IDF score.
+    """
+
+    name = 'postings'
+
+    def index(self, application, meeting_notes=None):
+        """Replace the postings for an application."""
+        self.index_many([application], {application.pk: meeting_notes} if meeting_notes is not None else None)
+
+    def index_many(self, applications, notes_by_id=None):
+        """Replace the postings for several applications."""
+        postings = []
+        for application in applications:
+            notes = notes_by_id.get(application.pk, []) if notes_by_id is not None else None
+            for field, text in document_fields(application, notes).items():
+                counts = defaultdict(int)
+                for term in tokenize(text):
+                    counts[term] += 1
+                postings.extend(
+                    SearchPosting(application_id=application.pk, field=field, term=term, frequency=count)
+                    for term, count in counts.items()
+                )
+        with transaction.atomic():
+            self.remove_many([application.pk for application in applications])
+            SearchPosting.objects.bulk_create(postings, batch_size=500)
+
+    def remove(self, application_id):
+        """Drop an application from the index."""
+        self.remove_many([application_id])
+
+    def remove_many(self, application_ids):
+        """Drop several applications from the index."""
+        application_ids = list(application_ids)
+        # Chunked to stay under the database's bound-parameter limit
+        for start in range(0, len(application_ids), 500):
+            SearchPosting.objects.filter(application_id__in=application_ids[start:start + 500]).delete()
+
+    def clear(self):
+        """Remove every posting."""
+        SearchPosting.objects.all().delete()
+
+    def _postings_for(self, term, is_prefix, user_id):
+        """Return {application_id: {field: frequency}} for one query term."""
+        postings = SearchPosting.objects.all()
+        if is_prefix:
+            # A range on the term column can use its index; LIKE 'x%' cannot on every database
+            postings = postings.filter(term__gte=term, term__lt=term + '\uffff')
+        else:
+            postings = postings.filter(term=term)
+        if user_id is not None:
+            postings = postings.filter(application__user_id=user_id)
+        documents = defaultdict(lambda: defaultdict(int))
+        for application_id, field, frequency in postings.values_list('application_id', 'field', 'frequency'):
+            documents[application_id][field] += frequency
+        return documents
+
+    def search(self, terms, prefix, offset, limit, user_id=None):
+        """
+        Run a ranked search.
+
+        Returns:
+            tuple: (total hit count, list of (application_id, score))
+        """
+        query = [(term, False) for term in terms]
+        if prefix:
+            query.append((prefix, True))
+
+        # Look up the rarest-looking (longest) term first so the candidate set shrinks fastest
+        query.sort(key=lambda item: -len(item[0]))
+        per_term = []
+        candidates = None
+        for term, is_prefix in query:
+            documents = self._postings_for(term, is_prefix, user_id)
+            candidates = set(documents) if candidates is None else candidates & set(documents)
+            per_term.append(documents)
+            if not candidates:
+                return 0, []
+
+        total_documents = SearchPosting.objects.values('application_id').distinct().count() or 1
+        scores = {}
+        for documents in per_term:
+            idf = math.log(1 + total_documents / len(documents))
+            for application_id in candidates:
+                weighted = sum(
+                    FIELD_WEIGHTS[field] * frequency
+                    for field, frequency in documents[application_id].items()
+                )
+                scores[application_id] = scores.get(application_id, 0.0) + idf * weighted
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(ranked), ranked[offset:offset + limit]
+
+
+_backend = None
+
+
+def fts5_available():
+    """Return True when the FTS5 index table exists on the default database."""
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT 1 FROM {FTS_TABLE} LIMIT 1')
+    except OperationalError:
+        return False
+    return True
+
+
+def get_backend():
+    """
+    Return the configured search backend.
+
+    JOB_TRACKER_SEARCH_BACKEND may be 'fts5', 'postings' or 'auto' (the
+    default), which uses FTS5 whenever the index table exists.
+    """
+    global _backend
+    if _backend is None:
+        choice = getattr(settings, 'JOB_TRACKER_SEARCH_BACKEND', 'auto')
+        if choice == 'fts5' or (choice == 'auto' and fts5_available()):
+            _backend = Fts5SearchBackend()
+        else:
+            _backend = PostingsSearchBackend()
+    return _backend
+
+
+def index_application(application, meeting_notes=None):
+    """Add or refresh one application in the search index."""
+    get_backend().index(application, meeting_notes)
+
+
+def remove_application(application_id):
+    """Remove one application from the search index."""
+    get_backend().remove(application_id)
+
+
+def _notes_by_application(application_ids=None):
+    """Return {application_id: [note contents]} in creation order."""
+    notes = MeetingNote.objects.order_by('created_at')
+    if application_ids is not None:
+        notes = notes.filter(job_application_id__in=application_ids)
+    notes_by_id = defaultdict(list)
+    for application_id, content in notes.values_list('job_application_id', 'content'):
+        notes_by_id[application_id].append(content)
+    return notes_by_id
+
+
+def index_applications(applications):
+    """Add or refresh several applications, reading their meeting notes in one query."""
+    applications = list(applications)
+    if not applications:
+        return
+    notes_by_id = _notes_by_application([application.pk for application in applications])
+    get_backend().index_many(applications, notes_by_id)
+
+
+def remove_applications(application_ids):
+    """Remove several applications from the search index."""
+    if application_ids:
+        get_backend().remove_many(list(application_ids))
+
+
+def reindex_application_id(application_id):
+    """Refresh one application by id, dropping it from the index if it no longer exists."""
+    application = JobApplication.objects.filter(pk=application_id).first()
+    if application is None:
+        remove_application(application_id)
+    else:
+        index_application(application)
+
+
+def rebuild_index(batch_size=500):
+    """
+    Rebuild the whole search index from the database.
+
+    Returns:
+        int: Number of applications indexed
+    """
+    backend = get_backend()
+    notes_by_id = _notes_by_application()
+
+    count = 0
+    batch = []
+    with transaction.atomic():
+        backend.clear()
+        for application in JobApplication.objects.order_by('id').iterator(chunk_size=batch_size):
+            batch.append(application)
+            if len(batch) >= batch_size:
+                backend.index_many(batch, notes_by_id)
+                count += len(batch)
+                batch = []
+        backend.index_many(batch, notes_by_id)
+        count += len(batch)
+    return count
+
+
+def search_applications(query, offset=0, limit=20, user_id=None):
+    """
+    Search applications and build highlighted snippets for the hits.
+
+    Args:
+        query: Free-text query; every word must match
+        offset: Number of ranked hits to skip
+        limit: Maximum number of hits to return
+        user_id: Optional owner to restrict the search to
+
+    Returns:
+        tuple: (total hit count, list of dicts with application, score and snippets)
+    """
+    terms, prefix = parse_query(query)
+    if not terms and not prefix:
+        return 0, []
+
+    total, hits = get_backend().search(terms, prefix, offset, limit, user_id=user_id)
+    if not hits:
+        return total, []
+
+    ids = [application_id for application_id, _score in hits]
+    applications = JobApplication.objects.prefetch_related('meetingnote_set').in_bulk(ids)
+
+    results = []
+    for application_id, score in hits:
+        application = applications.get(application_id)
+        if application is None:
+            continue
+        notes = [note.content for note in application.meetingnote_set.all()]
+        fields = document_fields(application, notes)
+        snippets = {}
+        for field in SEARCH_FIELDS:
+            snippet = highlight(fields[field], terms, prefix)
+            if snippet:
+                snippets[field] = snippet
+        results.append({'application': application, 'score': score, 'snippets': snippets})
+    return total, results
@@ -157,10 +157,10 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = [
             'id', 'user', 'job_application', 'job_application_title', 'job_application_company',
-            'title', 'message', 'show_date', 'is_read', 'is_active',
+            'title', 'message', 'show_date', 'is_read', 'is_active', 'is_delivered', 'delivered_at',
             'created_at', 'updated_at', 'should_show'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'should_show']
+        read_only_fields = ['id', 'user', 'is_delivered', 'delivered_at', 'created_at', 'updated_at', 'should_show']
 
     def create(self, validated_data):
         # Automatically assign the user from the request context
@@ -312,5 +312,50 @@ class ResumeTemplateCreateSerializer(serializers.ModelSerializer):
         return template
 
 
+class NotificationBulkSelectionSerializer(serializers.Serializer):
+    """
+    Selects the notifications a bulk notification action applies to.
+    
+    Either a list of ids or a filter: notifications created before a date,
+    for one job application, and/or with a given read state. Pass
+    all=true to select every notification explicitly.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=10000)
+    before = serializers.DateTimeField(required=False)
+    job_application = serializers.IntegerField(required=False)
+    is_read = serializers.BooleanField(required=False, allow_null=True, default=None)
+    all = serializers.BooleanField(required=False, default=False)
+
+    def has_selection(self):
+        """Return whether the request narrowed the selection or asked for everything."""
+        data = self.validated_data
+        return data['all'] or any(data.get(key) is not None for key in ['ids', 'before', 'job_application', 'is_read'])
+
+    def filter(self, queryset):
+        """Apply the selection to a notification queryset."""
+        data = self.validated_data
+        if data.get('ids') is not None:
+            queryset = queryset.filter(pk__in=data['ids'])
+        if data.get('before') is not None:
+            queryset = queryset.filter(created_at__lt=data['before'])
+        if data.get('job_application') is not None:
+            queryset = queryset.filter(job_application_id=data['job_application'])
+        if data.get('is_read') is not None:
+            queryset = queryset.filter(is_read=data['is_read'])
+        return queryset
+
+
+class MatchRequestSerializer(serializers.Serializer):
+    """
+    Body of a POST to the match action.
+    
+    job_description is scored instead of the saved one; when omitted the
+    saved description is used. Only strings are accepted (CharField alone
+    would turn numbers into text).
+    """
+    job_description = serializers.CharField(required=False, allow_blank=True, trim_whitespace=False)
 
-
+    def validate(self, attrs):
+        if 'job_description' in attrs and not isinstance(self.initial_data.get('job_description'), str):
+            raise serializers.ValidationError({'job_description': ['Not a valid string.']})
+        return attrs
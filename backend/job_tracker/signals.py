@@ -0,0 +1,179 @@
+"""
+Job Tracker Signals
+
+This module contains signal receivers that append to the StatusTransition
+log and keep derived data (the materialized ApplicationStats counters, the
+search and skill indexes and the cached funnel) in sync with JobApplication and
+MeetingNote writes, and that push Notification changes to open
+notification streams (see events.py).
+Receivers are connected when the app registry is ready (see apps.py).
+
+Notification writes that bypass save() (queryset update()/delete() in the
+bulk notification actions and the scheduler) send notifications_changed
+instead; Notification deliberately has no delete receivers so that
+queryset deletes stay a single DELETE.
+
+Bulk code paths that maintain the derived data themselves in batches wrap
+their writes in suspended() so the per-row receivers do not run.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import analytics, events, search, skills, stats
+from .models import JobApplication, MeetingNote, Notification, StatusTransition
+
+_state = threading.local()
+
+# Sent after bulk Notification writes. Arguments: user_ids (owners whose
+# notifications changed, or None when unknown) and delivered_ids (ids of
+# notifications that were just delivered).
+notifications_changed = Signal()
+
+
+@contextmanager
+def suspended():
+    """Skip the derived-data receivers for writes made in this thread inside the block."""
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def _is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_loaded_status(sender, instance, **kwargs):
+    """Remember the status the instance was loaded with to detect transitions on save."""
+    instance._loaded_status = instance.status
+
+
+@receiver(post_save, sender=JobApplication)
+def record_status_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Log status transitions and update the owner's counters.
+    
+    A transition is appended when an application is created and whenever
+    its status changes. Callers may set instance._transition_at to record
+    the time the user made the change instead of the time of the save.
+    """
+    if raw or _is_suspended():
+        # Fixture loading or a bulk write; counters are maintained by the caller
+        # (or rebuilt with the rebuild_stats command)
+        return
+    if created:
+        StatusTransition.objects.create(
+            application=instance,
+            from_status=None,
+            to_status=instance.status,
+            occurred_at=instance.created_at,
+        )
+        stats.record_created(instance.user_id, instance.status)
+    elif instance._loaded_status != instance.status:
+        StatusTransition.objects.create(
+            application=instance,
+            from_status=instance._loaded_status,
+            to_status=instance.status,
+            occurred_at=getattr(instance, '_transition_at', None) or timezone.now(),
+        )
+        stats.record_transition(instance.user_id, instance._loaded_status, instance.status)
+    instance._loaded_status = instance.status
+    instance._transition_at = None
+
+
+@receiver(post_delete, sender=JobApplication)
+def update_stats_on_delete(sender, instance, **kwargs):
+    """Remove a deleted application from the owner's counters."""
+    if _is_suspended():
+        return
+    stats.record_deleted(instance.user_id, instance._loaded_status)
+
+
+@receiver(post_save, sender=JobApplication)
+def update_search_index_on_save(sender, instance, raw=False, **kwargs):
+    """Refresh the search index entry of a saved application."""
+    if raw or _is_suspended():
+        return
+    search.index_application(instance)
+
+
+@receiver(post_save, sender=JobApplication)
+def update_skill_index_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Refresh the skill mentions of a saved application (deletes cascade)."""
+    if raw or _is_suspended():
+        return
+    if update_fields is not None and not skills.INDEXED_FIELDS & set(update_fields):
+        return
+    skills.index_application(instance)
+
+
+@receiver(post_delete, sender=JobApplication)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    """Drop a deleted application from the search index."""
+    if _is_suspended():
+        return
+    search.remove_application(instance.pk)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_funnel_cache(sender, instance, **kwargs):
+    """Drop the owner's cached funnel whenever one of their applications changes."""
+    if _is_suspended():
+        return
+    analytics.invalidate_funnel(instance.user_id)
+
+
+@receiver(post_save, sender=MeetingNote)
+@receiver(post_delete, sender=MeetingNote)
+def update_search_index_on_note_change(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the search index entry of the note's application.
+    
+    Deferred until commit: when an application is deleted its notes are
+    deleted first, and reindexing then would resurrect the index entry.
+    """
+    if raw or _is_suspended():
+        return
+    application_id = instance.job_application_id
+    transaction.on_commit(lambda: search.reindex_application_id(application_id))
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification_on_save(sender, instance, raw=False, **kwargs):
+    """Push the new unread count, and the notification itself when it was just delivered."""
+    if raw:
+        return
+    just_delivered = getattr(instance, '_just_delivered', False)
+
+    def publish():
+        if just_delivered:
+            events.broker.publish_notification(instance)
+        events.broker.publish_unread_counts([instance.user_id])
+    transaction.on_commit(publish)
+
+
+@receiver(notifications_changed)
+def publish_notification_changes(sender, user_ids=None, delivered_ids=(), **kwargs):
+    """Push unread counts (and newly delivered notifications) after a bulk Notification write."""
+    delivered_ids = list(delivered_ids)
+
+    def publish():
+        subscribed = events.broker.subscribed_user_ids(user_ids)
+        if not subscribed:
+            return
+        if delivered_ids:
+            for notification in Notification.objects.filter(pk__in=delivered_ids, user_id__in=subscribed):
+                events.broker.publish_notification(notification)
+        events.broker.publish_unread_counts(subscribed)
+    transaction.on_commit(publish)
+
@@ -0,0 +1,291 @@
+"""
+Job Tracker Skill Index
+
+This module maintains an inverted index from skills to the applications
+whose job description or notes mention them (SkillMention), and answers
+skill-gap queries from it: which skills are demanded most across a user's
+applications, and which of those the resume does not list.
+
+Skills come from a fixed vocabulary of canonical names with aliases
+(SKILLS), matched as whole token phrases so "Postgres", "PostgreSQL" and
+"postgresql" all count as postgresql and "React Native" is not also
+counted as react. The resume's skills are read from ResumeTemplate.skills
+and Project.technologies; list entries outside the vocabulary are kept as
+written so they still count as known.
+
+The index is updated incrementally by signals whenever an application is
+saved, by the bulk code paths in batches, and can be rebuilt with the
+rebuild_skill_index management command. Updates compare against the
+stored mentions and only write the rows that changed.
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import Count
+
+from .matching import TOKEN_RE
+from .models import JobApplication, Project, ResumeTemplate, SkillMention
+
+
+# Canonical skill name -> aliases (the canonical name is always an alias).
+# Ambiguous English words ("go", "express", "spring") are only matched in
+# unambiguous forms.
+SKILLS = {
+    'python': ['python', 'python3'],
+    'java': ['java'],
+    'javascript': ['javascript', 'js', 'ecmascript', 'es6'],
+    'typescript': ['typescript', 'ts'],
+    'c++': ['c++', 'cpp'],
+    'c#': ['c#', 'csharp'],
+    '.net': ['dotnet', '.net core', '.net framework', 'asp.net'],
+    'golang': ['golang', 'go lang'],
+    'rust': ['rust'],
+    'ruby': ['ruby'],
+    'php': ['php'],
+    'kotlin': ['kotlin'],
+    'swift': ['swift', 'swiftui'],
+    'scala': ['scala'],
+    'matlab': ['matlab'],
+    'bash': ['bash', 'shell scripting'],
+    'sql': ['sql'],
+    'html': ['html', 'html5'],
+    'css': ['css', 'css3', 'sass', 'scss'],
+    'react': ['react', 'react.js', 'reactjs'],
+    'react native': ['react native'],
+    'angular': ['angular', 'angularjs'],
+    'vue': ['vue', 'vue.js', 'vuejs'],
+    'next.js': ['next.js', 'nextjs'],
+    'node.js': ['node.js', 'nodejs', 'node'],
+    'express.js': ['expressjs'],
+    'django': ['django'],
+    'flask': ['flask'],
+    'fastapi': ['fastapi'],
+    'spring boot': ['spring framework', 'springboot'],
+    'rails': ['rails', 'ruby on rails'],
+    'graphql': ['graphql'],
+    'rest api': ['rest apis', 'restful'],
+    'grpc': ['grpc'],
+    'postgresql': ['postgresql', 'postgres'],
+    'mysql': ['mysql'],
+    'sqlite': ['sqlite'],
+    'mongodb': ['mongodb', 'mongo'],
+    'redis': ['redis'],
+    'elasticsearch': ['elasticsearch', 'elastic search'],
+    'kafka': ['kafka'],
+    'rabbitmq': ['rabbitmq'],
+    'spark': ['spark', 'pyspark', 'apache spark'],
+    'hadoop': ['hadoop'],
+    'airflow': ['airflow'],
+    'aws': ['aws', 'amazon web services'],
+    'azure': ['azure'],
+    'gcp': ['gcp', 'google cloud', 'google cloud platform'],
+    'docker': ['docker'],
+    'kubernetes': ['kubernetes', 'k8s'],
+    'terraform': ['terraform'],
+    'ansible': ['ansible'],
+    'linux': ['linux', 'unix'],
+    'git': ['git'],
+    'ci/cd': ['ci/cd', 'ci cd', 'continuous integration', 'continuous delivery', 'continuous deployment'],
+    'jenkins': ['jenkins'],
+    'github actions': ['github actions'],
+    'microservices': ['microservices', 'microservice'],
+    'machine learning': ['machine learning', 'ml'],
+    'deep learning': ['deep learning'],
+    'nlp': ['nlp', 'natural language processing'],
+    'computer vision': ['computer vision'],
+    'data analysis': ['data analysis', 'data analytics'],
+    'pandas': ['pandas'],
+    'numpy': ['numpy'],
+    'tensorflow': ['tensorflow'],
+    'pytorch': ['pytorch', 'torch'],
+    'scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
+    'tableau': ['tableau'],
+    'power bi': ['power bi', 'powerbi'],
+    'microsoft excel': ['ms excel'],
+    'figma': ['figma'],
+    'jira': ['jira'],
+    'agile': ['agile', 'scrum', 'kanban'],
+    'automated testing': ['unit testing', 'test automation', 'tdd', 'pytest', 'jest', 'selenium', 'cypress'],
+    'application security': ['cybersecurity', 'owasp'],
+    'android': ['android'],
+    'ios': ['ios'],
+}
+
+# Application fields scanned for skills
+INDEXED_FIELDS = {'job_description', 'notes'}
+
+# Separators of entries in the resume's skills and technologies lists
+LIST_SEPARATOR_RE = re.compile(r'[,;|\n•]+')
+
+
+def _phrase(text):
+    """Return the token tuple of a skill alias or text span."""
+    return tuple(TOKEN_RE.findall(text.lower()))
+
+
+# Alias token tuple -> canonical skill
+PHRASES = {_phrase(alias): skill for skill, aliases in SKILLS.items() for alias in [skill] + aliases}
+MAX_PHRASE_LENGTH = max(len(phrase) for phrase in PHRASES)
+
+
+def extract_skills(text):
+    """
+    Return the canonical skills mentioned in text.
+
+    Tokens are matched against the alias phrases longest first, and matched
+    tokens are consumed, so overlapping aliases count once.
+
+    Returns:
+        set: Canonical skill names
+    """
+    tokens = TOKEN_RE.findall((text or '').lower())
+    found = set()
+    position = 0
+    while position < len(tokens):
+        for length in range(min(MAX_PHRASE_LENGTH, len(tokens) - position), 0, -1):
+            skill = PHRASES.get(tuple(tokens[position:position + length]))
+            if skill:
+                found.add(skill)
+                position += length
+                break
+        else:
+            position += 1
+    return found
+
+
+def application_skills(application):
+    """
+    Return the skills an application mentions and where.
+
+    Returns:
+        dict: {skill: (in_description, in_notes)}
+    """
+    in_description = extract_skills(application.job_description)
+    in_notes = extract_skills(application.notes)
+    return {skill: (skill in in_description, skill in in_notes) for skill in in_description | in_notes}
+
+
+def index_applications(applications):
+    """
+    Bring the skill mentions of several applications up to date.
+
+    The stored mentions are read in one query and compared with the text,
+    so only added, changed and removed mentions are written.
+    """
+    applications = list(applications)
+    if not applications:
+        return
+    ids = [application.pk for application in applications]
+    stored = {}
+    # Chunked to stay under the database's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        for mention in SkillMention.objects.filter(application_id__in=ids[start:start + 500]):
+            stored[(mention.application_id, mention.skill)] = mention
+
+    to_create = []
+    to_update = []
+    for application in applications:
+        for skill, (in_description, in_notes) in application_skills(application).items():
+            mention = stored.pop((application.pk, skill), None)
+            if mention is None:
+                to_create.append(SkillMention(
+                    user_id=application.user_id, application_id=application.pk, skill=skill,
+                    in_description=in_description, in_notes=in_notes,
+                ))
+            elif (mention.in_description, mention.in_notes) != (in_description, in_notes):
+                mention.in_description, mention.in_notes = in_description, in_notes
+                to_update.append(mention)
+    # Whatever is left is no longer mentioned
+    to_delete = [mention.pk for mention in stored.values()]
+
+    with transaction.atomic():
+        SkillMention.objects.bulk_create(to_create, batch_size=500)
+        SkillMention.objects.bulk_update(to_update, ['in_description', 'in_notes'], batch_size=500)
+        for start in range(0, len(to_delete), 500):
+            SkillMention.objects.filter(pk__in=to_delete[start:start + 500]).delete()
+
+
+def index_application(application):
+    """Bring the skill mentions of one application up to date."""
+    index_applications([application])
+
+
+def rebuild_index(batch_size=500):
+    """
+    Rebuild the whole skill index from the database.
+
+    Returns:
+        int: Number of applications indexed
+    """
+    count = 0
+    batch = []
+    applications = JobApplication.objects.order_by('id').only('id', 'user_id', 'job_description', 'notes')
+    with transaction.atomic():
+        SkillMention.objects.all().delete()
+        for application in applications.iterator(chunk_size=batch_size):
+            batch.append(application)
+            if len(batch) >= batch_size:
+                index_applications(batch)
+                count += len(batch)
+                batch = []
+        index_applications(batch)
+        count += len(batch)
+    return count
+
+
+def resume_skills():
+    """
+    Return the skills listed on the resume.
+
+    Reads ResumeTemplate.skills and Project.technologies. Vocabulary skills
+    are normalized to their canonical names; other list entries are kept
+    lowercased as written.
+
+    Returns:
+        set: Skill names
+    """
+    texts = list(ResumeTemplate.objects.values_list('skills', flat=True))
+    texts += Project.objects.exclude(technologies__isnull=True).values_list('technologies', flat=True)
+
+    skills = set()
+    for text in filter(None, texts):
+        for entry in LIST_SEPARATOR_RE.split(text):
+            entry = entry.strip()
+            if not entry:
+                continue
+            found = extract_skills(entry)
+            skills |= found or {' '.join(_phrase(entry)) or entry.lower()}
+    return skills
+
+
+def skill_gaps(user_id, limit=20):
+    """
+    Rank the skills a user's applications demand against the resume.
+
+    Answered with one grouped count over the (user, skill) index.
+
+    Args:
+        user_id: Owner of the applications
+        limit: Number of missing skills to return
+
+    Returns:
+        dict: 'missing' (demanded skills the resume lacks, most demanded
+            first), 'matched' (demanded skills the resume lists) and
+            'resume_skills'; each demanded skill has its application count
+    """
+    demand = (
+        SkillMention.objects.filter(user_id=user_id)
+        .values('skill').annotate(applications=Count('id'))
+        .order_by('-applications', 'skill')
+    )
+    known = resume_skills()
+    missing = []
+    matched = []
+    for row in demand:
+        (matched if row['skill'] in known else missing).append(row)
+    return {
+        'missing': missing[:limit],
+        'matched': matched,
+        'resume_skills': sorted(known),
+    }
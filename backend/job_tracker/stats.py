@@ -0,0 +1,168 @@
+"""
+Job Tracker Statistics
+
+This module computes job application statistics for the dashboard.
+Status counts can either be aggregated from the applications table in a
+single conditional-aggregation query, or served from the per-user
+ApplicationStats counter table that is kept in sync by signals.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import JobApplication, ApplicationStats
+
+
+# Every status key reported by the stats endpoint, in display order
+STATUS_KEYS = [value for value, _label in JobApplication.STATUS_CHOICES]
+
+
+def _empty_stats():
+    """Return a stats dict with every counter set to zero."""
+    stats = {'total': 0}
+    for key in STATUS_KEYS:
+        stats[key] = 0
+    return stats
+
+
+def _status_aggregates():
+    """Build the conditional Count() aggregates for the total and every status."""
+    aggregates = {'total': Count('id')}
+    for key in STATUS_KEYS:
+        aggregates[key] = Count('id', filter=Q(status=key))
+    return aggregates
+
+
+def aggregate_status_counts(queryset):
+    """
+    Count applications per status in a single database query.
+
+    Args:
+        queryset: QuerySet of JobApplication rows to count
+
+    Returns:
+        dict: Mapping with 'total' plus one key per status
+    """
+    # Drop the default ordering so the database does not sort before counting
+    return queryset.order_by().aggregate(**_status_aggregates())
+
+
+def counter_status_counts(user=None):
+    """
+    Read status counts from the materialized ApplicationStats table.
+
+    Args:
+        user: Optional user to restrict the counters to; when omitted the
+            counters for every user are summed
+
+    Returns:
+        dict: Mapping with 'total' plus one key per status
+    """
+    rows = ApplicationStats.objects.all()
+    if user is not None:
+        rows = rows.filter(user=user)
+    sums = {key: Sum(key) for key in ['total'] + STATUS_KEYS}
+    result = rows.aggregate(**sums)
+    return {key: value or 0 for key, value in result.items()}
+
+
+def _apply_delta(user_id, deltas, create=True):
+    """
+    Atomically add the given deltas to a user's counter row.
+
+    Uses F() expressions so concurrent writers never lose increments.
+    When create is False a missing counter row is left missing (used on
+    delete, where the owner may itself be in the middle of being deleted).
+    """
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not deltas or user_id is None:
+        return
+    updates = {key: F(key) + value for key, value in deltas.items()}
+    updated = ApplicationStats.objects.filter(user_id=user_id).update(**updates)
+    if not updated and create:
+        # First write for this user: create the row, then apply the delta
+        ApplicationStats.objects.get_or_create(user_id=user_id)
+        ApplicationStats.objects.filter(user_id=user_id).update(**updates)
+
+
+def record_created(user_id, status):
+    """Count a newly created application."""
+    _apply_delta(user_id, {'total': 1, status: 1})
+
+
+def record_deleted(user_id, status):
+    """Remove a deleted application from the counters."""
+    _apply_delta(user_id, {'total': -1, status: -1}, create=False)
+
+
+def record_transition(user_id, old_status, new_status):
+    """Move one application from old_status to new_status in the counters."""
+    if old_status == new_status:
+        return
+    _apply_delta(user_id, {old_status: -1, new_status: 1})
+
+
+def record_changes(user_id, created=(), deleted=(), transitions=()):
+    """
+    Apply the counter changes of a batch of writes with a single UPDATE.
+
+    Args:
+        user_id: Owner of the changed applications
+        created: Statuses of newly created applications
+        deleted: Statuses of deleted applications
+        transitions: (old_status, new_status) pairs of status changes
+    """
+    deltas = defaultdict(int)
+    for status in created:
+        deltas['total'] += 1
+        deltas[status] += 1
+    for status in deleted:
+        deltas['total'] -= 1
+        deltas[status] -= 1
+    for old_status, new_status in transitions:
+        if old_status != new_status:
+            deltas[old_status] -= 1
+            deltas[new_status] += 1
+    _apply_delta(user_id, deltas, create=bool(created or transitions))
+
+
+def rebuild_counters(dry_run=False):
+    """
+    Recompute every user's counters from the applications table.
+
+    Args:
+        dry_run: When True, only report differences without writing
+
+    Returns:
+        list: (user_id, stored, actual) tuples for every user whose stored
+            counters did not match the source rows
+    """
+    actual = {}
+    for row in JobApplication.objects.order_by().values('user_id').annotate(**_status_aggregates()):
+        user_id = row.pop('user_id')
+        actual[user_id] = row
+
+    stored = {}
+    for row in ApplicationStats.objects.values('user_id', 'total', *STATUS_KEYS):
+        user_id = row.pop('user_id')
+        stored[user_id] = row
+
+    mismatches = []
+    for user_id in set(actual) | set(stored):
+        expected = actual.get(user_id, _empty_stats())
+        current = stored.get(user_id)
+        if current != expected:
+            mismatches.append((user_id, current, expected))
+
+    if dry_run or not mismatches:
+        return mismatches
+
+    with transaction.atomic():
+        for user_id, current, expected in mismatches:
+            if current is None:
+                ApplicationStats.objects.create(user_id=user_id, **expected)
+            else:
+                ApplicationStats.objects.filter(user_id=user_id).update(**expected)
+    return mismatches
@@ -0,0 +1,781 @@
+"""
+Job Tracker Tests
+
+Behavioural tests for the job tracker API and the data derived from
+applications (counters, transitions, search and skill indexes), plus
+query plan checks for the API's hot queries.
+
+Endpoints are called anonymously, so they act for the default development
+user (see views.request_user).
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from datetime import date, timedelta
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from unittest import skipUnless
+
+from . import events
+from .matching import DocumentFrequencies, TermVector, description_terms, score_vectors, term_id, tokenize
+from .models import (
+    ApplicationStats, Experience, JobApplication, MeetingNote, Notification, SkillMention, StatusTransition,
+)
+from .scheduler import deliver_due_notifications
+from .search import search_applications
+from .skills import application_skills
+from .stats import aggregate_status_counts, counter_status_counts, rebuild_counters
+from .views import request_user
+
+
+def dev_user():
+    """Return the user anonymous API requests act for."""
+    return request_user(Request(APIRequestFactory().get('/')))
+
+
+# Tables whose queries must be answered through an index
+INDEXED_TABLES = {
+    JobApplication._meta.db_table,
+    MeetingNote._meta.db_table,
+    Notification._meta.db_table,
+}
+
+
+def application_data(company, position="Engineer", **fields):
+    """Return the fields of a new application, as posted to the API."""
+    return {'company_name': company, 'position': position, 'applied_date': date.today().isoformat(), **fields}
+
+
+class StatsTests(TestCase):
+    """The materialized ApplicationStats counters (stats.py) follow every change."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = dev_user()
+
+    def assertCountersMatch(self):
+        expected = aggregate_status_counts(JobApplication.objects.filter(user=self.user))
+        self.assertEqual(counter_status_counts(self.user), expected)
+        self.assertEqual(self.client.get('/api/applications/stats/').json(), expected)
+        self.assertEqual(self.client.get('/api/applications/stats/?source=aggregate').json(), expected)
+
+    def test_counters_follow_create_update_delete(self):
+        ids = [
+            self.client.post('/api/applications/', application_data(f"Company {i}"), format='json').json()['id']
+            for i in range(3)
+        ]
+        self.assertEqual(counter_status_counts(self.user)['applied'], 3)
+        self.assertCountersMatch()
+
+        self.client.patch(f'/api/applications/{ids[0]}/', {'status': 'interview'}, format='json')
+        self.client.patch(f'/api/applications/{ids[1]}/', {'status': 'rejected'}, format='json')
+        self.assertEqual(counter_status_counts(self.user)['interview'], 1)
+        self.assertCountersMatch()
+
+        self.client.delete(f'/api/applications/{ids[1]}/')
+        self.assertEqual(counter_status_counts(self.user)['total'], 2)
+        self.assertCountersMatch()
+
+    def test_counters_are_per_user(self):
+        other = User.objects.create(username='other')
+        JobApplication.objects.create(user=other, company_name="Elsewhere", position="Engineer", applied_date=date.today())
+        self.client.post('/api/applications/', application_data("Acme"), format='json')
+        self.assertEqual(counter_status_counts(self.user)['total'], 1)
+        self.assertEqual(counter_status_counts()['total'], 2)
+        self.assertCountersMatch()
+
+    def test_rebuild_stats(self):
+        self.client.post('/api/applications/', application_data("Acme"), format='json')
+        ApplicationStats.objects.filter(user=self.user).update(total=10, applied=0)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_stats', '--check', stdout=StringIO())
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertCountersMatch()
+        call_command('rebuild_stats', '--check', stdout=StringIO())
+
+
+class StatusTransitionTests(TestCase):
+    """update() logs every status change and fills each status's date column once."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.application_id = self.client.post('/api/applications/', application_data("Acme"), format='json').json()['id']
+        self.url = f'/api/applications/{self.application_id}/'
+
+    def transitions(self):
+        return list(
+            StatusTransition.objects.filter(application_id=self.application_id).order_by('id')
+            .values_list('from_status', 'to_status', 'occurred_at')
+        )
+
+    def test_status_changes_are_logged(self):
+        interview_at = timezone.now() - timedelta(days=2)
+        rejected_at = timezone.now() - timedelta(days=1)
+        self.client.patch(self.url, {'status': 'interview', 'client_timestamp': interview_at.isoformat()}, format='json')
+        self.client.patch(self.url, {'status': 'rejected', 'client_timestamp': rejected_at.isoformat()}, format='json')
+
+        transitions = self.transitions()
+        self.assertEqual(
+            [(from_status, to_status) for from_status, to_status, _at in transitions],
+            [(None, 'applied'), ('applied', 'interview'), ('interview', 'rejected')],
+        )
+        self.assertEqual([at for _from, _to, at in transitions[1:]], [interview_at, rejected_at])
+
+        application = JobApplication.objects.get(pk=self.application_id)
+        self.assertEqual(application.interview_date, interview_at)
+        self.assertEqual(application.rejected_date, rejected_at)
+        self.assertEqual(len(self.client.get(f'{self.url}timeline/').json()['transitions']), 3)
+
+    def test_date_field_keeps_first_visit(self):
+        first = timezone.now() - timedelta(days=3)
+        self.client.patch(self.url, {'status': 'interview', 'client_timestamp': first.isoformat()}, format='json')
+        self.client.patch(self.url, {'status': 'applied'}, format='json')
+        self.client.patch(self.url, {'status': 'interview'}, format='json')
+
+        self.assertEqual(JobApplication.objects.get(pk=self.application_id).interview_date, first)
+        self.assertEqual(len(self.transitions()), 4)
+
+    def test_other_changes_log_nothing(self):
+        self.client.patch(self.url, {'notes': 'Referred by a friend'}, format='json')
+        self.assertEqual(len(self.transitions()), 1)
+
+
+class FunnelTests(TestCase):
+    """The funnel follows the status history, with or without a status filter."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.ids = {}
+        for company, statuses in [
+            ("Direct", ['rejected']),
+            ("Interviewed", ['interview', 'rejected']),
+            ("Pending", []),
+        ]:
+            pk = self.client.post('/api/applications/', application_data(company), format='json').json()['id']
+            for status in statuses:
+                self.client.patch(f'/api/applications/{pk}/', {'status': status}, format='json')
+            self.ids[company] = pk
+
+    def links(self, query=''):
+        response = self.client.get(f'/api/applications/funnel/{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted((link['source'], link['target'], link['value']) for link in response.json()['links'])
+
+    def test_status_filter_keeps_history(self):
+        expected = [('applied', 'interview', 1), ('applied', 'rejected', 1), ('interview', 'rejected', 1)]
+        self.assertEqual(self.links(), expected)
+        # Rejected without an interview stays a direct flow when filtered
+        self.assertEqual(self.links('?status=rejected'), expected)
+        self.assertEqual(self.links('?status=applied'), [])
+        self.assertEqual(
+            [node['id'] for node in self.client.get('/api/applications/funnel/?status=applied').json()['nodes']],
+            ['applied'],
+        )
+
+    def test_filtered_funnel_is_invalidated(self):
+        self.assertIn(('applied', 'rejected', 1), self.links('?status=rejected'))
+        self.client.patch(f'/api/applications/{self.ids["Pending"]}/', {'status': 'rejected'}, format='json')
+        self.assertIn(('applied', 'rejected', 2), self.links('?status=rejected'))
+
+    def test_unknown_status(self):
+        self.assertEqual(self.client.get('/api/applications/funnel/?status=bogus').status_code, 400)
+
+
+class DerivedDataAssertions:
+    """Checks that the data derived from a user's applications matches the applications."""
+
+    def assertDerivedConsistent(self, user):
+        applications = list(JobApplication.objects.filter(user=user))
+
+        self.assertEqual(counter_status_counts(user), aggregate_status_counts(JobApplication.objects.filter(user=user)))
+        self.assertEqual(rebuild_counters(dry_run=True), [])
+
+        for application in applications:
+            last = StatusTransition.objects.filter(application=application).order_by('id').last()
+            self.assertIsNotNone(last, application)
+            self.assertEqual(last.to_status, application.status, application)
+
+            total, hits = search_applications(application.company_name, user_id=user.pk)
+            self.assertIn(application.pk, [hit['application'].pk for hit in hits], application)
+
+        # Every application's position is "Engineer"
+        total, _hits = search_applications('engineer', user_id=user.pk, limit=1)
+        self.assertEqual(total, len(applications))
+
+        expected_skills = {
+            (application.pk, skill) for application in applications for skill in application_skills(application)
+        }
+        self.assertEqual(set(SkillMention.objects.filter(user=user).values_list('application_id', 'skill')), expected_skills)
+
+
+class BulkTests(DerivedDataAssertions, TestCase):
+    """Bulk create, update and delete (bulk.py) through the API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = dev_user()
+        self.existing = self.client.post(
+            '/api/applications/', application_data("Acme", job_description="Python developer"), format='json'
+        ).json()['id']
+
+    def bulk_create(self, items, on_conflict):
+        response = self.client.post(
+            '/api/applications/bulk_create/', {'items': items, 'on_conflict': on_conflict}, format='json'
+        )
+        self.assertIn(response.status_code, (200, 201))
+        return response.json()
+
+    def items(self):
+        return [
+            application_data("Acme", status='interview', job_description="Django and React developer"),
+            application_data("Globex", job_description="Kubernetes engineer"),
+        ]
+
+    def test_conflict_error(self):
+        result = self.bulk_create(self.items(), 'error')
+        self.assertEqual((result['created'], result['updated'], result['skipped']), (1, 0, 0))
+        self.assertEqual([error['index'] for error in result['errors']], [0])
+        self.assertEqual(JobApplication.objects.get(pk=self.existing).status, 'applied')
+        self.assertDerivedConsistent(self.user)
+
+    def test_conflict_skip(self):
+        result = self.bulk_create(self.items(), 'skip')
+        self.assertEqual((result['created'], result['updated'], result['skipped']), (1, 0, 1))
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(JobApplication.objects.get(pk=self.existing).job_description, "Python developer")
+        self.assertDerivedConsistent(self.user)
+
+    def test_conflict_upsert(self):
+        result = self.bulk_create(self.items(), 'upsert')
+        self.assertEqual((result['created'], result['updated'], result['skipped']), (1, 1, 0))
+        application = JobApplication.objects.get(pk=self.existing)
+        self.assertEqual(application.status, 'interview')
+        self.assertIsNotNone(application.interview_date)
+        self.assertEqual(
+            set(SkillMention.objects.filter(application=application).values_list('skill', flat=True)), {'django', 'react'}
+        )
+        self.assertDerivedConsistent(self.user)
+
+    def test_duplicates_within_request(self):
+        result = self.bulk_create([application_data("Initech"), application_data("Initech")], 'skip')
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([error['index'] for error in result['errors']], [1])
+        self.assertDerivedConsistent(self.user)
+
+    def test_invalid_mode(self):
+        response = self.client.post(
+            '/api/applications/bulk_create/', {'items': self.items(), 'on_conflict': 'merge'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_update_and_delete(self):
+        self.bulk_create([application_data(f"Company {i}") for i in range(4)], 'error')
+        ids = list(JobApplication.objects.filter(user=self.user).order_by('id').values_list('id', flat=True))
+
+        result = self.client.post('/api/applications/bulk_update/', {'items': [
+            {'id': ids[0], 'status': 'rejected'},
+            {'id': ids[1], 'status': 'interview', 'notes': 'Uses Terraform'},
+            {'id': ids[2], 'status': 'bogus'},
+        ]}, format='json').json()
+        self.assertEqual(result['updated'], 2)
+        self.assertEqual([error['index'] for error in result['errors']], [2])
+        self.assertDerivedConsistent(self.user)
+
+        result = self.client.post('/api/applications/bulk_delete/', {'ids': ids[:2]}, format='json').json()
+        self.assertEqual(result['deleted'], 2)
+        self.assertDerivedConsistent(self.user)
+
+    def test_other_users_applications_untouched(self):
+        other = User.objects.create(username='other')
+        foreign = JobApplication.objects.create(user=other, company_name="Not mine", position="Engineer", applied_date=date.today())
+
+        result = self.client.post(
+            '/api/applications/bulk_update/', {'items': [{'id': foreign.pk, 'status': 'rejected'}]}, format='json'
+        ).json()
+        self.assertEqual(result['updated'], 0)
+        self.assertEqual([error['errors'] for error in result['errors']], [{'id': ['Not found.']}])
+        result = self.client.post('/api/applications/bulk_delete/', {'ids': [foreign.pk]}, format='json').json()
+        self.assertEqual(result['deleted'], 0)
+
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.status, 'applied')
+        self.assertDerivedConsistent(other)
+
+
+class TransferTests(DerivedDataAssertions, TestCase):
+    """Export and import (transfer.py) round trips through the API."""
+
+    APPLICATION_FIELDS = ('company_name', 'position', 'status', 'applied_date', 'job_description', 'notes', 'location')
+    NOTIFICATION_FIELDS = ('job_application__company_name', 'title', 'message', 'show_date', 'is_read', 'is_active', 'is_delivered')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = dev_user()
+        for i, status in enumerate(['applied', 'interview', 'rejected']):
+            JobApplication.objects.create(
+                user=self.user, company_name=f"Company {i}", position="Engineer", status=status,
+                applied_date=date.today() - timedelta(days=i), job_description="Python, Go and PostgreSQL",
+                notes="Line one\nLine two, with a comma", location="Remote" if i else None,
+            )
+        self.other = User.objects.create(username='other')
+        JobApplication.objects.create(user=self.other, company_name="Not mine", position="Engineer", applied_date=date.today())
+
+    def export(self, dataset, file_format):
+        response = self.client.get(f'/api/{dataset}/export/?file_format={file_format}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def import_(self, dataset, content, file_format, on_conflict='error'):
+        upload = SimpleUploadedFile(f'{dataset}.{file_format}', content)
+        response = self.client.post(
+            f'/api/{dataset}/import/', {'file': upload, 'file_format': file_format, 'on_conflict': on_conflict},
+            format='multipart',
+        )
+        self.assertIn(response.status_code, (200, 201))
+        return response.json()
+
+    def applications(self):
+        return sorted(JobApplication.objects.filter(user=self.user).values_list(*self.APPLICATION_FIELDS))
+
+    def test_application_round_trip(self):
+        for file_format in ['csv', 'ndjson']:
+            with self.subTest(file_format=file_format):
+                before = self.applications()
+                content = self.export('applications', file_format)
+                self.assertNotIn(b'Not mine', content)
+
+                JobApplication.objects.filter(user=self.user).delete()
+                result = self.import_('applications', content, file_format)
+                self.assertEqual((result['created'], result['skipped']), (3, 0))
+                self.assertEqual(self.applications(), before)
+                self.assertDerivedConsistent(self.user)
+
+    def test_import_conflicts(self):
+        content = self.export('applications', 'ndjson')
+        result = self.import_('applications', content, 'ndjson', on_conflict='skip')
+        self.assertEqual((result['created'], result['skipped']), (0, 3))
+        result = self.import_('applications', content, 'ndjson')
+        self.assertEqual(result['created'], 0)
+        self.assertEqual(len(result['errors']), 3)
+        self.assertDerivedConsistent(self.user)
+
+    def test_notification_round_trip(self):
+        application = JobApplication.objects.filter(user=self.user).first()
+        now = timezone.now()
+        Notification.objects.create(user=self.user, job_application=application, title="Due", message="m", show_date=now - timedelta(days=1))
+        Notification.objects.create(user=self.user, job_application=application, title="Scheduled", message="m", show_date=now + timedelta(days=1))
+        Notification.objects.create(
+            user=self.user, job_application=application, title="Dismissed", message="m",
+            show_date=now - timedelta(days=2), is_active=False, is_read=True,
+        )
+        Notification.objects.create(
+            user=self.other, job_application=JobApplication.objects.get(user=self.other), title="Not mine", message="m",
+            show_date=now,
+        )
+        notifications = Notification.objects.filter(user=self.user)
+        before = sorted(notifications.values_list(*self.NOTIFICATION_FIELDS))
+
+        content = self.export('notifications', 'csv')
+        self.assertNotIn(b'Not mine', content)
+        notifications.delete()
+        result = self.import_('notifications', content, 'csv')
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(sorted(notifications.values_list(*self.NOTIFICATION_FIELDS)), before)
+
+    def test_import_rejects_other_users_applications(self):
+        mine = JobApplication.objects.filter(user=self.user).first()
+        foreign = JobApplication.objects.get(user=self.other)
+        for dataset, fields in [
+            ('meeting-notes', {'content': "Call notes"}),
+            ('notifications', {'title': "Follow up", 'message': "m", 'show_date': timezone.now().isoformat()}),
+        ]:
+            with self.subTest(dataset=dataset):
+                content = '\n'.join(
+                    json.dumps(dict(fields, job_application_id=application.pk)) for application in [mine, foreign]
+                ).encode()
+                result = self.import_(dataset, content, 'ndjson')
+                self.assertEqual(result['created'], 1)
+                self.assertEqual(
+                    [error['errors'] for error in result['errors']],
+                    [{'job_application_id': ['Job application does not exist.']}],
+                )
+        self.assertFalse(MeetingNote.objects.filter(job_application=foreign).exists())
+        self.assertFalse(Notification.objects.filter(job_application=foreign).exists())
+
+
+class SchedulerTests(TestCase):
+    """Notifications become visible once the scheduler delivers them."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = dev_user()
+        self.application = JobApplication.objects.create(
+            user=self.user, company_name="Acme", position="Engineer", applied_date=date.today(),
+        )
+
+    def visible_ids(self):
+        return [row['id'] for row in self.client.get('/api/notifications/').json()]
+
+    def test_delivery(self):
+        now = timezone.now()
+        due = Notification.objects.create(
+            user=self.user, job_application=self.application, title="Due", message="m", show_date=now - timedelta(hours=1),
+        )
+        scheduled = Notification.objects.create(
+            user=self.user, job_application=self.application, title="Scheduled", message="m", show_date=now + timedelta(days=1),
+        )
+        self.assertTrue(due.is_delivered)
+        self.assertFalse(scheduled.is_delivered)
+        self.assertIsNone(scheduled.delivered_at)
+        self.assertEqual(self.visible_ids(), [due.pk])
+
+        self.assertEqual(deliver_due_notifications(now=now), 0)
+        later = now + timedelta(days=2)
+        self.assertEqual(deliver_due_notifications(now=later), 1)
+        scheduled.refresh_from_db()
+        self.assertTrue(scheduled.is_delivered)
+        self.assertEqual(scheduled.delivered_at, later)
+        self.assertEqual(sorted(self.visible_ids()), sorted([due.pk, scheduled.pk]))
+        self.assertEqual(deliver_due_notifications(now=later), 0)
+
+    def test_batches(self):
+        show_date = timezone.now() + timedelta(days=1)
+        for i in range(5):
+            Notification.objects.create(
+                user=self.user, job_application=self.application, title=f"Reminder {i}", message="m", show_date=show_date,
+            )
+        self.assertEqual(deliver_due_notifications(now=show_date, batch_size=2), 5)
+        self.assertFalse(Notification.objects.filter(is_delivered=False).exists())
+
+    def test_rescheduling(self):
+        notification = Notification.objects.create(
+            user=self.user, job_application=self.application, title="Due", message="m",
+            show_date=timezone.now() - timedelta(hours=1),
+        )
+        notification.show_date = timezone.now() + timedelta(days=1)
+        notification.save()
+        self.assertFalse(notification.is_delivered)
+        self.assertIsNone(notification.delivered_at)
+        self.assertEqual(self.visible_ids(), [])
+
+
+class NotificationStreamTests(TestCase):
+    """The event stream is served under ASGI only."""
+
+    def setUp(self):
+        self.user = dev_user()
+        application = JobApplication.objects.create(
+            user=self.user, company_name="Acme", position="Engineer", applied_date=date.today(),
+        )
+        Notification.objects.create(
+            user=self.user, job_application=application, title="Due", message="m",
+            show_date=timezone.now() - timedelta(hours=1),
+        )
+        other = User.objects.create(username='other')
+        Notification.objects.create(
+            user=other, title="Not mine", message="m", show_date=timezone.now() - timedelta(hours=1),
+            job_application=JobApplication.objects.create(
+                user=other, company_name="Initech", position="Engineer", applied_date=date.today(),
+            ),
+        )
+
+    def test_wsgi_declines(self):
+        response = self.client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(events.broker.connection_count(), 0)
+
+    async def test_asgi_streams(self):
+        response = await self.async_client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+    async def test_stream_sends_own_unread_count(self):
+        stream = events.stream_events(self.user.pk)
+        try:
+            self.assertTrue((await anext(stream)).startswith('retry: '))
+            self.assertEqual(await anext(stream), 'event: unread_count\ndata: {"unread_count": 1}\n\n')
+            self.assertEqual(events.broker.connection_count(), 1)
+        finally:
+            await stream.aclose()
+            events.broker._sync_task.cancel()
+        self.assertEqual(events.broker.connection_count(), 0)
+
+
+class NotificationBulkActionTests(TestCase):
+    """Bulk notification actions report their counts and the new unread count."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = dev_user()
+        self.first = JobApplication.objects.create(user=self.user, company_name="Acme", position="Engineer", applied_date=date.today())
+        self.second = JobApplication.objects.create(user=self.user, company_name="Globex", position="Engineer", applied_date=date.today())
+        past = timezone.now() - timedelta(hours=1)
+        self.notifications = [
+            Notification.objects.create(
+                user=self.user, job_application=application, title=f"Reminder {i}", message="m", show_date=past,
+            )
+            for application in [self.first, self.second] for i in range(3)
+        ]
+        # Not delivered yet: never touched by bulk actions
+        self.scheduled = Notification.objects.create(
+            user=self.user, job_application=self.first, title="Scheduled", message="m",
+            show_date=timezone.now() + timedelta(days=1),
+        )
+        other = User.objects.create(username='other')
+        self.foreign = Notification.objects.create(
+            user=other, title="Not mine", message="m", show_date=past,
+            job_application=JobApplication.objects.create(
+                user=other, company_name="Initech", position="Engineer", applied_date=date.today(),
+            ),
+        )
+
+    def post(self, action, body):
+        return self.client.post(f'/api/notifications/{action}/', body, format='json')
+
+    def test_mark_all_read(self):
+        ids = [n.pk for n in self.notifications[:2]]
+        response = self.post('mark_all_read', {'ids': ids})
+        self.assertEqual(response.json(), {'updated': 2, 'unread_count': 4})
+        # Already read notifications are not counted again
+        response = self.post('mark_all_read', {'ids': ids})
+        self.assertEqual(response.json(), {'updated': 0, 'unread_count': 4})
+        response = self.post('mark_all_read', {})
+        self.assertEqual(response.json(), {'updated': 4, 'unread_count': 0})
+        self.scheduled.refresh_from_db()
+        self.assertFalse(self.scheduled.is_read)
+
+    def test_bulk_dismiss(self):
+        response = self.post('bulk_dismiss', {'job_application': self.first.pk})
+        self.assertEqual(response.json(), {'dismissed': 3, 'unread_count': 3})
+        self.assertEqual(self.client.get('/api/notifications/unread_count/').json(), {'unread_count': 3})
+        response = self.post('bulk_dismiss', {'is_read': False, 'ids': [self.notifications[3].pk]})
+        self.assertEqual(response.json(), {'dismissed': 1, 'unread_count': 2})
+        self.assertTrue(Notification.objects.get(pk=self.scheduled.pk).is_active)
+
+    def test_bulk_delete(self):
+        response = self.post('bulk_delete', {})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Notification.objects.count(), 8)
+
+        response = self.post('bulk_delete', {'ids': [self.notifications[0].pk]})
+        self.assertEqual(response.json(), {'deleted': 1, 'unread_count': 5})
+        response = self.post('bulk_delete', {'all': True})
+        self.assertEqual(response.json(), {'deleted': 5, 'unread_count': 0})
+        self.assertEqual(
+            sorted(Notification.objects.values_list('pk', flat=True)), sorted([self.scheduled.pk, self.foreign.pk]),
+        )
+
+    def test_other_users_untouched(self):
+        self.assertEqual(self.client.get('/api/notifications/unread_count/').json(), {'unread_count': 6})
+        self.assertNotIn(self.foreign.pk, [row['id'] for row in self.client.get('/api/notifications/').json()])
+        # Naming another user's notification selects nothing
+        self.assertEqual(self.post('mark_all_read', {'ids': [self.foreign.pk]}).json(), {'updated': 0, 'unread_count': 6})
+        self.assertEqual(self.post('mark_all_read', {}).json()['updated'], 6)
+        self.assertEqual(self.post('bulk_dismiss', {'ids': [self.foreign.pk]}).json()['dismissed'], 0)
+        self.assertEqual(self.post('bulk_delete', {'all': True}).json()['deleted'], 6)
+        self.assertEqual(self.client.post(f'/api/notifications/{self.foreign.pk}/mark_read/').status_code, 404)
+
+        self.foreign.refresh_from_db()
+        self.assertEqual((self.foreign.is_read, self.foreign.is_active), (False, True))
+
+
+class TfIdfTests(TestCase):
+    """TF-IDF scoring (matching.py) on small known inputs."""
+
+    def setUp(self):
+        self.frequencies = DocumentFrequencies.from_documents(
+            [description_terms(text)[0] for text in ["Python Django", "Python React"]]
+        )
+
+    def vector(self, text):
+        return TermVector.from_counts(Counter(tokenize(text)), self.frequencies)
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Experience with C++, C# and Node.js in a team"),
+            ['c++', 'c#', 'node.js', 'team'],
+        )
+
+    def test_idf(self):
+        ids = np.array([term_id('python'), term_id('django'), term_id('unseen')])
+        idf = self.frequencies.idf(ids)
+        # ln((1 + N) / (1 + df)) + 1 with N = 2
+        self.assertAlmostEqual(idf[0], 1.0)
+        self.assertAlmostEqual(idf[1], math.log(1.5) + 1)
+        self.assertAlmostEqual(idf[2], math.log(3) + 1)
+
+    def test_known_pair(self):
+        # Both vectors are (1, d) / sqrt(1 + d^2) and share only python
+        d = math.log(1.5) + 1
+        result = score_vectors(self.vector("Python Django"), self.vector("Python React"))
+        self.assertAlmostEqual(result['score'], 1 / (1 + d * d), places=4)
+        self.assertEqual([term['term'] for term in result['top_terms']], ['python'])
+
+    def test_bounds(self):
+        self.assertEqual(score_vectors(self.vector("Python Django"), self.vector("python django"))['score'], 1.0)
+        self.assertEqual(score_vectors(self.vector("Django"), self.vector("React"))['score'], 0)
+        self.assertEqual(score_vectors(self.vector(""), self.vector("Python")), {'score': 0, 'top_terms': []})
+
+    def test_document_frequency_updates(self):
+        django_terms = description_terms("Python Django")[0]
+        self.frequencies.update(added=[description_terms("Go")[0]], removed=[django_terms])
+        expected = DocumentFrequencies.from_documents(
+            [description_terms(text)[0] for text in ["Python React", "Go"]]
+        )
+        self.assertEqual(self.frequencies.documents, 2)
+        np.testing.assert_array_equal(self.frequencies.term_ids, expected.term_ids)
+        np.testing.assert_array_equal(self.frequencies.counts, expected.counts)
+
+
+class MatchTests(TestCase):
+    """Resume match scoring (matching.py) through the match action."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.application = JobApplication.objects.create(
+            user=dev_user(), company_name="Acme", position="Engineer", applied_date=date.today(),
+            job_description="Python and Django developer",
+        )
+        self.url = f'/api/applications/{self.application.pk}/match/'
+
+    def test_post_scores_given_description(self):
+        response = self.client.post(self.url, {'job_description': 'Rust engineer'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('score', response.json())
+
+    def test_post_rejects_non_string_description(self):
+        for value in [123, ['python'], {'text': 'python'}, None]:
+            response = self.client.post(self.url, {'job_description': value}, format='json')
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn('job_description', response.json())
+
+
+class ResumeETagTests(TestCase):
+    """Conditional requests for the rendered resume (generate, generate_fresh)."""
+
+    url = '/api/resume-template/generate/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.experience = Experience.objects.create(
+            company="Acme", position="Engineer", start_date=date(2020, 1, 1), is_current=True,
+            description="Built things",
+        )
+
+    def test_revalidation_returns_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Acme", first.json()['markdown'])
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_editing_experience_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(
+            f'/api/experiences/{self.experience.pk}/', {'company': "Globex", 'is_current': True}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn("Globex", response.json()['markdown'])
+
+    def test_outputs_have_distinct_etags(self):
+        etags = {
+            output: self.client.get(f'{self.url}?output={output}')['ETag'] for output in ['markdown', 'html', 'text']
+        }
+        self.assertEqual(len(set(etags.values())), 3)
+        response = self.client.get(f'{self.url}?output=html', HTTP_IF_NONE_MATCH=etags['markdown'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(f'{self.url}?output=pdf').status_code, 400)
+
+
+@skipUnless(connection.vendor == 'sqlite', "Query plans are checked on SQLite")
+class HotQueryPlanTests(TestCase):
+    """The views' queries use an index instead of scanning or sorting the table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='planner')
+        today = date.today()
+        for i in range(20):
+            application = JobApplication.objects.create(
+                user=user, company_name=f"Company {i}", position="Engineer",
+                status=['applied', 'interview', 'rejected'][i % 3], applied_date=today - timedelta(days=i),
+            )
+            MeetingNote.objects.create(job_application=application, content=f"Call {i}")
+            Notification.objects.create(
+                user=user, job_application=application, title=f"Follow up {i}", message="Check in",
+                show_date=timezone.now() + timedelta(days=i - 10),
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def query_plans(self, url):
+        """Call url and return (sql, plan) of its SELECTs on INDEXED_TABLES."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+
+        plans = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            tables = set(re.findall(r'FROM "(\w+)"', sql))
+            if not sql.startswith('SELECT') or not tables & INDEXED_TABLES:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        self.assertTrue(plans, f"{url} ran no queries on the indexed tables")
+        return plans
+
+    def assertIndexed(self, url):
+        for sql, plan in self.query_plans(url):
+            for step in plan:
+                table_scan = step.startswith('SCAN ') and 'INDEX' not in step
+                self.assertFalse(table_scan, f"Full table scan for {url}:\n{sql}\n{plan}")
+                # Rows matched by several keys (prefetch IN lists) are merged by a sort
+                if ' IN (' not in sql:
+                    self.assertNotIn('TEMP B-TREE', step, f"Unindexed sort for {url}:\n{sql}\n{plan}")
+
+    def test_application_pages(self):
+        self.assertIndexed('/api/applications/')
+        next_page = self.client.get('/api/applications/?page_size=5').json()['next']
+        self.assertIndexed(next_page)
+
+    def test_application_detail(self):
+        application = JobApplication.objects.first()
+        self.assertIndexed(f'/api/applications/{application.pk}/')
+
+    def test_recent_applications(self):
+        self.assertIndexed('/api/applications/recent/')
+
+    def test_aggregate_stats(self):
+        self.assertIndexed('/api/applications/stats/?source=aggregate')
+
+    def test_notifications(self):
+        self.assertIndexed('/api/notifications/')
+
+    def test_unread_count(self):
+        self.assertIndexed('/api/notifications/unread_count/')
@@ -0,0 +1,392 @@
+"""
+Job Tracker Export and Import
+
+This module streams job applications, meeting notes and notifications out
+as CSV or NDJSON and reads them back in.
+
+Exports read rows with values_list().iterator() in fixed-size chunks and
+yield encoded text in buffered pieces, so memory use does not grow with
+the number of rows. Imports parse the input line by line and insert rows
+with bulk_create in bounded batches, each in its own transaction.
+
+Columns id, created_at and updated_at are exported for reference but are
+ignored on import: rows always get new ids and timestamps. Meeting notes
+and notifications refer to existing applications by job_application_id.
+"""
+
+import csv
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import analytics, bulk, search, signals
+from .models import JobApplication, MeetingNote, Notification
+
+
+# Rows fetched from the database per chunk while exporting
+EXPORT_CHUNK_SIZE = 2000
+
+# Approximate number of characters buffered before a piece is yielded
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+# Rows parsed and inserted per transaction while importing
+IMPORT_BATCH_SIZE = 500
+
+# Import errors reported back in full; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+FORMAT_CSV = 'csv'
+FORMAT_NDJSON = 'ndjson'
+FORMATS = [FORMAT_CSV, FORMAT_NDJSON]
+
+CONTENT_TYPES = {
+    FORMAT_CSV: 'text/csv; charset=utf-8',
+    FORMAT_NDJSON: 'application/x-ndjson',
+}
+
+# Columns written per dataset, in export order
+DATASETS = {
+    'applications': {
+        'model': JobApplication,
+        'fields': [
+            'id', 'company_name', 'position', 'job_url', 'job_description', 'status', 'applied_date',
+            'interview_date', 'rejected_date', 'accepted_date', 'withdrawn_date',
+            'notes', 'meeting_minutes', 'salary_range', 'location', 'created_at', 'updated_at',
+        ],
+    },
+    'meeting-notes': {
+        'model': MeetingNote,
+        'fields': ['id', 'job_application', 'content', 'created_at', 'updated_at'],
+    },
+    'notifications': {
+        'model': Notification,
+        'fields': [
+            'id', 'job_application', 'title', 'message', 'show_date',
+            'is_read', 'is_active', 'created_at', 'updated_at',
+        ],
+    },
+}
+
+# Columns that are never read back on import
+IGNORED_ON_IMPORT = {'id', 'created_at', 'updated_at'}
+
+
+def get_dataset(name):
+    """Return the dataset definition for name, raising ValueError for unknown datasets."""
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown dataset '{name}'. Choose from: {', '.join(DATASETS)}.")
+
+
+def _fields(dataset):
+    """Return the model fields of a dataset, in column order."""
+    model = dataset['model']
+    return [model._meta.get_field(name) for name in dataset['fields']]
+
+
+def column_names(dataset):
+    """Return the column headers of a dataset (foreign keys use their *_id name)."""
+    return [field.attname for field in _fields(dataset)]
+
+
+def _export_value(value):
+    """Convert a database value to its text form (ISO 8601 for dates)."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _buffered(pieces):
+    """Join small text pieces into chunks of roughly EXPORT_BUFFER_SIZE characters."""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= EXPORT_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+class _LineBuffer:
+    """File-like object whose write() returns the written text, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(columns, rows):
+    """Yield the CSV header followed by one line per row."""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(['' if value is None else _export_value(value) for value in row])
+
+
+def _ndjson_lines(columns, rows):
+    """Yield one JSON object per row."""
+    for row in rows:
+        yield json.dumps(dict(zip(columns, map(_export_value, row))), ensure_ascii=False) + '\n'
+
+
+def export_rows(dataset_name, queryset=None, file_format=FORMAT_CSV, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream a dataset as CSV or NDJSON text.
+
+    Args:
+        dataset_name: Key of DATASETS to export
+        queryset: Rows to export (defaults to every row of the dataset's model)
+        file_format: 'csv' or 'ndjson'
+        chunk_size: Rows fetched from the database per chunk
+
+    Returns:
+        generator: Text chunks suitable for StreamingHttpResponse or a file
+    """
+    dataset = get_dataset(dataset_name)
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}'. Choose from: {', '.join(FORMATS)}.")
+    if queryset is None:
+        queryset = dataset['model'].objects.all()
+
+    columns = column_names(dataset)
+    rows = queryset.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+    lines = _csv_lines(columns, rows) if file_format == FORMAT_CSV else _ndjson_lines(columns, rows)
+    return _buffered(lines)
+
+
+def _parse_records(lines, file_format):
+    """
+    Yield (line_number, record) pairs from CSV or NDJSON text lines.
+
+    Records that cannot be parsed are yielded as (line_number, ValidationError).
+    """
+    if file_format == FORMAT_CSV:
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValidationError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValidationError("Expected a JSON object.")
+            continue
+        yield line_number, record
+
+
+def _clean_record(fields, record):
+    """
+    Convert one parsed record into model field values.
+
+    Empty CSV cells become None for nullable fields. Foreign keys are only
+    converted to ids here; their existence is checked per batch.
+
+    Raises:
+        ValidationError: With a message dict keyed by column name
+    """
+    values = {}
+    errors = {}
+    for field in fields:
+        if field.name in IGNORED_ON_IMPORT:
+            continue
+        if field.attname not in record:
+            if not (field.blank or field.null or field.has_default()):
+                errors[field.attname] = ["This field is required."]
+            continue
+        value = record[field.attname]
+        if value == '' and field.null:
+            value = None
+        try:
+            if field.is_relation:
+                value = field.target_field.to_python(value)
+                if value is None:
+                    raise ValidationError("This field is required.")
+            else:
+                value = field.clean(value, None)
+                if isinstance(value, datetime) and timezone.is_naive(value):
+                    value = timezone.make_aware(value)
+        except ValidationError as e:
+            errors[field.attname] = e.messages
+            continue
+        values[field.attname] = value
+    if errors:
+        raise ValidationError(errors)
+    return values
+
+
+class ImportResult:
+    """Counts and per-line errors of one import."""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'error_count': self.error_count,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+        }
+
+
+def _error_detail(error):
+    """Return a ValidationError as a {column: [messages]} dict."""
+    return error.message_dict if hasattr(error, 'error_dict') else {'non_field_errors': error.messages}
+
+
+def _import_applications(user, batch, result, skip_existing):
+    keys = {(values.get('company_name'), values.get('position')) for _line, values in batch}
+    existing = bulk._existing_by_key(user.pk, keys)
+    to_create = []
+    seen = set()
+    for line, values in batch:
+        key = (values.get('company_name'), values.get('position'))
+        if key in existing or key in seen:
+            if skip_existing:
+                result.skipped += 1
+            else:
+                result.add_error(line, {'non_field_errors': [
+                    'An application for this company and position already exists.'
+                ]})
+            continue
+        seen.add(key)
+        to_create.append(JobApplication(user=user, **values))
+
+    with transaction.atomic(), signals.suspended():
+        created = bulk.insert_applications(user, to_create)
+    if created:
+        analytics.invalidate_funnel(user.pk)
+    return len(created)
+
+
+def _existing_application_ids(user, batch):
+    """Return the job_application_ids referenced by a batch that exist and belong to user."""
+    ids = {values['job_application_id'] for _line, values in batch if 'job_application_id' in values}
+    return set(JobApplication.objects.filter(user=user, pk__in=ids).values_list('pk', flat=True))
+
+
+def _import_meeting_notes(user, batch, result, skip_existing):
+    application_ids = _existing_application_ids(user, batch)
+    notes = []
+    for line, values in batch:
+        if values.get('job_application_id') not in application_ids:
+            result.add_error(line, {'job_application_id': ['Job application does not exist.']})
+            continue
+        notes.append(MeetingNote(**values))
+
+    with transaction.atomic():
+        created = MeetingNote.objects.bulk_create(notes, batch_size=bulk.BATCH_SIZE)
+        # bulk_create sends no post_save, so refresh the search index here
+        search.index_applications(
+            JobApplication.objects.filter(pk__in={note.job_application_id for note in created})
+        )
+    return len(created)
+
+
+def _import_notifications(user, batch, result, skip_existing):
+    application_ids = _existing_application_ids(user, batch)
+    existing = set(
+        Notification.objects.filter(user=user, job_application_id__in=application_ids)
+        .values_list('job_application_id', 'title')
+    )
+    notifications = []
+    for line, values in batch:
+        if values.get('job_application_id') not in application_ids:
+            result.add_error(line, {'job_application_id': ['Job application does not exist.']})
+            continue
+        key = (values['job_application_id'], values.get('title'))
+        if key in existing:
+            if skip_existing:
+                result.skipped += 1
+            else:
+                result.add_error(line, {'non_field_errors': [
+                    'A notification with this title already exists for this application.'
+                ]})
+            continue
+        existing.add(key)
+        notifications.append(Notification(user=user, **values))
+
+    # bulk_create skips Notification.save(), so deliver due notifications here
+    now = timezone.now()
+    for notification in notifications:
+        if notification.show_date <= now:
+            notification.is_delivered = True
+            notification.delivered_at = now
+
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications, batch_size=bulk.BATCH_SIZE)
+    return len(created)
+
+
+IMPORTERS = {
+    'applications': _import_applications,
+    'meeting-notes': _import_meeting_notes,
+    'notifications': _import_notifications,
+}
+
+
+def import_rows(dataset_name, lines, user, file_format=FORMAT_CSV, skip_existing=False,
+                batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import a dataset from CSV or NDJSON text lines.
+
+    Records are validated one at a time and inserted in batches of
+    batch_size, each batch in its own transaction, so at most one batch is
+    held in memory. Invalid records are reported and skipped.
+
+    Args:
+        dataset_name: Key of DATASETS to import
+        lines: Iterable of text lines (an open file or decoded upload)
+        user: Owner of imported applications and notifications
+        file_format: 'csv' or 'ndjson'
+        skip_existing: Skip rows that conflict with existing ones instead of
+            reporting them as errors
+        batch_size: Rows inserted per transaction
+
+    Returns:
+        dict: created/skipped counts, the error count and the first errors
+    """
+    dataset = get_dataset(dataset_name)
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}'. Choose from: {', '.join(FORMATS)}.")
+    fields = _fields(dataset)
+    importer = IMPORTERS[dataset_name]
+    result = ImportResult()
+
+    batch = []
+    for line, record in _parse_records(lines, file_format):
+        if isinstance(record, ValidationError):
+            result.add_error(line, _error_detail(record))
+            continue
+        try:
+            batch.append((line, _clean_record(fields, record)))
+        except ValidationError as e:
+            result.add_error(line, _error_detail(e))
+            continue
+        if len(batch) >= batch_size:
+            result.created += importer(user, batch, result, skip_existing)
+            batch = []
+    if batch:
+        result.created += importer(user, batch, result, skip_existing)
+    return result.as_dict()
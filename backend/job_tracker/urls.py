@@ -10,7 +10,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     JobApplicationViewSet, ResumeTemplateViewSet, MeetingNoteViewSet, UserViewSet,
-    ExperienceViewSet, ProjectViewSet, EducationViewSet, NotificationViewSet
+    ExperienceViewSet, ProjectViewSet, EducationViewSet, NotificationViewSet, notification_stream
 )
 
 
@@ -31,6 +31,8 @@ router.register(r'educations', EducationViewSet, basename='education')
 
 # URL patterns for the job tracker app
 urlpatterns = [
+    # Server-Sent Events stream (before the router, which would treat "stream" as a notification id)
+    path('notifications/stream/', notification_stream, name='notification-stream'),
     # Include all router-generated URLs
     path('', include(router.urls)),
 ]
@@ -5,23 +5,135 @@ This module contains Django REST Framework views for the job tracker API.
 Views handle HTTP requests and return appropriate responses for job applications and resumes.
 """
 
+import codecs
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
 
 from rest_framework import viewsets, permissions, status, views, serializers
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from .models import JobApplication, ResumeTemplate, Experience, Project, Education, MeetingNote, Notification
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from datetime import timedelta
+from . import bulk, events, transfer
+from .analytics import application_timeline, get_funnel, time_in_stage
+from .matching import match_application, rank_applications
+from .pagination import ApplicationCursorPagination
+from .resume import RENDERERS, get_rendered_resume
+from .search import search_applications
+from .skills import skill_gaps
+from .signals import notifications_changed
+from .stats import aggregate_status_counts, counter_status_counts
 from .serializers import (
     ResumeTemplateSerializer, JobApplicationListSerializer, JobApplicationDetailSerializer, UserSerializer,
-    ResumeTemplateCreateSerializer, ExperienceSerializer, ProjectSerializer, EducationSerializer, MeetingNoteSerializer, NotificationSerializer
+    ResumeTemplateCreateSerializer, ExperienceSerializer, ProjectSerializer, EducationSerializer, MeetingNoteSerializer, NotificationSerializer,
+    NotificationBulkSelectionSerializer, MatchRequestSerializer
 )
 
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+def request_user(request):
+    """
+    Return the user a request acts for.
+    
+    Endpoints that read or write per-user data (analytics, search, imports,
+    exports, bulk writes) are scoped to this user. While the API allows
+    unauthenticated access for development, anonymous requests act for the
+    default development user (matching JobApplicationListSerializer.create).
+    
+    Args:
+        request: DRF request
+    
+    Returns:
+        User: The authenticated user, or the default development user
+    """
+    user = request.user
+    if not user.is_authenticated:
+        user, created = User.objects.get_or_create(
+            username='halalkingxi',
+            defaults={'email': 'rik@ualberta.ca', 'first_name': 'Rik', 'last_name': 'Mukherji'}
+        )
+    return user
+
+
+class TransferMixin:
+    """
+    Adds streaming export and import actions to a ViewSet.
+    
+    Subclasses set transfer_dataset to a key of transfer.DATASETS and
+    transfer_owner_field to the lookup of the rows' owner. Exports contain
+    the requesting user's rows only; imports are assigned to that user.
+    """
+    transfer_dataset = None
+    transfer_owner_field = 'user'
+
+    def get_export_queryset(self):
+        """Return the rows written by the export action: the requesting user's (see request_user)."""
+        return self.get_queryset().filter(**{self.transfer_owner_field: request_user(self.request)})
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Custom action to stream every row as CSV or NDJSON.
+        
+        Query params: file_format=csv (default) or ndjson. Rows are read in
+        chunks and written as they are read, so memory use stays constant.
+        
+        Returns:
+            StreamingHttpResponse: Attachment with the exported rows
+        """
+        file_format = request.query_params.get('file_format', transfer.FORMAT_CSV)
+        if file_format not in transfer.FORMATS:
+            raise serializers.ValidationError({'file_format': [f"Must be one of: {', '.join(transfer.FORMATS)}."]})
+        
+        chunks = transfer.export_rows(self.transfer_dataset, self.get_export_queryset(), file_format)
+        response = StreamingHttpResponse(chunks, content_type=transfer.CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{self.transfer_dataset}.{file_format}"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_rows(self, request):
+        """
+        Custom action to import rows from an uploaded CSV or NDJSON file.
+        
+        Form fields: file (required), file_format (csv or ndjson; inferred
+        from the file name when omitted), on_conflict (error or skip).
+        
+        Returns:
+            Response: JSON response with created/skipped counts and per-line errors
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise serializers.ValidationError({'file': ['No file was submitted.']})
+        file_format = request.data.get('file_format')
+        if not file_format:
+            file_format = transfer.FORMAT_NDJSON if upload.name.endswith(('.ndjson', '.jsonl')) else transfer.FORMAT_CSV
+        if file_format not in transfer.FORMATS:
+            raise serializers.ValidationError({'file_format': [f"Must be one of: {', '.join(transfer.FORMATS)}."]})
+        on_conflict = request.data.get('on_conflict', bulk.CONFLICT_ERROR)
+        if on_conflict not in [bulk.CONFLICT_ERROR, bulk.CONFLICT_SKIP]:
+            raise serializers.ValidationError({'on_conflict': ['Must be one of: error, skip.']})
+        
+        try:
+            result = transfer.import_rows(
+                self.transfer_dataset,
+                codecs.iterdecode(upload, 'utf-8-sig'),
+                request_user(request),
+                file_format=file_format,
+                skip_existing=on_conflict == bulk.CONFLICT_SKIP,
+            )
+        except UnicodeDecodeError:
+            raise serializers.ValidationError({'file': ['File must be UTF-8 encoded.']})
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
+
+
+class JobApplicationViewSet(TransferMixin, viewsets.ModelViewSet):
     """
     ViewSet for JobApplication model.
     
@@ -30,7 +142,8 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
     """
     # Replace with IsAuthenticated later
     permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
-    pagination_class = None
+    pagination_class = ApplicationCursorPagination
+    transfer_dataset = 'applications'
 
     def get_serializer_class(self):
         if self.action in ['retrieve', 'update', 'partial_update']:
@@ -41,32 +154,255 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
         """
         Return only job applications belonging to the current user.
         
+        Meeting notes are prefetched in one batched query so serializing
+        the nested meetingnote_set does not cost a query per application.
+        
         Returns:
             QuerySet: Filtered queryset of job applications
         """
         # TODO: Change this to return only the applications for the current user
         # return JobApplication.objects.filter(user=self.request.user)
-        return JobApplication.objects.all()
+        return JobApplication.objects.prefetch_related('meetingnote_set')
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """
         Custom action to get application statistics for the current user.
         
+        Counts cover the requesting user's applications (see request_user)
+        and are served from the materialized ApplicationStats counters by
+        default. Pass ?source=aggregate to compute them from the applications
+        table instead (a single conditional-aggregation query).
+        
         Returns:
             Response: JSON response with application statistics
         """
-        queryset = self.get_queryset()
-        stats = {
-            'total': queryset.count(),
-            'applied': queryset.filter(status='applied').count(),
-            'interview': queryset.filter(status='interview').count(),
-            'rejected': queryset.filter(status='rejected').count(),
-            'accepted': queryset.filter(status='accepted').count(),
-            'withdrawn': queryset.filter(status='withdrawn').count(),
-        }
+        source = request.query_params.get('source', 'counters')
+        user = request_user(request)
+        if source == 'aggregate':
+            stats = aggregate_status_counts(self.get_queryset().filter(user=user))
+        elif source == 'counters':
+            stats = counter_status_counts(user)
+        else:
+            return Response(
+                {'detail': "source must be 'counters' or 'aggregate'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         return Response(stats)
     
+    @action(detail=False, methods=['get'])
+    def funnel(self, request):
+        """
+        Custom action to get the application funnel as Sankey nodes and links.
+        
+        The flow counts cover the requesting user's applications (see
+        request_user), or only those currently in one status with
+        ?status=<status>; they are computed in the database and cached until
+        one of those applications changes.
+        
+        Returns:
+            Response: JSON response with 'nodes' and 'links'
+        """
+        status_filter = request.query_params.get('status') or None
+        if status_filter is not None and status_filter not in dict(JobApplication.STATUS_CHOICES):
+            return Response(
+                {'detail': f"Unknown status '{status_filter}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        user = request_user(request)
+        return Response(get_funnel(self.get_queryset().filter(user=user), user_id=user.pk, status=status_filter))
+    
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Custom action to get the status transition log of one application.
+        
+        Returns:
+            Response: JSON response with the ordered transitions
+        """
+        application = self.get_object()
+        return Response({
+            'id': application.id,
+            'applied_date': application.applied_date,
+            'transitions': application_timeline(application),
+        })
+    
+    @action(detail=True, methods=['get', 'post'])
+    def match(self, request, pk=None):
+        """
+        Custom action to score the resume against the application's job description.
+        
+        GET scores the saved job_description; POST scores a job_description
+        given in the request body instead, without saving it.
+        
+        Returns:
+            Response: JSON response with 'score' (0 to 1) and 'top_terms'
+        """
+        application = self.get_object()
+        job_description = None
+        if request.method == 'POST':
+            serializer = MatchRequestSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            job_description = serializer.validated_data.get('job_description')
+        try:
+            return Response(match_application(application, job_description))
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def rank(self, request):
+        """
+        Custom action to rank all applications by how well the resume matches them.
+        
+        Only the requesting user's applications are ranked (see request_user);
+        those without a job description are left out. Pass ?limit=N to
+        return only the best N.
+        
+        Returns:
+            Response: JSON response with 'results', best match first
+        """
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if limit < 1:
+                return Response({'detail': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': rank_applications(request_user(request).pk, limit)})
+    
+    @action(detail=False, methods=['get'])
+    def skill_gaps(self, request):
+        """
+        Custom action to list the skills applications ask for that the resume lacks.
+        
+        Skills are counted from the skill index over the requesting user's
+        job descriptions and notes (see request_user). Pass ?limit=N to
+        change how many missing skills are returned.
+        
+        Returns:
+            Response: JSON response with 'missing', 'matched' and 'resume_skills'
+        """
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'detail': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(skill_gaps(request_user(request).pk, limit))
+    
+    @action(detail=False, methods=['get'])
+    def stage_durations(self, request):
+        """
+        Custom action to get how long the requesting user's applications
+        spend in each status (see request_user).
+        
+        Returns:
+            Response: JSON response keyed by status
+        """
+        return Response(time_in_stage(self.get_queryset().filter(user=request_user(request))))
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Custom action to full-text search applications and their meeting notes.
+        
+        Only the requesting user's applications are searched (see request_user).
+        
+        Query parameters:
+            q: Search text; every word must match and the last word may be a prefix
+            page: 1-based page number (default 1)
+            page_size: Hits per page (default 20, max 100)
+        
+        Returns:
+            Response: JSON response with ranked hits and highlighted snippets
+        """
+        query = request.query_params.get('q', '')
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+        except (ValueError, TypeError):
+            page = 1
+        try:
+            page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+        except (ValueError, TypeError):
+            page_size = 20
+        
+        total, hits = search_applications(
+            query, offset=(page - 1) * page_size, limit=page_size, user_id=request_user(request).pk
+        )
+        
+        results = []
+        for hit in hits:
+            results.append({
+                'score': hit['score'],
+                'snippets': hit['snippets'],
+                'application': self.get_serializer(hit['application']).data,
+            })
+        return Response({
+            'query': query.strip(),
+            'count': total,
+            'page': page,
+            'page_size': page_size,
+            'results': results,
+        })
+    
+    def _bulk_items(self, request, key):
+        """Read the list of bulk items from either a bare JSON array or {key: [...]}."""
+        items = request.data if isinstance(request.data, list) else request.data.get(key)
+        if not isinstance(items, list):
+            raise serializers.ValidationError({key: ['Expected a list.']})
+        return items
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        Custom action to create many applications in one request.
+        
+        Body: {"items": [...], "on_conflict": "error" | "skip" | "upsert"}
+        (a bare JSON array is accepted as items with on_conflict=error).
+        Conflicts are applications with the same company_name and position.
+        
+        Returns:
+            Response: JSON response with created/updated/skipped counts and per-item errors
+        """
+        items = self._bulk_items(request, 'items')
+        on_conflict = bulk.CONFLICT_ERROR
+        if not isinstance(request.data, list):
+            on_conflict = request.data.get('on_conflict', bulk.CONFLICT_ERROR)
+        if on_conflict not in bulk.CONFLICT_MODES:
+            raise serializers.ValidationError({'on_conflict': [f"Must be one of: {', '.join(bulk.CONFLICT_MODES)}."]})
+        
+        result = bulk.bulk_create_applications(request_user(request), items, on_conflict=on_conflict)
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk_update(self, request):
+        """
+        Custom action to partially update many applications in one request.
+        
+        Body: {"items": [{"id": 1, "status": "rejected"}, ...]}
+        
+        Returns:
+            Response: JSON response with the updated count and per-item errors
+        """
+        items = self._bulk_items(request, 'items')
+        return Response(bulk.bulk_update_applications(self.get_queryset().filter(user=request_user(request)), items))
+
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """
+        Custom action to delete many applications in one request.
+        
+        Body: {"ids": [1, 2, 3]}
+        
+        Returns:
+            Response: JSON response with the deleted count
+        """
+        ids = self._bulk_items(request, 'ids')
+        if not all(isinstance(pk, int) for pk in ids):
+            raise serializers.ValidationError({'ids': ['Expected a list of integers.']})
+        return Response(bulk.bulk_delete_applications(self.get_queryset().filter(user=request_user(request)), ids))
+
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """
@@ -128,57 +464,54 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
             except Exception as e:
                 print(f"DEBUG: Error creating notification: {e}")
 
+    def _status_event_time(self, request, validated_data):
+        """
+        Return when a status change happened.
+        
+        Prefers the client-provided timestamp (the user's local time) and
+        falls back to the server time.
+        """
+        event_dt = validated_data.pop('client_event_timestamp', None)
+        if event_dt is None:
+            from django.utils.dateparse import parse_datetime
+            client_ts_str = request.data.get('client_timestamp')
+            event_dt = parse_datetime(client_ts_str) if client_ts_str else None
+        if event_dt is None:
+            return timezone.now()
+        if timezone.is_naive(event_dt):
+            event_dt = timezone.make_aware(event_dt, timezone.get_current_timezone())
+        return event_dt
+
     def update(self, request, *args, **kwargs):
         """
         Override update method to track status changes with timestamps and trigger notifications.
+        
+        The row change is written with a single UPDATE, and the status change
+        is appended to the StatusTransition log in the same transaction.
         """
+        partial = kwargs.pop('partial', False)
         instance = self.get_object()
         old_status = instance.status
-        new_status = request.data.get('status', old_status)
         
-        print(f"DEBUG: Updating job application {instance.id} from status '{old_status}' to '{new_status}'")
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        event_dt = self._status_event_time(request, serializer.validated_data)
+        new_status = serializer.validated_data.get('status', old_status)
         
-        # Track status change timestamps
+        extra_fields = {}
         if old_status != new_status:
-            # Prefer client-provided timestamp (user's local time) if available; fallback to server time
-            from django.utils.dateparse import parse_datetime
-            client_ts_str = request.data.get('client_event_timestamp') or request.data.get('client_timestamp')
-            event_dt = timezone.now()
-            if client_ts_str:
-                parsed = parse_datetime(client_ts_str)
-                if parsed:
-                    if timezone.is_naive(parsed):
-                        parsed = timezone.make_aware(parsed, timezone.get_current_timezone())
-                    event_dt = parsed
-            
-            # Set the appropriate datetime field based on the new status
-            if new_status == 'interview' and not instance.interview_date:
-                instance.interview_date = event_dt
-                print(f"DEBUG: Set interview_date to {event_dt}")
-            elif new_status == 'rejected' and not instance.rejected_date:
-                instance.rejected_date = event_dt
-                print(f"DEBUG: Set rejected_date to {event_dt}")
-            elif new_status == 'accepted' and not instance.accepted_date:
-                instance.accepted_date = event_dt
-                print(f"DEBUG: Set accepted_date to {event_dt}")
-            elif new_status == 'withdrawn' and not instance.withdrawn_date:
-                instance.withdrawn_date = event_dt
-                print(f"DEBUG: Set withdrawn_date to {event_dt}")
-            
-            # Save the instance with the new datetime field
-            instance.save()
-        
-        # Call the parent update method
-        response = super().update(request, *args, **kwargs)
-        
-        # Refresh the instance to get the updated status
-        instance.refresh_from_db()
-        final_status = instance.status
+            # Keep the legacy per-status date column filled on the first visit to a status
+            date_field = JobApplication.STATUS_DATE_FIELDS.get(new_status)
+            if date_field and not getattr(instance, date_field):
+                extra_fields[date_field] = event_dt
+            # Picked up by the post_save receiver that appends the transition
+            instance._transition_at = event_dt
         
-        print(f"DEBUG: Final status after update: '{final_status}'")
+        with transaction.atomic():
+            serializer.save(**extra_fields)
         
         # Check if status changed from 'applied' to 'interview'
-        if old_status == 'applied' and final_status == 'interview':
+        if old_status == 'applied' and new_status == 'interview':
             print("DEBUG: Creating notifications for status change to interview")
             
             # Create immediate notification (show now)
@@ -200,9 +533,9 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
             )
             print("DEBUG: Created future notification")
         else:
-            print(f"DEBUG: No notification needed - status change from '{old_status}' to '{final_status}'")
+            print(f"DEBUG: No notification needed - status change from '{old_status}' to '{new_status}'")
         
-        return response
+        return Response(serializer.data)
 
 
 
@@ -332,148 +665,49 @@ class ResumeTemplateViewSet(viewsets.ModelViewSet):
             status=status.HTTP_404_NOT_FOUND
         )
     
+    def _rendered_response(self, request, fresh):
+        """
+        Return the rendered resume, or 304 Not Modified when the client's copy is current.
+        
+        The output format is chosen with ?output=markdown|html|text and the
+        content is returned under that key. Renders are cached per content
+        version (see resume.py) and carry a strong ETag; clients revalidate
+        with If-None-Match.
+        """
+        output = request.query_params.get('output', 'markdown')
+        if output not in RENDERERS:
+            return Response(
+                {'error': f"Unknown output '{output}'. Choose from: {', '.join(RENDERERS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        rendered = get_rendered_resume(fresh=fresh, output=output)
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if '*' in etags or rendered['etag'] in etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({output: rendered['content']})
+        response['ETag'] = rendered['etag']
+        # Let clients keep the resume but revalidate it on every use
+        response['Cache-Control'] = 'no-cache'
+        return response
+
     @action(detail=False, methods=['get'])
     def generate(self, request):
-        """Generate resume Markdown from all data."""
+        """Generate the resume from all data (the custom Markdown when the user edited it)."""
         try:
-            # Get template data
-            template = ResumeTemplate.get_or_create_template()
-            
-            # Check if custom markdown exists
-            if template.custom_markdown:
-                return Response({'markdown': template.custom_markdown})
-            
-            # Get all related data
-            experiences = Experience.objects.all().order_by('-start_date')
-            projects = Project.objects.all().order_by('-start_date')
-            educations = Education.objects.all().order_by('-start_date')
-            
-            # Generate Markdown
-            markdown = self._generate_resume_markdown(template, experiences, projects, educations)
-            
-            return Response({'markdown': markdown})
+            return self._rendered_response(request, fresh=False)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     @action(detail=False, methods=['get'])
     def generate_fresh(self, request):
-        """Generate resume Markdown from database data, ignoring custom markdown."""
+        """Generate the resume from database data, ignoring custom markdown."""
         try:
-            # Get template data
-            template = ResumeTemplate.get_or_create_template()
-            
-            # Get all related data
-            experiences = Experience.objects.all().order_by('-start_date')
-            projects = Project.objects.all().order_by('-start_date')
-            educations = Education.objects.all().order_by('-start_date')
-            
-            # Generate Markdown from database data only
-            markdown = self._generate_resume_markdown(template, experiences, projects, educations)
-            
-            return Response({'markdown': markdown})
+            return self._rendered_response(request, fresh=True)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    def _generate_resume_markdown(self, template, experiences, projects, educations):
-        """Generate Markdown from resume data."""
-        # Format experiences
-        exp_text = ""
-        for exp in experiences:
-            exp_text += f"### {exp.position} | {exp.company}\n"
-            if exp.is_current:
-                exp_text += f"**{exp.start_date.strftime('%B %Y')} - Present**\n"
-            else:
-                exp_text += f"**{exp.start_date.strftime('%B %Y')} - {exp.end_date.strftime('%B %Y') if exp.end_date else 'Present'}**\n"
-            if exp.location:
-                exp_text += f"*{exp.location}*\n"
-            exp_text += f"{exp.description}\n\n"
-        
-        # Format education
-        edu_text = ""
-        for edu in educations:
-            edu_text += f"### {edu.degree} | {edu.institution}\n"
-            if edu.is_current:
-                edu_text += f"**{edu.start_date.strftime('%B %Y')} - Present**\n"
-            else:
-                edu_text += f"**{edu.start_date.strftime('%B %Y')} - {edu.end_date.strftime('%B %Y') if edu.end_date else 'Present'}**\n"
-            if edu.field_of_study:
-                edu_text += f"*{edu.field_of_study}*\n"
-            if edu.gpa:
-                edu_text += f"GPA: {edu.gpa}\n"
-            edu_text += "\n"
-        
-        # Format projects
-        proj_text = ""
-        for proj in projects:
-            # Format project name with technologies on same line, make title clickable if URL exists
-            if proj.url:
-                if proj.technologies:
-                    proj_text += f"### [{proj.name}]({proj.url}) | {proj.technologies}\n"
-                else:
-                    proj_text += f"### [{proj.name}]({proj.url})\n"
-            else:
-                if proj.technologies:
-                    proj_text += f"### {proj.name} | {proj.technologies}\n"
-                else:
-                    proj_text += f"### {proj.name}\n"
-            
-            if proj.is_ongoing:
-                proj_text += f"**{proj.start_date.strftime('%B %Y')} - Present**\n"
-            else:
-                proj_text += f"**{proj.start_date.strftime('%B %Y')} - {proj.end_date.strftime('%B %Y') if proj.end_date else 'Present'}**\n"
-            proj_text += f"{proj.description}\n"
-            proj_text += "\n"
-        
-        # Generate full Markdown
-        markdown = f"# {template.name}\n"
-        
-        # Build contact information line
-        contact_parts = [template.email, template.phone, template.city]
-        
-        # Add links if they exist
-        if template.links and template.links.strip():
-            # Split links by newline and filter out empty lines
-            raw_links = [link.strip() for link in template.links.split('\n') if link.strip()]
-            
-            # Process links to make GitHub and LinkedIn display as text
-            processed_links = []
-            for link in raw_links:
-                # Ensure link has protocol
-                if not link.startswith(('http://', 'https://')):
-                    link = 'https://' + link
-                
-                # Check if it's GitHub or LinkedIn and format accordingly
-                if 'github.com' in link.lower():
-                    processed_links.append(f"[GitHub]({link})")
-                elif 'linkedin.com' in link.lower():
-                    processed_links.append(f"[LinkedIn]({link})")
-                else:
-                    # For other links, keep the original URL
-                    processed_links.append(link)
-            
-            contact_parts.extend(processed_links)
-        
-        markdown += " | ".join(contact_parts) + "\n\n"
-        
-        # Only include sections that have content
-        if exp_text.strip():
-            markdown += f"## Work Experience\n{exp_text}\n"
-        
-        if edu_text.strip():
-            markdown += f"## Education\n{edu_text}\n"
-        
-        if proj_text.strip():
-            markdown += f"## Projects\n{proj_text}\n"
-        
-        if template.skills and template.skills.strip():
-            markdown += f"## Skills\n{template.skills}\n\n"
-        
-        if template.summary and template.summary.strip():
-            markdown += f"## Professional Summary\n{template.summary}\n"
-        
-        return markdown
-    
-class MeetingNoteViewSet(viewsets.ModelViewSet):
+class MeetingNoteViewSet(TransferMixin, viewsets.ModelViewSet):
     """
     ViewSet for MeetingNote model.
     
@@ -482,6 +716,8 @@ class MeetingNoteViewSet(viewsets.ModelViewSet):
     """
     serializer_class = MeetingNoteSerializer
     permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+    transfer_dataset = 'meeting-notes'
+    transfer_owner_field = 'job_application__user'
 
     def get_queryset(self):
         """
@@ -511,7 +747,7 @@ class MeetingNoteViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError("Job application is required")
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(TransferMixin, viewsets.ModelViewSet):
     """
     ViewSet for Notification model.
     
@@ -520,34 +756,52 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+    transfer_dataset = 'notifications'
 
     def get_queryset(self):
         """
-        Return notifications for the current user, filtering out future notifications.
+        Return delivered notifications for the current user, newest first.
+        
+        Future notifications are promoted to delivered by the notification
+        scheduler once their show_date passes, so this is a plain lookup on
+        the partial notification_delivered_idx index.
         
         Returns:
             QuerySet: Filtered queryset of notifications
         """
-        from django.utils import timezone
-        
-        # For now, return all notifications since we're using AllowAny permissions
-        # TODO: Filter by user when authentication is implemented
-        queryset = Notification.objects.all()
-        
-        # Filter out future notifications (only show current and past notifications)
-        now = timezone.now()
-        queryset = queryset.filter(
-            show_date__lte=now,  # Only show notifications where show_date is now or in the past
-            is_active=True       # Only show active notifications
+        return (
+            Notification.objects.filter(user=request_user(self.request), is_delivered=True, is_active=True)
+            .order_by('-created_at')
         )
+
+    def get_export_queryset(self):
+        """Export the requesting user's notifications, including scheduled and inactive ones."""
+        return Notification.objects.filter(user=request_user(self.request))
+
+    def perform_destroy(self, instance):
+        """Delete a notification and push the owner's new unread count."""
+        user_id = instance.user_id
+        instance.delete()
+        notifications_changed.send(sender=Notification, user_ids=[user_id])
+
+    def _unread_count(self):
+        """Return the requesting user's number of unread delivered notifications."""
+        return self.get_queryset().filter(is_read=False).count()
+
+    def _bulk_selection(self, request, require_selection=True):
+        """
+        Return the notifications selected by a bulk action's request body.
         
-        print(f"DEBUG: Notification queryset count: {queryset.count()}")
-        print(f"DEBUG: Current time: {now}")
-        print(f"DEBUG: Filtered notifications:")
-        for notification in queryset:
-            print(f"  - ID: {notification.id}, Title: {notification.title}, Show Date: {notification.show_date}")
-        
-        return queryset.order_by('-created_at')
+        Raises a validation error when require_selection is set and the body
+        selects nothing, so an empty body never deletes every notification.
+        """
+        selection = NotificationBulkSelectionSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+        if require_selection and not selection.has_selection():
+            raise serializers.ValidationError({
+                'non_field_errors': ['Provide ids, a filter (before, job_application, is_read) or all=true.']
+            })
+        return selection.filter(self.get_queryset().order_by())
 
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
@@ -558,12 +812,57 @@ class NotificationViewSet(viewsets.ModelViewSet):
             pk: Primary key of the notification to mark as read
             
         Returns:
-            Response: JSON response confirming the action
+            Response: JSON response confirming the action, with the new unread count
         """
-        notification = self.get_object()
-        notification.is_read = True
-        notification.save()
-        return Response({'status': 'Notification marked as read'})
+        updated = self.get_queryset().filter(pk=pk).update(is_read=True, updated_at=timezone.now())
+        if not updated:
+            raise NotFound()
+        notifications_changed.send(sender=Notification, user_ids=[request_user(request).pk])
+        return Response({'status': 'Notification marked as read', 'unread_count': self._unread_count()})
+
+    @action(detail=False, methods=['post'])
+    def mark_all_read(self, request):
+        """
+        Mark many notifications as read with a single UPDATE.
+        
+        Body (optional): {"ids": [...]} or a filter such as
+        {"before": "2025-01-31"}; an empty body marks every notification read.
+        
+        Returns:
+            Response: JSON response with the updated count and the new unread count
+        """
+        queryset = self._bulk_selection(request, require_selection=False)
+        updated = queryset.filter(is_read=False).update(is_read=True, updated_at=timezone.now())
+        notifications_changed.send(sender=Notification, user_ids=[request_user(request).pk])
+        return Response({'updated': updated, 'unread_count': self._unread_count()})
+
+    @action(detail=False, methods=['post'])
+    def bulk_dismiss(self, request):
+        """
+        Dismiss (deactivate) many notifications with a single UPDATE.
+        
+        Body: {"ids": [...]}, a filter, or {"all": true}
+        
+        Returns:
+            Response: JSON response with the dismissed count and the new unread count
+        """
+        dismissed = self._bulk_selection(request).update(is_active=False, updated_at=timezone.now())
+        notifications_changed.send(sender=Notification, user_ids=[request_user(request).pk])
+        return Response({'dismissed': dismissed, 'unread_count': self._unread_count()})
+
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """
+        Delete many notifications with a single DELETE.
+        
+        Body: {"ids": [...]}, a filter, or {"all": true}
+        
+        Returns:
+            Response: JSON response with the deleted count and the new unread count
+        """
+        deleted, _per_model = self._bulk_selection(request).delete()
+        notifications_changed.send(sender=Notification, user_ids=[request_user(request).pk])
+        return Response({'deleted': deleted, 'unread_count': self._unread_count()})
     
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
@@ -573,9 +872,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
         Returns:
             Response: JSON response with unread count
         """
-        queryset = self.get_queryset()
-        unread_count = queryset.filter(is_read=False).count()
-        return Response({'unread_count': unread_count})
+        return Response({'unread_count': self._unread_count()})
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -666,6 +963,32 @@ class EducationViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
+async def notification_stream(request):
+    """
+    Stream notification events for the current user as Server-Sent Events.
+    
+    Sends the unread count on connect, then unread_count and notification
+    events as they happen (see events.py). Connections are held by the
+    event loop, so streams are only served under ASGI (e.g. uvicorn
+    jobtracker.asgi:application). A WSGI server would buffer the whole
+    endless stream before sending it, so under WSGI (runserver) the view
+    answers 204 No Content, which tells EventSource not to reconnect; the
+    client polls unread_count instead.
+    
+    Returns:
+        StreamingHttpResponse: text/event-stream response, or an empty 204
+            response when not served by ASGI
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+    user = await sync_to_async(request_user)(request)
+    response = StreamingHttpResponse(events.stream_events(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Ask reverse proxies (nginx) not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 class IsAuthenticated(permissions.IsAuthenticated):
     pass
 
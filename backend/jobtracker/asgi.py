@@ -3,6 +3,9 @@ ASGI config for jobtracker project.
 
 This module exposes the ASGI callable as a module-level variable named ``application``.
 ASGI (Asynchronous Server Gateway Interface) is used for async Django applications.
+Serve it (uvicorn jobtracker.asgi:application) to run the async views, such as
+the notification stream and the Gmail messages API, on the event loop instead
+of holding a worker thread per request.
 """
 
 import os
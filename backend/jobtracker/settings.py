@@ -104,6 +104,17 @@ DATABASES = {
     }
 }
 
+# Cache configuration
+# Used for derived data such as the application funnel. Use a shared backend
+# (e.g. Redis or Memcached) when running more than one worker process so that
+# invalidations reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'jobtracker',
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -164,6 +175,31 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Job tracker search index: 'auto' uses SQLite FTS5 when available and
+# otherwise the pure-Python inverted index ('fts5' or 'postings' to force one)
+JOB_TRACKER_SEARCH_BACKEND = 'auto'
+
+# Seconds between runs of the notification scheduler
+# (python manage.py run_notification_scheduler)
+NOTIFICATION_SCHEDULER_TICK = 60
+
+# Seconds between checks for notification changes made by other processes
+# (e.g. the scheduler) while notification streams are open
+NOTIFICATION_STREAM_SYNC_INTERVAL = 5
+
+# Newest inbox messages kept in the local Gmail mirror by a full sync
+# (python manage.py sync_gmail)
+GMAIL_SYNC_MAX_MESSAGES = 500
+
+# Gmail quota units each user may spend per second (Gmail's per-user limit
+# is 250); shared by all async Gmail fetches of the user in this process
+GMAIL_QUOTA_UNITS_PER_SECOND = 250
+
+# Content-addressed store for fetched message HTML (googlelogin.blobstore);
+# least recently used bodies are evicted past the size limit
+GMAIL_BLOB_STORE_DIR = BASE_DIR / 'gmail_blobs'
+GMAIL_BLOB_STORE_MAX_BYTES = 512 * 1024 * 1024
+
 SITE_ID = 4
 
 
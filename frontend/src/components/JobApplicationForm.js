@@ -5,6 +5,7 @@ const JobApplicationForm = ({ onSubmit, initialData = {} }) => {
     company_name: initialData.company_name || '',
     position: initialData.position || '',
     job_url: initialData.job_url || '',
+    job_description: initialData.job_description || '',
     status: initialData.status || 'applied',
     applied_date: initialData.applied_date || new Date().toISOString().split('T')[0],
     notes: initialData.notes || '',
@@ -113,6 +114,18 @@ const JobApplicationForm = ({ onSubmit, initialData = {} }) => {
         />
       </div>
 
+      <div className="form-group">
+        <label className="form-label">Job Description</label>
+        <textarea
+          name="job_description"
+          value={formData.job_description}
+          onChange={handleChange}
+          className="form-control"
+          rows="6"
+          placeholder="Paste the job posting to compare it against your resume"
+        />
+      </div>
+
       <div className="form-group">
         <label className="form-label">Notes</label>
         <textarea
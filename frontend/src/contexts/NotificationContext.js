@@ -3,6 +3,9 @@ import { notificationService } from '../services/notificationService';
 
 const NotificationContext = createContext();
 
+// Milliseconds between unread count checks when the server cannot stream
+const POLL_INTERVAL = 30000;
+
 export const useNotification = () => {
   const context = useContext(NotificationContext);
   if (!context) {
@@ -30,6 +33,22 @@ export const NotificationProvider = ({ children }) => {
 
   useEffect(() => {
     fetchUnreadCount();
+
+    // The server pushes the unread count whenever it changes; servers that
+    // cannot stream are polled instead
+    let pollTimer = null;
+    const source = notificationService.subscribe({
+      onUnreadCount: (count) => setUnreadCount(count),
+      onUnavailable: () => {
+        if (!pollTimer) {
+          pollTimer = setInterval(fetchUnreadCount, POLL_INTERVAL);
+        }
+      },
+    });
+    return () => {
+      source.close();
+      clearInterval(pollTimer);
+    };
   }, []);
 
   const refreshUnreadCount = () => {
@@ -4,10 +4,10 @@ import ApplicationCard from '../components/ApplicationCard';
 import JobApplicationForm from '../components/JobApplicationForm';
 import MeetingMinutesForm from '../components/MeetingMinutesForm';
 import SankeyDiagram from '../components/SankeyDiagram';
-import { processApplicationsForSankey } from '../utils/sankeyDataProcessor';
 
 const JobApplications = () => {
   const [applications, setApplications] = useState([]);
+  const [funnel, setFunnel] = useState({ nodes: [], links: [] });
   const [showForm, setShowForm] = useState(false);
   const [editingApplication, setEditingApplication] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -19,6 +19,12 @@ const JobApplications = () => {
     fetchApplications();
   }, []);
 
+  // The server builds the funnel for the selected status too, so every
+  // filter shows flows from the same status history
+  useEffect(() => {
+    fetchFunnel();
+  }, [statusFilter]);
+
   const fetchApplications = async () => {
     try {
       setLoading(true);
@@ -31,11 +37,26 @@ const JobApplications = () => {
     }
   };
 
+  const fetchFunnel = async () => {
+    try {
+      const funnelData = await applicationService.getFunnel(statusFilter === 'all' ? null : statusFilter);
+      setFunnel(funnelData);
+    } catch (error) {
+      console.error('Error fetching funnel:', error);
+    }
+  };
+
+  // Applications and the funnel both change when an application is written
+  const refreshApplications = () => {
+    fetchApplications();
+    fetchFunnel();
+  };
+
   const handleAddApplication = async (formData) => {
     try {
       await applicationService.create(formData);
       setShowForm(false);
-      fetchApplications();
+      refreshApplications();
     } catch (error) {
       console.error('Error creating application:', error);
     }
@@ -45,7 +66,7 @@ const JobApplications = () => {
     try {
       await applicationService.update(editingApplication.id, formData);
       setEditingApplication(null);
-      fetchApplications();
+      refreshApplications();
     } catch (error) {
       console.error('Error updating application:', error);
     }
@@ -55,7 +76,7 @@ const JobApplications = () => {
     if (window.confirm('Are you sure you want to delete this application?')) {
       try {
         await applicationService.delete(id);
-        fetchApplications();
+        refreshApplications();
       } catch (error) {
         console.error('Error deleting application:', error);
       }
@@ -204,7 +225,7 @@ const JobApplications = () => {
             The Great Job Hunt Flow
           </h3>
           <SankeyDiagram
-            data={processApplicationsForSankey(filteredApplications)}
+            data={funnel}
             height={400}
           />
         </div>
@@ -18,15 +18,36 @@ const API_BASE_URL = 'http://127.0.0.1:8000/api/applications/';
  * Each method handles HTTP requests to the Django backend.
  */
 export const applicationService = {
+  /**
+   * Get one page of job applications for the current user
+   *
+   * @param {string|null} cursor - Page URL returned as `next`/`previous` by a previous call
+   * @param {number} pageSize - Number of applications per page
+   * @returns {Promise<Object>} Object with `next`, `previous` and `results`
+   */
+  async getPage(cursor = null, pageSize = 50) {
+    const url = cursor || `${API_BASE_URL}?page_size=${pageSize}`;
+    const response = await axios.get(url);
+    return response.data;
+  },
+
   /**
    * Get all job applications for the current user
-   * 
+   *
+   * Follows the cursor pagination links until every page has been loaded.
+   *
    * @returns {Promise<Array>} Array of job application objects
    */
   async getAll() {
     try {
-      const response = await axios.get(API_BASE_URL);
-      return response.data;
+      const applications = [];
+      let next = null;
+      do {
+        const page = await this.getPage(next, 500);
+        applications.push(...page.results);
+        next = page.next;
+      } while (next);
+      return applications;
     } catch (error) {
       console.error("Error fetching job applications:", error);
       throw error;
@@ -104,6 +125,56 @@ export const applicationService = {
     return response.data;
   },
 
+  /**
+   * Get the application funnel as Sankey nodes and links
+   *
+   * @param {string} [status] - Only include applications currently in this status
+   * @returns {Promise<Object>} Object with `nodes` and `links` arrays
+   */
+  async getFunnel(status) {
+    const response = await axios.get(`${API_BASE_URL}funnel/`, { params: status ? { status } : {} });
+    return response.data;
+  },
+
+  /**
+   * Score how well the resume matches an application's job description
+   *
+   * @param {number} id - The ID of the job application
+   * @param {string|null} jobDescription - Description to score instead of the saved one
+   * @returns {Promise<Object>} Object with `score` (0-1) and `top_terms`
+   */
+  async getMatch(id, jobDescription = null) {
+    const response = jobDescription
+      ? await axios.post(`${API_BASE_URL}${id}/match/`, { job_description: jobDescription })
+      : await axios.get(`${API_BASE_URL}${id}/match/`);
+    return response.data;
+  },
+
+  /**
+   * Get the URL that streams every application as a file download
+   *
+   * @param {string} fileFormat - 'csv' or 'ndjson'
+   * @returns {string} Export URL (use as a link href so the browser streams it to disk)
+   */
+  getExportUrl(fileFormat = 'csv') {
+    return `${API_BASE_URL}export/?file_format=${fileFormat}`;
+  },
+
+  /**
+   * Import applications from a CSV or NDJSON file
+   *
+   * @param {File} file - File selected by the user
+   * @param {string} onConflict - 'error' to report existing applications, 'skip' to ignore them
+   * @returns {Promise<Object>} Object with created/skipped counts and per-line errors
+   */
+  async importFile(file, onConflict = 'skip') {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('on_conflict', onConflict);
+    const response = await axios.post(`${API_BASE_URL}import/`, formData);
+    return response.data;
+  },
+
   /**
    * Get meeting notes for a job application
    * 
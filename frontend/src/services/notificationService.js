@@ -69,6 +69,39 @@ export const notificationService = {
     return response.data;
   },
 
+  /**
+   * Mark many notifications as read in one request
+   *
+   * @param {Object} selection - Optional {ids} or filter ({before, job_application, is_read}); empty marks all
+   * @returns {Promise<Object>} Object with `updated` and the new `unread_count`
+   */
+  async markAllAsRead(selection = {}) {
+    const response = await axios.post(`${API_BASE_URL}mark_all_read/`, selection);
+    return response.data;
+  },
+
+  /**
+   * Dismiss many notifications in one request
+   *
+   * @param {Object} selection - {ids}, a filter ({before, job_application, is_read}) or {all: true}
+   * @returns {Promise<Object>} Object with `dismissed` and the new `unread_count`
+   */
+  async bulkDismiss(selection) {
+    const response = await axios.post(`${API_BASE_URL}bulk_dismiss/`, selection);
+    return response.data;
+  },
+
+  /**
+   * Delete many notifications in one request
+   *
+   * @param {Object} selection - {ids}, a filter ({before, job_application, is_read}) or {all: true}
+   * @returns {Promise<Object>} Object with `deleted` and the new `unread_count`
+   */
+  async bulkDelete(selection) {
+    const response = await axios.post(`${API_BASE_URL}bulk_delete/`, selection);
+    return response.data;
+  },
+
   /**
    * Get count of unread notifications
    * 
@@ -79,6 +112,40 @@ export const notificationService = {
     return response.data;
   },
 
+  /**
+   * Subscribe to the notification event stream (Server-Sent Events)
+   *
+   * The browser reconnects automatically if the connection drops. Servers
+   * that cannot stream (the backend under WSGI) answer 204, which closes the
+   * stream for good; `onUnavailable` is then called so the caller can poll.
+   *
+   * @param {Object} handlers - Optional `onUnreadCount(count)`, `onNotification(notification)`
+   *   and `onUnavailable()` callbacks
+   * @returns {EventSource} Open stream; call `close()` to unsubscribe
+   */
+  subscribe({ onUnreadCount, onNotification, onUnavailable } = {}) {
+    const source = new EventSource(`${API_BASE_URL}stream/`, { withCredentials: true });
+    if (onUnavailable) {
+      source.addEventListener('error', () => {
+        // CONNECTING means the browser is retrying; CLOSED means it gave up
+        if (source.readyState === EventSource.CLOSED) {
+          onUnavailable();
+        }
+      });
+    }
+    if (onUnreadCount) {
+      source.addEventListener('unread_count', (event) => {
+        onUnreadCount(JSON.parse(event.data).unread_count);
+      });
+    }
+    if (onNotification) {
+      source.addEventListener('notification', (event) => {
+        onNotification(JSON.parse(event.data));
+      });
+    }
+    return source;
+  },
+
   /**
    * Delete a notification
    * 
@@ -5,102 +5,6 @@
  * It creates nodes and links to show the flow of applications through different statuses.
  */
 
-/**
- * Process job applications data into Sankey diagram format
- * 
- * @param {Array} applications - Array of job application objects
- * @returns {Object} Formatted data for Sankey diagram with nodes and links
- */
-export const processApplicationsForSankey = (applications) => {
-  if (!applications || applications.length === 0) {
-    return { nodes: [], links: [] };
-  }
-
-  // Define the flow stages in logical order
-  const stages = [
-    { id: 'applied', label: 'Applied', color: '#17a2b8' },
-    { id: 'interview', label: 'Interview', color: '#ffc107' },
-    { id: 'rejected', label: 'Rejected', color: '#dc3545' },
-    { id: 'accepted', label: 'Accepted', color: '#28a745' },
-    { id: 'withdrawn', label: 'Withdrawn', color: '#6c757d' }
-  ];
-
-  // Count applications by status
-  const statusCounts = applications.reduce((acc, app) => {
-    acc[app.status] = (acc[app.status] || 0) + 1;
-    return acc;
-  }, {});
-
-  // Calculate counts according to new requirements:
-  // 1. Applied = total count of all applications (regardless of current status)
-  // 2. Interview = combination of interview, accepted, and rejected statuses
-  // 3. Accepted and Rejected stay the same
-  // 4. Withdrawn stays the same
-  const totalApplications = applications.length;
-  const interviewCount = (statusCounts.interview || 0) + (statusCounts.accepted || 0) + (statusCounts.rejected || 0);
-  
-  // Create adjusted counts for Sankey diagram
-  const adjustedCounts = {
-    applied: totalApplications,
-    interview: interviewCount,
-    accepted: statusCounts.accepted || 0,
-    rejected: statusCounts.rejected || 0,
-    withdrawn: statusCounts.withdrawn || 0
-  };
-
-  // Create nodes for each stage that has applications
-  const nodes = stages
-    .filter(stage => adjustedCounts[stage.id] > 0)
-    .map(stage => ({
-      id: stage.id,
-      label: stage.label,
-      color: stage.color
-    }));
-
-  // Create links following the logical flow:
-  // Applied → Interview or Withdrawn
-  // Interview → Accepted or Rejected
-  const links = [];
-  
-  // Flow 1: Applied → Interview (using adjusted count)
-  if (adjustedCounts.applied > 0 && adjustedCounts.interview > 0) {
-    links.push({
-      source: 'applied',
-      target: 'interview',
-      value: adjustedCounts.interview
-    });
-  }
-  
-  // Flow 2: Applied → Withdrawn (for applications that were withdrawn before interview)
-  if (adjustedCounts.applied > 0 && adjustedCounts.withdrawn > 0) {
-    links.push({
-      source: 'applied',
-      target: 'withdrawn',
-      value: adjustedCounts.withdrawn
-    });
-  }
-  
-  // Flow 3: Interview → Accepted
-  if (adjustedCounts.interview > 0 && adjustedCounts.accepted > 0) {
-    links.push({
-      source: 'interview',
-      target: 'accepted',
-      value: adjustedCounts.accepted
-    });
-  }
-  
-  // Flow 4: Interview → Rejected
-  if (adjustedCounts.interview > 0 && adjustedCounts.rejected > 0) {
-    links.push({
-      source: 'interview',
-      target: 'rejected',
-      value: adjustedCounts.rejected
-    });
-  }
-
-  return { nodes, links };
-};
-
 /**
  * Process applications with company grouping for more detailed Sankey diagram
  * 